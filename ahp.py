@@ -0,0 +1,343 @@
+# Nama Program    : ahp.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Mesin AHP batch. Semua matriks perbandingan alternatif ditumpuk menjadi satu array 3-D
+#                   (kriteria × n × n) dalam satu pass group-by, lalu vektor eigen utama dan λmax seluruh blok
+#                   dihitung bersamaan dengan power iteration (atau metode aproksimasi normalisasi kolom).
+#                   Termasuk uji konsistensi batch (CI/CR), Random Index hasil simulasi untuk n berapa pun, dan
+#                   pencarian triad yang paling tidak konsisten.
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+WEIGHT_METHODS = ("eigen", "approx")
+
+# ============================
+# STACKING
+# ============================
+def stack_alternative_matrices(df_alternatif):
+    """
+    Tumpuk blok matriks alternatif per kriteria dari format panjang (kolom 'Kriteria') dalam satu pass.
+    Mengembalikan (label kriteria, id alternatif per blok (K × n), kolom alternatif, matriks (K × n × n)).
+    Urutan kriteria mengikuti urutan kemunculan; urutan baris di dalam blok dipertahankan.
+    """
+    alt_cols = [c for c in df_alternatif.columns if c.lower().startswith("a")]
+    n = len(alt_cols)
+    codes, crit_labels = pd.factorize(df_alternatif['Kriteria'])
+    counts = np.bincount(codes[codes >= 0], minlength=len(crit_labels))
+    bad = np.flatnonzero(counts != n)
+    if len(bad):
+        raise ValueError(f"Jumlah baris dan kolom alternatif pada kriteria '{crit_labels[bad[0]]}' tidak seimbang. Matriks harus persegi.")
+
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
+    matrices = df_alternatif[alt_cols].to_numpy(dtype=float)[order].reshape(len(crit_labels), n, n)
+    alt_ids = df_alternatif['Kode Alternatif'].to_numpy()[order].reshape(len(crit_labels), n)
+    return list(crit_labels), alt_ids, alt_cols, matrices
+
+# ============================
+# PRIORITY VECTORS
+# ============================
+def approx_priorities(matrices):
+    """
+    Metode aproksimasi (normalisasi kolom lalu rata-rata baris) untuk setumpuk matriks (K × n × n).
+    λmax = Σ(jumlah kolom × bobot).
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    col_sums = matrices.sum(axis=1, keepdims=True)
+    weights = (matrices / col_sums).mean(axis=2)
+    lambda_max = np.einsum("kj,kj->k", col_sums[:, 0, :], weights)
+    return weights, lambda_max
+
+def eigen_priorities(matrices, tol=1e-12, max_iter=1000):
+    """
+    Vektor eigen utama (dinormalisasi Σw = 1) dan λmax untuk setumpuk matriks (K × n × n)
+    dengan power iteration batch. Iterasi berhenti ketika perubahan bobot terbesar < `tol`
+    untuk semua blok, atau setelah `max_iter` iterasi.
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    k, n, _ = matrices.shape
+    # Titik awal = hasil aproksimasi, biasanya sudah dekat dengan vektor eigen
+    weights = approx_priorities(matrices)[0]
+    active = np.arange(k)
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        product = np.einsum("kij,kj->ki", matrices[active], weights[active])
+        new = product / product.sum(axis=1, keepdims=True)
+        delta = np.abs(new - weights[active]).max(axis=1)
+        weights[active] = new
+        active = active[~(delta < tol)]
+    product = np.einsum("kij,kj->ki", matrices, weights)
+    lambda_max = product.sum(axis=1) / weights.sum(axis=1)
+    return weights, lambda_max
+
+def priorities(matrices, method="approx", tol=1e-12, max_iter=1000):
+    """Bobot prioritas dan λmax untuk setumpuk matriks perbandingan dengan metode 'eigen' atau 'approx'."""
+    matrices = np.asarray(matrices, dtype=np.float64)
+    if matrices.ndim == 2:
+        weights, lambda_max = priorities(matrices[None], method, tol, max_iter)
+        return weights[0], lambda_max[0]
+    if method == "eigen":
+        return eigen_priorities(matrices, tol, max_iter)
+    if method == "approx":
+        return approx_priorities(matrices)
+    raise ValueError(f"Metode bobot AHP '{method}' tidak dikenal. Pilih salah satu dari: {', '.join(WEIGHT_METHODS)}.")
+
+# ============================
+# PAIRWISE MATRICES
+# ============================
+def reciprocal_matrix(matrix):
+    """Matriks resiprokal dari segitiga atas `matrix`: a_ji = 1 / a_ij dan diagonal = 1 (juga untuk tumpukan K × n × n)."""
+    matrix = np.asarray(matrix, dtype=np.float64)
+    n = matrix.shape[-1]
+    upper = np.triu(np.ones((n, n), dtype=bool), 1)
+    with np.errstate(divide="ignore"):
+        out = np.where(upper, matrix, np.swapaxes(1.0 / matrix, -1, -2))
+    out[..., np.arange(n), np.arange(n)] = 1.0
+    return out
+
+# ============================
+# SESSION STORE
+# ============================
+class PairwiseStore:
+    """
+    Seluruh matriks perbandingan AHP satu sesi dalam bentuk array: `criteria` (n_kriteria × n_kriteria) dan
+    `alternatives` (n_kriteria × n_alternatif × n_alternatif, satu blok per kriteria), beserta id/nama.
+    """
+    __slots__ = ("crit_ids", "crit_names", "alt_ids", "alt_names", "criteria", "alternatives")
+
+    def __init__(self, crit_ids, crit_names, alt_ids, alt_names, criteria, alternatives):
+        self.crit_ids = np.asarray(crit_ids, dtype=object)
+        self.crit_names = np.asarray(crit_names, dtype=object)
+        self.alt_ids = np.asarray(alt_ids, dtype=object)
+        self.alt_names = np.asarray(alt_names, dtype=object)
+        self.criteria = np.ascontiguousarray(criteria, dtype=np.float64)
+        self.alternatives = np.ascontiguousarray(alternatives, dtype=np.float64)
+
+    @classmethod
+    def default(cls, n_criteria, n_alternatives):
+        """Matriks identitas (semua perbandingan = 1) untuk input manual: C1..Cn dan A1..Am."""
+        return cls([f"C{i+1}" for i in range(n_criteria)], [f"Kriteria {i+1}" for i in range(n_criteria)],
+                   [f"A{i+1}" for i in range(n_alternatives)], [f"Alternatif {i+1}" for i in range(n_alternatives)],
+                   np.ones((n_criteria, n_criteria)), np.ones((n_criteria, n_alternatives, n_alternatives)))
+
+    @classmethod
+    def from_frames(cls, df_kriteria, df_alternatif):
+        """
+        Bangun store dari DataFrame AHP-kriteria & AHP-alternatif sekaligus per array. Blok alternatif
+        dicocokkan ke kriteria lewat kolom 'Kriteria' dan barisnya diurutkan sesuai kode alternatif.
+        """
+        crit_ids = df_kriteria['Kode Kriteria'].astype(str).str.strip().to_numpy(dtype=object)
+        crit_names = df_kriteria['Nama Kriteria'].to_numpy(dtype=object) if 'Nama Kriteria' in df_kriteria else crit_ids
+        try:
+            criteria = df_kriteria[list(crit_ids)].to_numpy(dtype=float)
+        except KeyError as e:
+            raise ValueError(f"Kolom matriks kriteria tidak sesuai dengan 'Kode Kriteria': {e}")
+
+        labels, block_ids, _, matrices = stack_alternative_matrices(df_alternatif)
+        alt_ids = np.array(sorted(df_alternatif['Kode Alternatif'].unique()), dtype=object)
+        names = df_alternatif.drop_duplicates(subset=['Kode Alternatif']).set_index('Kode Alternatif')['Nama Alternatif']
+        alt_names = names.reindex(alt_ids).fillna(pd.Series([f"Alt-{i+1}" for i in range(len(alt_ids))], index=alt_ids)).to_numpy(dtype=object)
+
+        # Setiap blok harus berisi semua alternatif tepat sekali, dan setiap kriteria harus punya bloknya
+        n = len(alt_ids)
+        if matrices.shape[1] != n:
+            raise ValueError(f"Blok alternatif berukuran {matrices.shape[1]}×{matrices.shape[1]}, padahal ada {n} alternatif. "
+                             "Setiap kriteria harus membandingkan semua alternatif.")
+        sorted_ids = np.sort(block_ids.astype(str), axis=1)
+        bad = np.flatnonzero((sorted_ids != alt_ids.astype(str)[None, :]).any(axis=1))
+        if len(bad):
+            raise ValueError(f"Blok alternatif kriteria '{labels[bad[0]]}' tidak memuat setiap alternatif tepat satu kali.")
+
+        # Kode kriteria disamakan formatnya (C01 -> C1) seperti pada calculate_ahp; jika tidak ada yang cocok
+        # dan jumlah bloknya sama, blok dipasangkan sesuai urutan
+        crit_pos = {cid.replace("C0", "C"): k for k, cid in enumerate(crit_ids.tolist())}
+        target = np.array([crit_pos.get(str(label).strip().replace("C0", "C"), -1) for label in labels], dtype=np.int64)
+        if (target < 0).all() and len(labels) == len(crit_ids):
+            target = np.arange(len(labels))
+        if (target < 0).any():
+            raise ValueError(f"Kriteria '{labels[int(np.argmax(target < 0))]}' pada file alternatif tidak ada di 'Kode Kriteria'.")
+        missing = np.setdiff1d(np.arange(len(crit_ids)), target)
+        if len(missing):
+            raise ValueError(f"Matriks perbandingan alternatif untuk kriteria '{crit_ids[missing[0]]}' tidak ditemukan.")
+        if len(np.unique(target)) != len(target):
+            raise ValueError("Ada kriteria dengan lebih dari satu blok matriks perbandingan alternatif.")
+
+        # Susun ulang baris & kolom setiap blok ke urutan kode alternatif (satu gather untuk semua blok)
+        pos = np.argsort(np.searchsorted(alt_ids, block_ids.astype(object)), axis=1)
+        ordered = np.take_along_axis(matrices, pos[:, :, None], axis=1)
+        ordered = np.take_along_axis(ordered, pos[:, None, :], axis=2)
+        alternatives = np.ones((len(crit_ids), n, n))
+        alternatives[target] = ordered
+        return cls(crit_ids, crit_names, alt_ids, alt_names, criteria, alternatives)
+
+    @property
+    def n_criteria(self):
+        return len(self.crit_ids)
+
+    @property
+    def n_alternatives(self):
+        return len(self.alt_ids)
+
+    def resize(self, n_criteria, n_alternatives):
+        """Ubah ukuran; blok yang beririsan dipertahankan, baris/kolom baru bernilai 1."""
+        out = PairwiseStore.default(n_criteria, n_alternatives)
+        c, a = min(n_criteria, self.n_criteria), min(n_alternatives, self.n_alternatives)
+        out.crit_ids[:c], out.crit_names[:c] = self.crit_ids[:c], self.crit_names[:c]
+        out.alt_ids[:a], out.alt_names[:a] = self.alt_ids[:a], self.alt_names[:a]
+        out.criteria[:c, :c] = self.criteria[:c, :c]
+        out.alternatives[:c, :a, :a] = self.alternatives[:c, :a, :a]
+        return out
+
+    def matrix(self, k=None):
+        """View matriks kriteria (k=None) atau blok alternatif ke-k; perubahan langsung tersimpan di store."""
+        return self.criteria if k is None else self.alternatives[k]
+
+    def to_frames(self):
+        """DataFrame format file AHP-kriteria & AHP-alternatif (format panjang) tanpa iterasi per sel."""
+        crit_ids = [str(c) for c in self.crit_ids]
+        alt_ids = [str(a) for a in self.alt_ids]
+        k, n = self.n_criteria, self.n_alternatives
+        df_kriteria = pd.concat([
+            pd.DataFrame({'Kode Kriteria': crit_ids, 'Nama Kriteria': self.crit_names, 'Atribut': 'benefit'}),
+            pd.DataFrame(self.criteria, columns=crit_ids),
+        ], axis=1)
+        df_alternatif = pd.concat([
+            pd.DataFrame({'Kode Alternatif': np.tile(self.alt_ids, k), 'Nama Alternatif': np.tile(self.alt_names, k),
+                          'Kriteria': np.repeat(self.crit_ids, n)}),
+            pd.DataFrame(self.alternatives.reshape(k * n, n), columns=alt_ids),
+        ], axis=1)
+        return df_kriteria, df_alternatif
+
+# ============================
+# RANDOM INDEX
+# ============================
+# Tabel RI Saaty untuk n ≤ 10; di atasnya RI dibangkitkan lewat simulasi Monte Carlo
+SAATY_RI = {1: 0.00, 2: 0.00, 3: 0.58, 4: 0.90, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49}
+SAATY_SCALE = np.array([1 / 9, 1 / 8, 1 / 7, 1 / 6, 1 / 5, 1 / 4, 1 / 3, 1 / 2, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+RI_SAMPLES = 500
+RI_CACHE_PATH = os.environ.get("DSS_RI_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "dss_mcdm", "random_index.json"))
+
+_RI_MEMORY = {}
+_RI_LOCK = threading.Lock()
+
+def random_reciprocal_matrices(rng, n, size):
+    """Matriks resiprokal acak (size × n × n) dengan segitiga atas dari skala Saaty 1/9..9."""
+    upper = np.triu_indices(n, 1)
+    matrices = np.ones((size, n, n))
+    values = rng.choice(SAATY_SCALE, size=(size, len(upper[0])))
+    matrices[:, upper[0], upper[1]] = values
+    matrices[:, upper[1], upper[0]] = 1.0 / values
+    return matrices
+
+def simulate_random_index(n, samples=RI_SAMPLES, seed=None):
+    """RI = rata-rata CI dari `samples` matriks resiprokal acak berukuran n (diproses per batch)."""
+    if n <= 2:
+        return 0.0
+    rng = np.random.default_rng(n if seed is None else seed)
+    batch = max(1, min(samples, 4_000_000 // (n * n)))
+    total = 0.0
+    done = 0
+    while done < samples:
+        size = min(batch, samples - done)
+        _, lambda_max = eigen_priorities(random_reciprocal_matrices(rng, n, size), tol=1e-9)
+        total += ((lambda_max - n) / (n - 1)).sum()
+        done += size
+    return total / samples
+
+def _load_ri_file():
+    try:
+        with open(RI_CACHE_PATH, encoding="utf-8") as f:
+            return {int(k): float(v) for k, v in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+def _save_ri_file(values):
+    try:
+        os.makedirs(os.path.dirname(RI_CACHE_PATH), exist_ok=True)
+        tmp = f"{RI_CACHE_PATH}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({str(k): v for k, v in sorted(values.items())}, f, indent=1)
+        os.replace(tmp, RI_CACHE_PATH)
+    except OSError:
+        pass  # Direktori cache tidak bisa ditulis: nilai tetap tersimpan di memori
+
+def random_index(n, source="saaty"):
+    """
+    Random Index untuk matriks berukuran n. source='saaty' memakai tabel Saaty untuk n ≤ 10 dan
+    simulasi untuk n > 10; source='simulated' selalu memakai simulasi. Hasil simulasi disimpan
+    di memori dan di disk (RI_CACHE_PATH) sehingga setiap n hanya disimulasikan sekali.
+    """
+    n = int(n)
+    if source == "saaty" and n in SAATY_RI:
+        return SAATY_RI[n]
+    if n <= 2:
+        return 0.0
+    with _RI_LOCK:
+        if n not in _RI_MEMORY:
+            _RI_MEMORY.update(_load_ri_file())
+        if n not in _RI_MEMORY:
+            _RI_MEMORY[n] = simulate_random_index(n)
+            _save_ri_file({**_load_ri_file(), n: _RI_MEMORY[n]})
+        return _RI_MEMORY[n]
+
+# ============================
+# CONSISTENCY
+# ============================
+def consistency(lambda_max, n, threshold=0.1, ri_source="saaty"):
+    """
+    CI, RI, CR untuk banyak matriks sekaligus. `lambda_max` (K,) dan `n` (skalar atau (K,)).
+    Mengembalikan dict berisi array 'n', 'lambda_max', 'CI', 'RI', 'CR', 'consistent'.
+    """
+    lambda_max = np.atleast_1d(np.asarray(lambda_max, dtype=np.float64))
+    n = np.broadcast_to(np.asarray(n, dtype=np.int64), lambda_max.shape)
+    ri_values = {size: random_index(size, ri_source) for size in np.unique(n).tolist()}
+    RI = np.array([ri_values[size] for size in n.tolist()], dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        CI = np.where(n > 1, (lambda_max - n) / np.maximum(n - 1, 1), 0.0)
+        CR = np.where(RI != 0, CI / np.where(RI != 0, RI, 1.0), 0.0)
+    return {"n": n, "lambda_max": lambda_max, "CI": CI, "RI": RI, "CR": CR, "consistent": CR < threshold}
+
+def inconsistent_triads(matrix, top=5):
+    """
+    Triad (i, j, k) dengan i < j < k yang paling tidak konsisten, diukur dengan |ln(a_ij · a_jk / a_ik)|.
+    Dihitung per baris i (memori O(n²)). Mengembalikan list dict berisi indeks, nilai, saran a_ik = a_ij · a_jk,
+    dan deviasi, terurut dari yang terburuk.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    n = matrix.shape[0]
+    if n < 3 or top <= 0:
+        return []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_m = np.log(matrix)
+    upper = np.triu(np.ones((n, n), dtype=bool), 1)
+    best_dev = np.empty(0)
+    best_idx = np.empty((0, 3), dtype=np.int64)
+    for i in range(n - 2):
+        # dev[j, k] = |L_ij + L_jk - L_ik| untuk i < j < k
+        dev = np.abs(log_m[i, :, None] + log_m - log_m[i, None, :])
+        mask = upper.copy()
+        mask[: i + 1, :] = False
+        j, k = np.nonzero(mask)
+        d = dev[j, k]
+        d = np.where(np.isnan(d), np.inf, d)
+        if len(d) > top:
+            keep = np.argpartition(-d, top - 1)[:top]
+            j, k, d = j[keep], k[keep], d[keep]
+        best_dev = np.concatenate([best_dev, d])
+        best_idx = np.concatenate([best_idx, np.column_stack([np.full(len(j), i), j, k])])
+        if len(best_dev) > top:
+            keep = np.argpartition(-best_dev, top - 1)[:top]
+            best_dev, best_idx = best_dev[keep], best_idx[keep]
+    order = np.lexsort((best_idx[:, 2], best_idx[:, 1], best_idx[:, 0], -best_dev))
+    triads = []
+    for (i, j, k), d in zip(best_idx[order].tolist(), best_dev[order].tolist()):
+        triads.append({"i": i, "j": j, "k": k, "a_ij": matrix[i, j], "a_jk": matrix[j, k], "a_ik": matrix[i, k],
+                       "suggested_a_ik": matrix[i, j] * matrix[j, k], "deviation": d})
+    return triads
@@ -4,479 +4,264 @@
 # Tanggal Buat    : Jumat, 3 Oktober 2025
 # Deskripsi       : Aplikasi Sistem Pendukung Keputusan (DSS) untuk MCDM menggunakan metode Simple Additive Weighting (SAW), Weighted Product (WP), Analytical Hierarchy Process (AHP), dan Technique for Order Preference by Similarity to Ideal Solution (TOPSIS)
 
+import json
+import os
+from io import BytesIO
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-from io import BytesIO
+
+import ahp
+import cache
+import compare
+import profiling
+from report import RANKING_STYLED_ROWS, XLSX_MIME, export_workbook, highlight_top3
+from mcdm import (DecisionMatrix, METHOD_KEYS, load_decision_matrix, read_pasted_table, load_upload, calculate_cached,
+                  step_summary, scenario_weights, calculate_scenarios, calculate_smaa, calculate_comparison, write_table,
+                  export_bundle, profile_frame)
 
 def load_css(file_name):
     with open(file_name, encoding="utf-8") as f:
         st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
 # ============================
-# DATA TYPES
+# MANUAL GRID HELPERS
 # ============================
-class Criterion:
-    def __init__(self, id, name, weight, attribute):
-        self.id = id.strip() if id else ""
-        self.name = name.strip() if name else ""
-        self.weight = float(weight) if weight is not None else 1.0
-        self.attribute = attribute.lower().strip() if attribute else "benefit"  # 'benefit' or 'cost'
-
-class Alternative:
-    def __init__(self, id, name, values):
-        self.id = id.strip() if id else ""
-        self.name = name.strip() if name else ""
-        self.values = values  # dict: {criterion_id: value}
+_UNSET = object()
+MAX_MANUAL_ALTERNATIVES = 200
+MAX_MANUAL_CRITERIA = 50
 
-# ============================
-# AUTO DETECTION HELPERS
-# ============================
-def is_criteria_df(df: pd.DataFrame):
+def grid_session(name, dm, make_base):
     """
-    Deteksi apakah dataframe berisi data kriteria. Dibuat lebih spesifik
-    untuk menghindari kesalahan deteksi dengan file alternatif.
+    State grid `name` untuk matriks `dm`: kunci widget, data dasar, dan sel yang sudah diterapkan.
+    Grid dibuat ulang (kunci & data dasar baru) hanya jika objek matriks berganti (upload, ubah ukuran, tempel).
     """
-    cols = [c.lower().strip() for c in df.columns]
-    # Kata kunci "bobot" dan "atribut" adalah indikator yang jauh lebih kuat.
-    if any(col in cols for col in ['bobot', 'atribut', 'attribute', 'nama kriteria']):
-        return True
-    return False
-
-def is_alternatives_df(df: pd.DataFrame):
+    grid = st.session_state.get(name)
+    if grid is None or grid["dm"] is not dm:
+        version = grid["version"] + 1 if grid is not None else 0
+        grid = {"dm": dm, "version": version, "key": f"{name}_{version}", "base": make_base(dm), "applied": {}}
+        st.session_state[name] = grid
+    return grid
+
+def changed_cells(grid):
     """
-    Deteksi apakah dataframe berisi data alternatif.
-    Akan mengembalikan True jika kolom memiliki 'Kode Alternatif' atau 'Nama Alternatif'.
+    Sel yang berubah sejak callback sebelumnya sebagai list (baris, kolom, nilai). Sel yang editannya
+    dibatalkan kembali ke nilai dasar. Biayanya sebanding dengan jumlah editan, bukan ukuran matriks.
     """
-    cols = [c.lower().strip() for c in df.columns]
-    # Diperbarui untuk mengenali 'Kode Alternatif'
-    if any(col in cols for col in ['kode alternatif', 'nama alternatif', 'alternatif', 'kode']):
-        # Cek tambahan: pastikan bukan file kriteria yang menyamar
-        if not any(col in cols for col in ['bobot', 'atribut', 'attribute']):
-            return True
-
-    # fallback check: jika lebih dari separuh kolom (selain kolom pertama) berisi angka
-    if df.shape[1] >= 2:
-        numeric_counts = 0
-        total_vals = 0
-        for c in df.columns[1:]:
-            if pd.api.types.is_numeric_dtype(df[c].dropna()):
-                 numeric_counts += df[c].notna().sum()
-            total_vals += len(df)
-        
-        if total_vals > 0 and (numeric_counts / (total_vals * (df.shape[1]-1))) > 0.6:
-            return True
-
-    return False
-
-# ============================
-# FILE PARSER
-# ============================
-def parse_data(df_alt, df_crit=None):
-    """Mengubah DataFrame menjadi list Criterion dan Alternative secara terurut."""
-    criteria = []
-    alternatives = []
-
-    # -------------------------------------
-    # STEP 1: PARSE ATAU BUAT KRITERIA
-    # -------------------------------------
-    if df_crit is not None:
-        df_crit.columns = [str(c).strip() for c in df_crit.columns]
-        for i, row in df_crit.iterrows():
-            # Diperbarui untuk membaca 'Kode Kriteria' dan 'Kode' sebagai fallback
-            crit_id = str(row.get("Kode Kriteria", row.get("Kode", f"C{i+1}"))).strip()
-            name = str(row.get("Nama Kriteria", row.get("Kriteria", f"Kriteria {i+1}"))).strip()
-            weight = row.get("Bobot", 1.0)
-            try:
-                weight = float(weight)
-            except (ValueError, TypeError):
-                weight = 1.0
-            attr = str(row.get("Atribut", "benefit")).lower().strip()
-            attr = "cost" if attr == "cost" else "benefit"
-            criteria.append(Criterion(crit_id, name, weight, attr))
-
-    elif df_alt is not None:
-        crit_cols = [
-            c for c in df_alt.columns if str(c).strip().lower().startswith("c") and str(c).strip()[1:].isdigit()
-        ]
-        for i, col in enumerate(crit_cols):
-            col_id = str(col).strip()
-            criteria.append(Criterion(col_id, f"Kriteria {i+1}", 1.0, "benefit"))
-
-    if not criteria:
-        return [], []
-
-
-    # -------------------------------------
-    # STEP 2: PARSE ALTERNATIF
-    # -------------------------------------
-    if df_alt is not None:
-        df_alt.columns = [str(c).strip() for c in df_alt.columns]
-        
-        for col in ["Nama Alternatif", "Nama"]:
-            if col in df_alt.columns:
-                df_alt[col] = df_alt[col].fillna('')
-
-        for i, row in df_alt.iterrows():
-            # Diperbarui untuk membaca 'Kode Alternatif' dan 'Kode' sebagai fallback
-            alt_id = str(row.get("Kode Alternatif", row.get("Kode", f"A{i+1}"))).strip()
-            alt_name = str(row.get("Nama Alternatif", row.get("Nama", f"Alternatif {i+1}"))).strip()
-
-            values = {}
-            for crit in criteria:
-                raw_val = row.get(crit.id, row.get(crit.id.upper(), row.get(crit.id.lower(), 0.0)))
-                try:
-                    val = float(raw_val)
-                except (ValueError, TypeError):
-                    val = 0.0
-                values[crit.id] = val
-
-            alternatives.append(Alternative(alt_id, alt_name, values))
-
-    return criteria, alternatives
-
-# ============================
-# SAW CALCULATION
-# ============================
-def calculate_saw(criteria, alternatives):
-    """Hitung metode Simple Additive Weighting (SAW)"""
-    steps = []
-    
-    # 1️⃣ Validasi Data
-    if not criteria or not alternatives:
-        raise ValueError("Kriteria atau alternatif kosong. Pastikan data sudah lengkap.")
-
-    # 2️⃣ Matriks Keputusan Awal (X)
-    matrix = np.array([[alt.values.get(crit.id, 0.0) for crit in criteria] for alt in alternatives], dtype=float)
-    df_initial = pd.DataFrame(matrix, index=[alt.name or alt.id for alt in alternatives], columns=[f"{c.name} ({c.id})" for c in criteria])
-    steps.append(("Matriks Keputusan Awal", df_initial))
-
-    # 3️⃣ Normalisasi Matriks
-    # Rumus:
-    # Untuk kriteria benefit  → r_ij = x_ij / max(x_j)
-    # Untuk kriteria cost     → r_ij = min(x_j) / x_ij
-    norm_matrix = np.zeros_like(matrix, dtype=float)
-    for j, crit in enumerate(criteria):
-        col = matrix[:, j]
-        if crit.attribute.lower() == 'benefit':
-            max_val = np.max(col)
-            norm_matrix[:, j] = col / max_val if max_val != 0 else 0
-        else:  # cost
-            min_val = np.min(col)
-            # Hindari pembagian dengan nol jika ada nilai 0 di kriteria cost
-            safe_col = np.where(col == 0, 1e-9, col)
-            norm_matrix[:, j] = min_val / safe_col
-            norm_matrix[:, j][col == 0] = 0
-
-    df_norm = pd.DataFrame(norm_matrix, index=[alt.name or alt.id for alt in alternatives], columns=[f"{c.name} ({c.attribute})" for c in criteria])
-    steps.append(("Normalisasi Matriks (Benefit/Cost)", df_norm))
-
-    # 4️⃣ Normalisasi Bobot
-    # Setiap bobot dinormalisasi agar totalnya = 1
-    total_weight = sum(c.weight for c in criteria)
-    normalized_weights = [(c.weight / total_weight) if total_weight != 0 else (1.0/len(criteria)) for c in criteria]
-    df_norm_weights = pd.DataFrame([normalized_weights], index=['Bobot Ternormalisasi (wj)'], columns=[c.id for c in criteria])
-    steps.append(("Normalisasi Bobot", df_norm_weights))
-    
-    # 5️⃣ Hitung Nilai Preferensi (V)
-    # Rumus: V_i = Σ(w_j * r_ij)
-    # Hasil penjumlahan terbobot antara nilai normalisasi dan bobot
-    v_values = np.dot(norm_matrix, normalized_weights)
-    df_v = pd.DataFrame({"Nilai V (Skor)": v_values}, index=[alt.name or alt.id for alt in alternatives])
-    steps.append(("Perhitungan Skor V (V = Σ(wj * rij))", df_v))
-
-    # 8️⃣ Perangkingan Akhir
-    # Urutkan dari skor tertinggi ke terendah (semakin besar semakin baik)
-    ranking_data = sorted(zip([alt.name or alt.id for alt in alternatives], v_values), key=lambda x: x[1], reverse=True)
-    df_ranking = pd.DataFrame([[name, score, rank + 1] for rank, (name, score) in enumerate(ranking_data)], columns=['Alternatif', 'Skor Akhir (V)', 'Ranking'])
-    steps.append(("Hasil Perankingan", df_ranking))
-
-    return steps, df_ranking
-
-# ============================
-# WP CALCULATION
-# ============================
-def calculate_wp(criteria, alternatives):
-    """Hitung metode Weighted Product (WP)"""
-    steps = []
-    
-    # 1️⃣ Validasi data
-    if not criteria or not alternatives:
-        raise ValueError("Kriteria atau alternatif kosong.")
-
-    # 2️⃣ Matriks Keputusan Awal (X)
-    matrix = np.array([[alt.values.get(crit.id, 0.0) for crit in criteria] for alt in alternatives])
-    df_initial = pd.DataFrame(matrix, index=[alt.name or alt.id for alt in alternatives], columns=[f"{c.name} ({c.id})" for c in criteria])
-    steps.append(("Matriks Keputusan Awal", df_initial))
-
-    # 3️⃣ Normalisasi Bobot
-    # Setiap bobot dinormalisasi agar totalnya = 1
-    total_weight = sum(c.weight for c in criteria)
-    normalized_weights = [(c.weight / total_weight) if total_weight != 0 else (1.0/len(criteria)) for c in criteria]
-    df_norm_weights = pd.DataFrame([normalized_weights], index=['Bobot Ternormalisasi (wj)'], columns=[c.id for c in criteria])
-    steps.append(("Normalisasi Bobot", df_norm_weights))
-
-    # 4️⃣ Penyesuaian Bobot
-    # Jika kriteria bertipe "cost", bobot dijadikan negatif karena dalam WP nilai cost berbanding terbalik (semakin kecil semakin baik)
-    adjusted_weights = [-w if crit.attribute.lower() == 'cost' else w for w, crit in zip(normalized_weights, criteria)]
-    df_adj_weights = pd.DataFrame([adjusted_weights], index=['Bobot Disesuaikan (w)'], columns=[f"{c.name} ({c.attribute})" for c in criteria])
-    steps.append(("Penyesuaian Bobot (Atribut Cost bernilai negatif)", df_adj_weights))
-
-    # 5️⃣ Perhitungan Nilai S
-    # Rumus: S_i = ∏(x_ij ^ w_j)
-    # Pastikan tidak ada nilai nol agar tidak error saat dipangkatkan
-    matrix[matrix <= 0] = 1e-9
-    s_values = np.prod(matrix ** adjusted_weights, axis=1)
-    df_s = pd.DataFrame({"Nilai S": s_values}, index=[alt.name or alt.id for alt in alternatives])
-    steps.append(("Perhitungan Nilai S (S = ∏(xij^w))", df_s))
-
-    # 6️⃣ Perhitungan Nilai V (Preferensi)
-    # Rumus: V_i = S_i / ΣS_i
-    total_s = np.sum(s_values)
-    v_values = s_values / total_s if total_s != 0 else np.zeros_like(s_values)
-    df_v = pd.DataFrame({"Nilai S": s_values, "Nilai V (Skor)": v_values}, index=[alt.name or alt.id for alt in alternatives])
-    steps.append(("Perhitungan Nilai V (V = S / ΣS)", df_v))
-
-    # 7️⃣ Perangkingan Akhir
-    # Urutkan dari skor tertinggi ke terendah (semakin besar semakin baik)
-    ranking_data = sorted(zip([alt.name or alt.id for alt in alternatives], v_values), key=lambda x: x[1], reverse=True)
-    df_ranking = pd.DataFrame([[name, score, rank + 1] for rank, (name, score) in enumerate(ranking_data)], columns=['Alternatif', 'Skor Akhir (V)', 'Ranking'])
-    steps.append(("Hasil Perankingan", df_ranking))
-
-    return steps, df_ranking
-
-# ============================
-# AHP CALCULATION
-# ============================
-def calculate_ahp(df_kriteria, df_alternatif):
-    steps = []
-    
-    # 1️⃣ Validasi Data
-    df_kriteria.columns = [str(c).strip() for c in df_kriteria.columns]
-    df_alternatif.columns = [str(c).strip() for c in df_alternatif.columns]
-
-    if 'Kriteria' not in df_alternatif.columns:
-        raise ValueError("Kolom 'Kriteria' tidak ditemukan di file AHP-alternatif.csv. Pastikan nama kolomnya persis 'Kriteria'.")
-
-    # 2️⃣ Matriks Perbandingan Kriteria
+    edits = st.session_state[grid["key"]].get("edited_rows", {})
+    current = {(int(i), col): value for i, row in edits.items() for col, value in row.items()}
+    applied = grid["applied"]
+    base = grid["base"]
+    changed = [(i, col, value) for (i, col), value in current.items() if applied.get((i, col), _UNSET) != value]
+    changed += [(i, col, base[col].iat[i]) for (i, col) in applied.keys() - current.keys()]
+    grid["applied"] = current
+    return changed
+
+def values_base(dm):
+    return pd.concat([pd.DataFrame({"nama": dm.alt_names.astype(str)}),
+                      pd.DataFrame(dm.values, columns=[str(j) for j in range(dm.n_criteria)])], axis=1)
+
+def criteria_base(dm):
+    return pd.DataFrame({"kode": dm.crit_ids.astype(str), "nama": dm.crit_names.astype(str),
+                         "bobot": dm.weights, "atribut": dm.attributes.astype(str)})
+
+def apply_value_edits():
+    """Callback grid nilai: terapkan hanya sel yang berubah ke `dm.values` / `dm.alt_names`."""
+    grid = st.session_state.dm_value_grid
+    dm = grid["dm"]
+    rows, cols, values = [], [], []
+    for i, col, value in changed_cells(grid):
+        if col == "nama":
+            dm.alt_names[i] = "" if value is None else str(value).strip()
+        else:
+            rows.append(i)
+            cols.append(int(col))
+            values.append(0.0 if value is None else float(value))
+    if rows:
+        dm.values[rows, cols] = values
+
+def apply_criteria_edits():
+    """Callback grid kriteria: terapkan perubahan nama, bobot, dan atribut."""
+    grid = st.session_state.dm_criteria_grid
+    dm = grid["dm"]
+    for j, col, value in changed_cells(grid):
+        if col == "nama":
+            dm.crit_names[j] = "" if value is None else str(value).strip()
+        elif col == "bobot":
+            dm.weights[j] = 0.0 if value is None else float(value)
+        elif col == "atribut":
+            dm.attributes[j] = value if value in ('benefit', 'cost') else 'benefit'
+
+def apply_pasted_table():
+    """Callback tombol tempel: ganti isi matriks manual dengan tabel dari spreadsheet."""
     try:
-        crit_cols = [c for c in df_kriteria.columns if c.lower().startswith("c")]
-        crit_index = df_kriteria["Kode Kriteria"].values
-        mat_kriteria = df_kriteria[crit_cols].to_numpy(dtype=float)
-        kriteria_matrix = pd.DataFrame(mat_kriteria, index=crit_index, columns=crit_cols)
-        steps.append(("Matriks Perbandingan Kriteria", kriteria_matrix))
+        names, values, crit_names = read_pasted_table(st.session_state.get("dm_paste_text", ""))
+        if len(names) > MAX_MANUAL_ALTERNATIVES or values.shape[1] > MAX_MANUAL_CRITERIA:
+            raise ValueError(f"Input manual dibatasi {MAX_MANUAL_ALTERNATIVES} alternatif × {MAX_MANUAL_CRITERIA} kriteria. Gunakan upload file untuk data yang lebih besar.")
+        dm = st.session_state.decision_matrix or DecisionMatrix.default(len(names), values.shape[1])
+        st.session_state.decision_matrix = dm.with_table(names, values, crit_names)
+        st.session_state.dm_paste_error = None
     except Exception as e:
-        raise ValueError(f"Format file AHP-Kriteria tidak valid: {e}")
-
-    # Normalisasi Matriks Kriteria dan Hitung Bobot
-    col_sums = kriteria_matrix.sum(axis=0)
-    norm_matrix = kriteria_matrix / col_sums
-    weights = norm_matrix.mean(axis=1)
-    steps.append(("Normalisasi Matriks Kriteria", norm_matrix))
-    steps.append(("Bobot Kriteria", pd.DataFrame(weights, columns=['Bobot'])))
-
-    # Uji Konsistensi
-    n = len(kriteria_matrix)
-    if n > 0 :
-        lambda_max = (col_sums * weights).sum()
-        CI = (lambda_max - n) / (n - 1) if (n - 1) > 0 else 0
-        RI_table = {1: 0.00, 2: 0.00, 3: 0.58, 4: 0.90, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49}
-        RI = RI_table.get(n, 1.49)
-        CR = CI / RI if RI != 0 else 0
-        steps.append(("Uji Konsistensi Kriteria", pd.DataFrame({
-            'λ maks': [lambda_max], 'CI': [CI], 'CR': [CR],
-            'Konsisten': ['Ya' if CR < 0.1 else 'Tidak']
-        })))
-
-    # 3️⃣ Matriks Perbandingan Alternatif per Kriteria
-    alt_scores = {}
-    unique_kriteria = df_alternatif['Kriteria'].unique()
-    for crit in unique_kriteria:
-        df_block = df_alternatif[df_alternatif['Kriteria'] == crit]
-
-        # Validasi blok kriteria
-        alt_cols = [c for c in df_block.columns if c.lower().startswith("a")]
-        alt_ids = df_block['Kode Alternatif'].values
-
-        # Pastikan matriks persegi
-        if len(alt_ids) != len(alt_cols):
-            raise ValueError(f"Jumlah baris dan kolom alternatif pada kriteria '{crit}' tidak seimbang. Matriks harus persegi.")
-
-        mat_alt = df_block[alt_cols].to_numpy(dtype=float)
-        alt_matrix = pd.DataFrame(mat_alt, index=alt_ids, columns=alt_cols)
-        steps.append((f"Matriks Perbandingan Alternatif ({crit})", alt_matrix))
-
-        # Normalisasi kolom & hitung bobot rata-rata
-        col_sum = alt_matrix.sum(axis=0)
-        norm = alt_matrix / col_sum
-        w_alt = norm.mean(axis=1)
-
-        steps.append((f"Normalisasi & Bobot Alternatif ({crit})", pd.DataFrame({
-            "Normalisasi": norm.mean(axis=1),
-            "Bobot": w_alt
-        })))
-
-        alt_scores[crit] = w_alt
-
-    # 4️⃣ Hitung Skor Akhir & Perangkingan
-    all_alts = sorted(list(df_alternatif['Kode Alternatif'].unique()))
-    result = pd.DataFrame(index=all_alts)
-
-    # Gabungkan semua skor alternatif ke dalam satu DataFrame
-    for crit in alt_scores:
-        result[crit] = alt_scores[crit].reindex(result.index, fill_value=0)
-
-    # Menyamakan format kode kriteria (misal, C01 -> C1) untuk pencocokan
-    weights.index = [i.replace("C0", "C") for i in weights.index]
-    result.columns = [c.replace("C0", "C") for c in result.columns]
-
-    # Pastikan hanya kriteria yang ada di bobot yang dihitung
-    common_cols = [c for c in result.columns if c in weights.index]
-    if not common_cols:
-        raise ValueError("Tidak ada kriteria yang cocok antara bobot kriteria dan hasil alternatif.")
-    
-    # Ambil Nama Alternatif dari data input
-    alt_names_map = df_alternatif.drop_duplicates(subset=['Kode Alternatif'])
-    alt_names_map = dict(zip(alt_names_map['Kode Alternatif'], alt_names_map['Nama Alternatif']))
-
-    # Hasil Skor Akhir berdasarkan bobot kriteria (hasil dari tahap kriteria)
-    result["Skor Akhir"] = 0.0
-    for c in common_cols:
-        result["Skor Akhir"] += result[c] * weights[c]
-
-    # Perhitungan bobot kriteria (rata-rata dari tahap kriteria)
-    steps.append(("Rata-rata Bobot Kriteria (dari langkah 1)", pd.DataFrame(weights, columns=["Rata-rata Kriteria"])))
-
-    # Urutkan hasil akhir berdasarkan skor
-    result = result.sort_values("Skor Akhir", ascending=False)
-    result["Ranking"] = np.arange(1, len(result) + 1)
-
-    steps.append(("Hasil Akhir AHP", result))
-    return steps, result.reset_index().rename(columns={'index': 'Alternatif'})
+        st.session_state.dm_paste_error = str(e)
 
 # ============================
-# TOPSIS CALCULATION
+# AHP MANUAL INPUT HELPERS
 # ============================
-def calculate_topsis(criteria, alternatives):
-    """Hitung metode TOPSIS"""
-    steps = []
-    
-    # 1️⃣ Validasi Data
-    if not criteria or not alternatives:
-        raise ValueError("Kriteria atau alternatif kosong.")
-
-    # 2️⃣ Matriks Keputusan Awal (X)
-    matrix = np.array([[alt.values.get(crit.id, 0.0) for crit in criteria] for alt in alternatives], dtype=float)
-    df_initial = pd.DataFrame(matrix, index=[alt.name or alt.id for alt in alternatives], columns=[f"{c.name} ({c.id})" for c in criteria])
-    steps.append(("Matriks Keputusan Awal", df_initial))
-
-    # 3️⃣ Normalisasi Matriks
-    # Rumus: rij = xij / √(Σxij²)
-    # Setiap kolom dinormalisasi agar tidak dipengaruhi skala nilai
-    norm_denominators = np.sqrt(np.sum(matrix**2, axis=0))
-    norm_denominators[norm_denominators == 0] = 1.0
-    normalized_matrix = matrix / norm_denominators
-    df_normalized = pd.DataFrame(normalized_matrix, index=[alt.name or alt.id for alt in alternatives], columns=[c.name for c in criteria])
-    steps.append(("Matriks Ternormalisasi (rij = xij / √(Σxij²))", df_normalized))
-
-    # 4️⃣ Matriks Ternormalisasi Terbobot
-    # Rumus: y_ij = w_j * r_ij
-    # Gunakan bobot yang sudah ternormalisasi
-    total_weight = sum(c.weight for c in criteria)
-    normalized_weights = [(c.weight / total_weight) if total_weight != 0 else (1.0/len(criteria)) for c in criteria]
-    weighted_matrix = normalized_matrix * normalized_weights
-    df_weighted = pd.DataFrame(weighted_matrix, index=[alt.name or alt.id for alt in alternatives], columns=[f"{c.name} (w={w:.3f})" for c, w in zip(criteria, normalized_weights)])
-    steps.append(("Matriks Ternormalisasi Terbobot (yij = wj × rij)", df_weighted))
-
-    # 5️⃣ Menentukan Solusi Ideal Positif (A+) dan Negatif (A-)
-    # Benefit → nilai maksimum (semakin besar semakin baik)
-    # Cost → nilai minimum (semakin kecil semakin baik)
-    ideal_positive = np.zeros(len(criteria))
-    ideal_negative = np.zeros(len(criteria))
-    for j, crit in enumerate(criteria):
-        col = weighted_matrix[:, j]
-        if crit.attribute == 'benefit':
-            ideal_positive[j] = np.max(col)
-            ideal_negative[j] = np.min(col)
-        else: # cost
-            ideal_positive[j] = np.min(col)
-            ideal_negative[j] = np.max(col)
-            
-    df_ideal = pd.DataFrame([ideal_positive, ideal_negative], index=['A+ (Ideal Positif)', 'A- (Ideal Negatif)'], columns=[f"{c.name} ({c.attribute})" for c in criteria])
-    steps.append(("Solusi Ideal", df_ideal))
-
-    # 6️⃣ Hitung Jarak Separasi
-    # Rumus:
-    # D+ = √Σ(y_ij - y_j+)²
-    # D- = √Σ(y_ij - y_j-)²
-    separation_positive = np.sqrt(np.sum((weighted_matrix - ideal_positive)**2, axis=1))
-    separation_negative = np.sqrt(np.sum((weighted_matrix - ideal_negative)**2, axis=1))
-    df_separation = pd.DataFrame({'D+ (Jarak ke A+)': separation_positive, 'D- (Jarak ke A-)': separation_negative}, index=[alt.name or alt.id for alt in alternatives])
-    steps.append(("Jarak Separasi", df_separation))
-
-    # 7️⃣ Hitung Nilai Kedekatan Relatif (V)
-    # Rumus:
-    # V_i = D- / (D+ + D-)
-    closeness_denominator = separation_positive + separation_negative
-    closeness = np.divide(separation_negative, closeness_denominator, out=np.zeros_like(separation_negative), where=closeness_denominator!=0)
-    df_closeness = pd.DataFrame({'D+': separation_positive, 'D-': separation_negative, 'Skor V': closeness}, index=[alt.name or alt.id for alt in alternatives])
-    steps.append(("Kedekatan Relatif (V = D- / (D+ + D-))", df_closeness))
-    
-    # 8️⃣ Perangkingan Akhir
-    # Semakin tinggi nilai V → semakin dekat dengan solusi ideal → semakin baik
-    ranking_data = sorted(zip([alt.name or alt.id for alt in alternatives], closeness), key=lambda x: x[1], reverse=True)
-    df_ranking = pd.DataFrame([[name, score, rank+1] for rank, (name, score) in enumerate(ranking_data)], columns=['Alternatif', 'Skor Akhir', 'Ranking'])
-    steps.append(("Hasil Perankingan", df_ranking))
+def apply_pairwise_edits(k, editor_key):
+    """
+    Callback grid AHP: terapkan hanya sel yang diubah ke array store (k=None untuk matriks kriteria).
+    Isian di segitiga bawah dipindah ke segitiga atas sebagai 1/x, nilai ≤ 0 atau kosong diabaikan,
+    lalu resiprokal diisi ulang sekaligus (vektor).
+    """
+    edited = st.session_state[editor_key].get("edited_rows", {})
+    if not edited:
+        return
+    matrix = st.session_state.ahp_store.matrix(k)
+    for i, row in edited.items():
+        for col, value in row.items():
+            j = int(col)
+            if value is None or not np.isfinite(value) or value <= 0 or i == j:
+                continue
+            if i < j:
+                matrix[i, j] = value
+            else:
+                matrix[j, i] = 1.0 / value
+    matrix[...] = ahp.reciprocal_matrix(matrix)
+    # Grid dibuat ulang dengan kunci baru agar menampilkan matriks hasil (termasuk resiprokalnya)
+    versions = st.session_state.setdefault("ahp_editor_versions", {})
+    versions[k] = versions.get(k, 0) + 1
+
+def pairwise_editor(store, k, labels):
+    """Satu grid yang dapat diedit untuk satu matriks perbandingan di store, plus hasil uji konsistensi langsung."""
+    n = len(labels)
+    matrix = store.matrix(k)
+    editor_key = f"ahp_matrix_{'kriteria' if k is None else k}_editor_{st.session_state.get('ahp_editor_versions', {}).get(k, 0)}"
+    st.data_editor(
+        pd.DataFrame(matrix, index=labels, columns=[str(j) for j in range(n)]),
+        key=editor_key, num_rows="fixed", use_container_width=True,
+        column_config={str(j): st.column_config.NumberColumn(label, min_value=0.0, format="%.4f") for j, label in enumerate(labels)},
+        on_change=apply_pairwise_edits, args=(k, editor_key),
+    )
+    if n > 2:
+        _, lambda_max = ahp.priorities(matrix)
+        cons = ahp.consistency(lambda_max, n)
+        status = "✅ konsisten" if cons['consistent'][0] else "⚠️ tidak konsisten"
+        st.caption(f"λ maks = {lambda_max:.4f} · CI = {cons['CI'][0]:.4f} · CR = {cons['CR'][0]:.4f} ({status})")
+        if not cons['consistent'][0]:
+            worst = ahp.inconsistent_triads(matrix, 1)[0]
+            st.caption(f"Triad terburuk: {labels[worst['i']]} → {labels[worst['j']]} → {labels[worst['k']]}; "
+                       f"saran nilai ({labels[worst['i']]}, {labels[worst['k']]}) ≈ {worst['suggested_a_ik']:.3f}")
+
+def names_base(ids, names):
+    return pd.DataFrame({"kode": ids.astype(str), "nama": names.astype(str)})
+
+def apply_name_edits(grid_name, attr):
+    """Callback grid nama kriteria/alternatif AHP: terapkan nama yang berubah ke store."""
+    grid = st.session_state[grid_name]
+    names = getattr(grid["dm"], attr)
+    for i, col, value in changed_cells(grid):
+        if col == "nama":
+            names[i] = "" if value is None else str(value).strip()
 
-    return steps, df_ranking
+def prepare_ahp_dfs_from_manual():
+    """Mempersiapkan DataFrame untuk AHP dari store input manual (konversi per array, bukan per sel)."""
+    return st.session_state.ahp_store.to_frames()
 
 # ============================
-# AHP MANUAL INPUT HELPERS
+# RESULT RENDERING
 # ============================
-def update_reciprocal(matrix_key, i, j):
-    """Callback untuk memperbarui nilai timbal balik dalam matriks AHP."""
-    try:
-        val = st.session_state[f"{matrix_key}_{i}_{j}"]
-        if val != 0:
-            st.session_state[f"{matrix_key}_{j}_{i}_val"] = 1/val
-    except (ValueError, ZeroDivisionError):
-        pass # Biarkan jika input tidak valid
-
-def prepare_ahp_dfs_from_manual():
-    """Mempersiapkan DataFrame untuk AHP dari input manual di session_state."""
-    # 1. Buat df_kriteria
-    crit_ids = list(st.session_state.ahp_manual_crit_names.keys())
-    crit_matrix_data = []
-    for r_idx, r_id in enumerate(crit_ids):
-        row_data = {'Kode Kriteria': r_id, 'Nama Kriteria': st.session_state.ahp_manual_crit_names[r_id], 'Atribut': 'benefit'}
-        for c_idx, c_id in enumerate(crit_ids):
-            key = f"ahp_crit_matrix_{r_idx}_{c_idx}"
-            row_data[c_id] = st.session_state.get(key, 1.0)
-        crit_matrix_data.append(row_data)
-    df_kriteria = pd.DataFrame(crit_matrix_data)
-
-    # 2. Buat df_alternatif
-    alt_ids = list(st.session_state.ahp_manual_alt_names.keys())
-    alt_dfs = []
-    for crit_id in crit_ids:
-        alt_matrix_data = []
-        for r_idx, r_id in enumerate(alt_ids):
-            row_data = {'Kode Alternatif': r_id, 'Nama Alternatif': st.session_state.ahp_manual_alt_names[r_id], 'Kriteria': crit_id}
-            for c_idx, c_id in enumerate(alt_ids):
-                key = f"ahp_alt_matrix_{crit_id}_{r_idx}_{c_idx}"
-                row_data[c_id] = st.session_state.get(key, 1.0)
-            alt_matrix_data.append(row_data)
-        alt_dfs.append(pd.DataFrame(alt_matrix_data))
-    df_alternatif = pd.concat(alt_dfs, ignore_index=True)
-    
-    return df_kriteria, df_alternatif
+# Tabel langkah di atas batas ini dimuat bertahap dari server (hanya baris yang terlihat yang dikirim ke browser)
+STEP_LAZY_ROWS = 1000
+
+# Proses worker SMAA per perhitungan; dibatasi agar satu sesi tidak memakai semua CPU server
+SMAA_WORKERS = min(4, os.cpu_count() or 1)
+
+def render_ranking(ranking):
+    """Tabel ranking: baris teratas dengan highlight top-3, sisanya tabel virtual, plus unduhan hasil lengkap."""
+    score_col = ranking.columns[1]
+    head = ranking.iloc[:RANKING_STYLED_ROWS]
+    st.dataframe(head.style.apply(highlight_top3, axis=None).format({score_col: "{:.4f}"}),
+                 use_container_width=True, hide_index=True)
+    if len(ranking) > RANKING_STYLED_ROWS:
+        st.caption(f"Ranking {RANKING_STYLED_ROWS + 1} – {len(ranking):,} (baris dimuat dari server saat tabel digulir):")
+        st.dataframe(ranking.iloc[RANKING_STYLED_ROWS:], use_container_width=True, hide_index=True, lazy=True,
+                     column_config={score_col: st.column_config.NumberColumn(format="%.4f")})
+    # File dibuat saat tombol diklik, bukan di setiap rerun
+    col_csv, col_parquet = st.columns(2)
+    with col_csv:
+        st.download_button("⬇️ Unduh Hasil Lengkap (CSV)", data=lambda: ranking.to_csv(index=False).encode("utf-8"),
+                           file_name="hasil_ranking.csv", mime="text/csv")
+    with col_parquet:
+        st.download_button("⬇️ Unduh Hasil Lengkap (Parquet)", data=lambda: table_bytes(ranking, "parquet"),
+                           file_name="hasil_ranking.parquet", mime="application/vnd.apache.parquet")
+
+def table_bytes(df, fmt):
+    buf = BytesIO()
+    write_table(df, buf, fmt)
+    return buf.getvalue()
+
+def render_step_table(df):
+    if len(df) > STEP_LAZY_ROWS:
+        st.caption(f"{len(df):,} baris × {df.shape[1]} kolom — baris dimuat dari server saat tabel digulir.")
+        st.dataframe(df, use_container_width=True, lazy=True)
+    else:
+        st.dataframe(df, use_container_width=True)
+
+def render_steps(steps):
+    """Langkah perhitungan: mode ringkasan (ukuran & statistik saja) atau detail yang dimuat saat expander dibuka."""
+    view = st.radio("Tampilan Langkah", ["Detail (dimuat saat dibuka)", "Ringkasan (ukuran & statistik)"], horizontal=True, key="step_view")
+    if view.startswith("Ringkasan"):
+        st.dataframe(step_summary(steps), use_container_width=True, hide_index=True)
+        return
+    for i, (title, df) in enumerate(steps):
+        expander = st.expander(title, key=f"step_expander_{i}", on_change="rerun")
+        if expander.open:
+            with expander:
+                render_step_table(df)
 
 # ============================
 # STREAMLIT UI
 # ============================
+def render_profile(profiler):
+    """Panel Profil: waktu, alokasi memori, dan ukuran matriks setiap tahap pada rerun ini & perhitungan terakhir."""
+    summary = profiler.summary()
+    if any(row["stage"] == "hitung" for row in summary):
+        # Perhitungan ranking hanya berjalan saat tombol ditekan; profilnya disimpan agar tetap tampil di rerun berikutnya
+        st.session_state.last_calc_profile = [row for row in summary if row["path"].startswith("rerun › hitung")]
+    last_calc = st.session_state.get("last_calc_profile")
+    number_format = {c: "{:.2f}" for c in ("Waktu (ms)", "Alokasi Puncak (MB)", "Alokasi Bersih (MB)")}
+
+    with st.expander("🩺 Profil", expanded=True):
+        hottest = profiling.hottest(last_calc or summary)
+        if hottest is not None:
+            st.caption(f"Tahap terlama: **{hottest['path']}** ({hottest['seconds'] * 1000:.1f} ms). "
+                       "Cache hasil dilewati selama profil aktif agar setiap tahap benar-benar dihitung.")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Rerun Ini:**")
+            st.dataframe(profile_frame(summary).style.format(number_format, na_rep="-"), use_container_width=True, hide_index=True)
+        with col2:
+            st.markdown("**Perhitungan Ranking Terakhir:**")
+            if last_calc:
+                st.dataframe(profile_frame(last_calc).style.format(number_format, na_rep="-"), use_container_width=True, hide_index=True)
+            else:
+                st.info("Tekan **Hitung Ranking** untuk memprofil perhitungan.")
+        st.download_button("⬇️ Unduh Profil (JSON)", file_name="profil.json", mime="application/json",
+                           data=json.dumps({"rerun": summary, "perhitungan": last_calc or []}, ensure_ascii=False, indent=2))
+
 def main():
     st.set_page_config(page_title="MCDM Calculator", layout="wide", page_icon="🎯")
-    
+    if not st.session_state.get("profile_enabled"):
+        render_app()
+        return
+    # Profil opsional: seluruh rerun (upload, ingest, perhitungan) dicatat per tahap lalu ditampilkan di panel Profil
+    with profiling.profiled() as profiler:
+        with profiling.stage("rerun"):
+            render_app()
+    render_profile(profiler)
+
+def render_app():
     # Apply Custom CSS
     load_css("style.css")
     
@@ -492,17 +277,29 @@ def main():
         """, unsafe_allow_html=True)
     
     # Inisialisasi session state
-    if 'criteria' not in st.session_state: st.session_state.criteria = []
-    if 'alternatives' not in st.session_state: st.session_state.alternatives = []
-    if 'ahp_manual_crit_names' not in st.session_state: st.session_state.ahp_manual_crit_names = {}
-    if 'ahp_manual_alt_names' not in st.session_state: st.session_state.ahp_manual_alt_names = {}
+    if 'decision_matrix' not in st.session_state: st.session_state.decision_matrix = None
+    if 'ahp_store' not in st.session_state: st.session_state.ahp_store = None
 
     # Sidebar untuk pengaturan
     st.sidebar.header("⚙️ Pengaturan")
     method = st.sidebar.selectbox("Pilih Metode", ["Simple Additive Weighting (SAW)", "Weighted Product (WP)", "Analytical Hierarchy Process (AHP)", "Technique for Order Preference by Similarity to Ideal Solution (TOPSIS)"])
+    top_k = st.sidebar.number_input("Top-k Hasil Akhir (0 = semua)", min_value=0, value=0, step=10)
+    lookup_text = st.sidebar.text_input("Cari Ranking Alternatif", placeholder="ID/nama, pisahkan dengan koma")
+    lookup = [x.strip() for x in lookup_text.split(",") if x.strip()]
+    cache_stats = cache.RESULT_CACHE.stats()
+    st.sidebar.caption(f"⚡ Cache hasil: {cache_stats['hits']} hit / {cache_stats['misses']} miss · {cache_stats['items']} item · {cache_stats['bytes'] / 1e6:.1f} MB")
+    st.sidebar.checkbox("🩺 Profil Per Tahap", key="profile_enabled",
+                        help="Catat waktu, alokasi memori, dan ukuran matriks setiap tahap (upload, ingest, normalisasi, "
+                             "pembobotan, ranking, tabel langkah). Perhitungan sedikit lebih lambat selama aktif.")
     input_method = st.radio("Metode Input Data", ["Upload File (CSV/XLSX)", "Input Manual"], horizontal=True)
 
     is_ahp = "Analytical Hierarchy Process (AHP)" in method
+    ahp_weight_method = "approx"
+    if is_ahp:
+        ahp_choice = st.sidebar.selectbox("Metode Bobot AHP", ["Aproksimasi (Normalisasi Kolom)", "Eigenvector (Power Iteration)"],
+                                          help="Aproksimasi = perhitungan bawaan aplikasi. Eigenvector memakai vektor eigen utama; "
+                                               "skor & bobotnya sedikit berbeda bila matriks perbandingan tidak konsisten sempurna.")
+        ahp_weight_method = "eigen" if ahp_choice.startswith("Eigenvector") else "approx"
 
     # ===========================
     # INPUT DATA - UPLOAD
@@ -521,26 +318,31 @@ def main():
                     \n Anda dapat mengunggah satu file Excel (dengan sheet terpisah) atau beberapa file CSV sekaligus.""")
                 
 
-        uploaded_files = st.file_uploader("Pilih file CSV atau XLSX", type=['csv', 'xlsx', 'xls'], accept_multiple_files=True)
+        uploaded_files = st.file_uploader("Pilih file CSV, XLSX, Parquet, atau Feather", type=['csv', 'xlsx', 'xls', 'parquet', 'feather', 'arrow'], accept_multiple_files=True)
 
         if uploaded_files:
             df_criteria, df_alternatives = None, None
             for f in uploaded_files:
                 try:
-                    df_temp = pd.read_excel(f) if f.name.lower().endswith(('.xls', '.xlsx')) else pd.read_csv(f)
+                    with profiling.stage("upload"):
+                        # Digest isi file dihitung sekali per file upload (file_id), bukan di setiap rerun
+                        digests = st.session_state.setdefault("upload_digests", {})
+                        if f.file_id not in digests:
+                            digests[f.file_id] = cache.content_key(np.frombuffer(f.getvalue(), dtype=np.uint8))
+                        kind, df_temp = load_upload(f.name, f.getvalue(), is_ahp, digests[f.file_id])
                     if is_ahp:
-                        if "kriteria" in f.name.lower():
+                        if kind == "criteria":
                             df_criteria = df_temp
                             st.success(f"✔️ File AHP kriteria terdeteksi: `{f.name}`")
-                        elif "alternatif" in f.name.lower():
+                        elif kind == "alternatives":
                             df_alternatives = df_temp
                             st.success(f"✔️ File AHP alternatif terdeteksi: `{f.name}`")
                         else: st.warning(f"⚠️ File `{f.name}` tidak dikenali sebagai file AHP valid!")
                     else:
-                        if is_criteria_df(df_temp):
+                        if kind == "criteria":
                             df_criteria = df_temp
                             st.success(f"✔️ File kriteria terdeteksi: `{f.name}`")
-                        elif is_alternatives_df(df_temp):
+                        elif kind == "alternatives":
                             df_alternatives = df_temp
                             st.success(f"✔️ File alternatif terdeteksi: `{f.name}`")
                         else: st.warning(f"⚠️ Tidak dapat mendeteksi jenis file `{f.name}`!")
@@ -552,36 +354,16 @@ def main():
                     if df_criteria is not None and df_alternatives is not None:
                         st.session_state.df_ahp_criteria = df_criteria
                         st.session_state.df_ahp_alternatives = df_alternatives
-                        st.success("✅ File AHP berhasil dimuat & disinkronkan ke Input Manual!")
-
-                        # Sinkronisasi Kriteria ke state manual
-                        crit_ids = df_criteria['Kode Kriteria'].tolist()
-                        st.session_state.ahp_manual_crit_names = dict(zip(crit_ids, df_criteria['Nama Kriteria']))
-                        for i, r_id in enumerate(crit_ids):
-                            for j, c_id in enumerate(crit_ids):
-                                value = df_criteria.loc[df_criteria['Kode Kriteria'] == r_id, c_id].iloc[0]
-                                st.session_state[f"ahp_crit_matrix_{i}_{j}"] = float(value)
-
-                        # Sinkronisasi Alternatif ke state manual
-                        alt_ids = sorted(list(df_alternatives['Kode Alternatif'].unique()))
-                        alt_names_map = df_alternatives.drop_duplicates(subset=['Kode Alternatif'])
-                        alt_names_map = dict(zip(alt_names_map['Kode Alternatif'], alt_names_map['Nama Alternatif']))
-                        st.session_state.ahp_manual_alt_names = {aid: alt_names_map.get(aid, f"Alt-{i+1}") for i, aid in enumerate(alt_ids)}
-                        
-                        for crit_id in df_alternatives['Kriteria'].unique():
-                            df_block = df_alternatives[df_alternatives['Kriteria'] == crit_id].set_index('Kode Alternatif')
-                            for i, r_id in enumerate(alt_ids):
-                                for j, c_id in enumerate(alt_ids):
-                                    st.session_state[f"ahp_alt_matrix_{crit_id}_{i}_{j}"] = float(df_block.loc[r_id, c_id])
 
+                        # Sinkronisasi ke store input manual (satu array per matriks)
+                        st.session_state.ahp_store = ahp.PairwiseStore.from_frames(df_criteria, df_alternatives)
+                        st.success("✅ File AHP berhasil dimuat & disinkronkan ke Input Manual!")
                     else: st.warning("⚠️ Harap unggah kedua file: kriteria dan alternatif untuk AHP.")
                 else:
-                    criteria, alternatives = parse_data(df_alternatives, df_criteria)
-                    st.session_state.criteria = criteria
-                    st.session_state.alternatives = alternatives
-                    if criteria and alternatives: st.success(f"✅ Data berhasil dimuat! Ditemukan {len(alternatives)} alternatif dan {len(criteria)} kriteria.")
-                    elif criteria: st.info(f"✅ Kriteria dimuat ({len(criteria)}). Unggah file alternatif.")
-                    elif alternatives: st.info(f"✅ Alternatif dimuat ({len(alternatives)}). Kriteria dibuat otomatis.")
+                    dm = load_decision_matrix(df_alternatives, df_criteria)
+                    st.session_state.decision_matrix = dm
+                    if dm is not None and dm.n_alternatives: st.success(f"✅ Data berhasil dimuat! Ditemukan {dm.n_alternatives} alternatif dan {dm.n_criteria} kriteria.")
+                    elif dm is not None: st.info(f"✅ Kriteria dimuat ({dm.n_criteria}). Unggah file alternatif.")
             except Exception as e:
                 st.error(f"❌ Terjadi kesalahan saat memproses data: {e}")
     
@@ -592,115 +374,120 @@ def main():
         st.subheader("✏️ Input Manual") 
         # --- UI MANUAL AHP ---
         if is_ahp:
+            store = st.session_state.ahp_store
             c1, c2 = st.columns(2)
-            num_criteria = c1.number_input("Jumlah Kriteria", 1, 10, len(st.session_state.ahp_manual_crit_names) or 3)
-            num_alternatives = c2.number_input("Jumlah Alternatif", 1, 20, len(st.session_state.ahp_manual_alt_names) or 3)
-
-            crit_ids = [f"C{i+1}" for i in range(num_criteria)]
-            alt_ids = [f"A{i+1}" for i in range(num_alternatives)]
-
-            # Sinkronisasi nama kriteria & alternatif jika jumlah berubah
-            if set(crit_ids) != set(st.session_state.ahp_manual_crit_names.keys()):
-                st.session_state.ahp_manual_crit_names = {cid: f"Kriteria {i+1}" for i, cid in enumerate(crit_ids)}
-            if set(alt_ids) != set(st.session_state.ahp_manual_alt_names.keys()):
-                st.session_state.ahp_manual_alt_names = {aid: f"Alternatif {i+1}" for i, aid in enumerate(alt_ids)}
+            # Batas atas mengikuti ukuran data upload jika lebih besar dari batas input manual
+            num_criteria = c1.number_input("Jumlah Kriteria", 1, max(30, store.n_criteria if store is not None else 0), (store.n_criteria if store is not None else 0) or 3)
+            num_alternatives = c2.number_input("Jumlah Alternatif", 1, max(200, store.n_alternatives if store is not None else 0), (store.n_alternatives if store is not None else 0) or 3)
+            if store is None:
+                store = ahp.PairwiseStore.default(num_criteria, num_alternatives)
+            elif (store.n_criteria, store.n_alternatives) != (num_criteria, num_alternatives):
+                store = store.resize(num_criteria, num_alternatives)
+            st.session_state.ahp_store = store
 
             # Bagian Input Nama Kriteria & Alternatif
             with st.expander("**1. Nama Kriteria & Alternatif**", expanded=True):
                 c1, c2 = st.columns(2)
-                with c1:
-                    st.write("**Nama Kriteria**")
-                    for i, cid in enumerate(crit_ids):
-                        st.session_state.ahp_manual_crit_names[cid] = st.text_input(f"Nama {cid}", st.session_state.ahp_manual_crit_names[cid], key=f"crit_name_{cid}")
-                with c2:
-                    st.write("**Nama Alternatif**")
-                    for i, aid in enumerate(alt_ids):
-                        st.session_state.ahp_manual_alt_names[aid] = st.text_input(f"Nama {aid}", st.session_state.ahp_manual_alt_names[aid], key=f"alt_name_{aid}")
-            
-            # Bagian Input Matriks Perbandingan Kriteria
+                for col, grid_name, attr, ids, title in ((c1, "ahp_crit_names_grid", "crit_names", store.crit_ids, "Nama Kriteria"),
+                                                          (c2, "ahp_alt_names_grid", "alt_names", store.alt_ids, "Nama Alternatif")):
+                    with col:
+                        grid = grid_session(grid_name, store, lambda s, ids=ids, attr=attr: names_base(ids, getattr(s, attr)))
+                        st.data_editor(grid["base"], key=grid["key"], num_rows="fixed", hide_index=True, use_container_width=True,
+                                       on_change=apply_name_edits, args=(grid_name, attr), column_config={
+                                           "kode": st.column_config.TextColumn("Kode", disabled=True),
+                                           "nama": st.column_config.TextColumn(title),
+                                       })
+
+            # Bagian Input Matriks Perbandingan (satu grid per matriks; isi segitiga atas, resiprokal terisi otomatis)
             st.write("**2. Matriks Perbandingan Kriteria**")
-            cols_h = st.columns([1.5] + [1] * num_criteria)
-            for j, cid in enumerate(crit_ids):
-                cols_h[j+1].markdown(f"**{st.session_state.ahp_manual_crit_names[cid]}**")
-            for i, r_cid in enumerate(crit_ids):
-                cols_r = st.columns([1.5] + [1] * num_criteria)
-                cols_r[0].markdown(f"**{st.session_state.ahp_manual_crit_names[r_cid]}**")
-                for j, c_cid in enumerate(crit_ids):
-                    key = f"ahp_crit_matrix_{i}_{j}"
-                    if i == j:
-                        cols_r[j+1].number_input(key, value=1.0, disabled=True, label_visibility="collapsed")
-                        st.session_state[key] = 1.0
-                    else:
-                        is_reciprocal = st.session_state.get(f"{key}_val") is not None and key not in st.session_state
-                        value = st.session_state.get(f"{key}_val", st.session_state.get(key, 1.0))
-                        cols_r[j+1].number_input(key, min_value=0.0, value=float(value), key=key, on_change=update_reciprocal, args=('ahp_crit_matrix', i, j), label_visibility="collapsed", disabled=is_reciprocal)
+            st.caption("Isi segitiga atas (baris lebih penting daripada kolom). Segitiga bawah terisi otomatis dengan 1/x; isian di segitiga bawah dikonversi ke segitiga atas.")
+            pairwise_editor(store, None, store.crit_names.tolist())
 
-            # Bagian Input Matriks Perbandingan Alternatif per Kriteria
             st.write("**3. Matriks Perbandingan Alternatif (berdasarkan setiap Kriteria)**")
-            tabs = st.tabs([name for name in st.session_state.ahp_manual_crit_names.values()])
-            for i_crit, crit_id in enumerate(crit_ids):
-                with tabs[i_crit]:
-                    cols_h = st.columns([1.5] + [1] * num_alternatives)
-                    for j, aid in enumerate(alt_ids):
-                        cols_h[j+1].markdown(f"**{st.session_state.ahp_manual_alt_names[aid]}**")
-
-                    for i, r_aid in enumerate(alt_ids):
-                        cols_r = st.columns([1.5] + [1] * num_alternatives)
-                        cols_r[0].markdown(f"**{st.session_state.ahp_manual_alt_names[r_aid]}**")
-                        for j, c_aid in enumerate(alt_ids):
-                            key = f"ahp_alt_matrix_{crit_id}_{i}_{j}"
-                            if i == j:
-                                cols_r[j+1].number_input(key, value=1.0, disabled=True, label_visibility="collapsed")
-                                st.session_state[key] = 1.0
-                            else:
-                                matrix_key = f"ahp_alt_matrix_{crit_id}"
-                                is_reciprocal = st.session_state.get(f"{key}_val") is not None and key not in st.session_state
-                                value = st.session_state.get(f"{key}_val", st.session_state.get(key, 1.0))
-                                cols_r[j+1].number_input(key, min_value=0.0, value=float(value), key=key, on_change=update_reciprocal, args=(matrix_key, i, j), label_visibility="collapsed", disabled=is_reciprocal)
+            alt_labels = store.alt_names.tolist()
+            tabs = st.tabs([str(name) or str(cid) for cid, name in zip(store.crit_ids, store.crit_names)])
+            for k in range(store.n_criteria):
+                with tabs[k]:
+                    pairwise_editor(store, k, alt_labels)
 
         # --- UI MANUAL SAW/WP/TOPSIS ---
         else:
             # Bagian Input Kriteria & Alternatif
-            num_criteria = st.number_input("Jumlah Kriteria", 1, 50, len(st.session_state.criteria) or 3)
-            if len(st.session_state.criteria) != num_criteria:
-                st.session_state.criteria = [Criterion(f"C{i+1}", f"Kriteria {i+1}", 1.0, 'benefit') for i in range(num_criteria)]
-
-            # Bagian Input Kriteria
-            cols_crit = st.columns(num_criteria)
-            for i, crit in enumerate(st.session_state.criteria):
-                with cols_crit[i]:
-                    st.markdown(f"**Kriteria {i+1}**")
-                    crit.id = f"C{i+1}"
-                    crit.name = st.text_input("Nama", crit.name, key=f"crit_name_{i}")
-                    crit.weight = st.number_input("Bobot", 0.0, value=float(crit.weight), key=f"crit_weight_{i}")
-                    crit.attribute = st.selectbox("Atribut", ['benefit', 'cost'], index=0 if crit.attribute == 'benefit' else 1, key=f"crit_attr_{i}")
-            
-            # Bagian Input Alternatif
-            num_alternatives = st.number_input("Jumlah Alternatif", 1, 200, len(st.session_state.alternatives) or 3)
-            if len(st.session_state.alternatives) != num_alternatives:
-                st.session_state.alternatives = [Alternative(f"A{i+1}", f"Alternatif {i+1}", {c.id: 1.0 for c in st.session_state.criteria}) for i in range(num_alternatives)]
-
-            header_cols = st.columns([2] + [1] * num_criteria)
-            header_cols[0].markdown("**Nama Alternatif**")
-            for i, crit in enumerate(st.session_state.criteria):
-                header_cols[i+1].markdown(f"**{crit.name}**")
-            
-            for i, alt in enumerate(st.session_state.alternatives):
-                alt.id = f"A{i+1}"
-                row_cols = st.columns([2] + [1] * num_criteria)
-                alt.name = row_cols[0].text_input(f"Nama Alt {i+1}", alt.name, key=f"alt_name_{i}", label_visibility="collapsed")
-                for j, crit in enumerate(st.session_state.criteria):
-                    alt.values[crit.id] = row_cols[j+1].number_input(crit.id, value=float(alt.values.get(crit.id, 1.0)), key=f"alt_val_{i}_{j}", label_visibility="collapsed")
-    
+            dm = st.session_state.decision_matrix
+            num_criteria = st.number_input("Jumlah Kriteria", 1, MAX_MANUAL_CRITERIA, (dm.n_criteria if dm is not None else 0) or 3)
+            num_alternatives_prev = (dm.n_alternatives if dm is not None else 0) or 3
+            if dm is None:
+                dm = DecisionMatrix.default(num_alternatives_prev, num_criteria)
+            elif dm.n_criteria != num_criteria:
+                dm = dm.resize(dm.n_alternatives, num_criteria)
+
+            dm.set_criterion_ids([f"C{j+1}" for j in range(num_criteria)])
+            num_alternatives = st.number_input("Jumlah Alternatif", 1, MAX_MANUAL_ALTERNATIVES, num_alternatives_prev)
+            if dm.n_alternatives != num_alternatives:
+                dm = dm.resize(num_alternatives, num_criteria)
+            st.session_state.decision_matrix = dm
+            dm.alt_ids[:] = [f"A{i+1}" for i in range(num_alternatives)]
+
+            edit_mode = st.radio("Mode Input", ["Grid (Tabel)", "Formulir per Sel"], horizontal=True,
+                                 help="Mode grid memakai satu tabel untuk seluruh matriks dan mendukung tempel (Ctrl+V) dari spreadsheet.")
+            if edit_mode == "Grid (Tabel)":
+                # Bagian Input Kriteria (satu grid)
+                st.write("**Kriteria**")
+                crit_grid = grid_session("dm_criteria_grid", dm, criteria_base)
+                st.data_editor(crit_grid["base"], key=crit_grid["key"], num_rows="fixed", hide_index=True, use_container_width=True,
+                               on_change=apply_criteria_edits, column_config={
+                                   "kode": st.column_config.TextColumn("Kode", disabled=True),
+                                   "nama": st.column_config.TextColumn("Nama"),
+                                   "bobot": st.column_config.NumberColumn("Bobot", min_value=0.0),
+                                   "atribut": st.column_config.SelectboxColumn("Atribut", options=['benefit', 'cost'], required=True),
+                               })
+
+                # Bagian Input Alternatif (satu grid, hanya sel yang berubah yang diterapkan ke matriks)
+                st.write("**Nilai Alternatif**")
+                value_grid = grid_session("dm_value_grid", dm, values_base)
+                st.data_editor(value_grid["base"], key=value_grid["key"], num_rows="fixed", hide_index=True, use_container_width=True,
+                               on_change=apply_value_edits, column_config={
+                                   "nama": st.column_config.TextColumn("Nama Alternatif"),
+                                   **{str(j): st.column_config.NumberColumn(f"{dm.crit_names[j]} ({dm.crit_ids[j]})") for j in range(num_criteria)},
+                               })
+
+                with st.expander("📋 Tempel Tabel dari Spreadsheet"):
+                    st.caption("Kolom pertama = nama alternatif, kolom berikutnya = nilai kriteria. Baris header (nama kriteria) opsional. "
+                               "Jumlah alternatif dan kriteria mengikuti tabel yang ditempel.")
+                    st.text_area("Tabel", key="dm_paste_text", height=150, label_visibility="collapsed")
+                    st.button("📥 Terapkan Tabel", on_click=apply_pasted_table)
+                    if st.session_state.get("dm_paste_error"):
+                        st.error(f"❌ Gagal membaca tabel: {st.session_state.dm_paste_error}")
+            else:
+                # Bagian Input Kriteria
+                cols_crit = st.columns(num_criteria)
+                for j in range(num_criteria):
+                    with cols_crit[j]:
+                        st.markdown(f"**Kriteria {j+1}**")
+                        dm.crit_names[j] = st.text_input("Nama", dm.crit_names[j], key=f"crit_name_{j}")
+                        dm.weights[j] = st.number_input("Bobot", 0.0, value=float(dm.weights[j]), key=f"crit_weight_{j}")
+                        dm.attributes[j] = st.selectbox("Atribut", ['benefit', 'cost'], index=0 if dm.attributes[j] == 'benefit' else 1, key=f"crit_attr_{j}")
+
+                # Bagian Input Alternatif
+                header_cols = st.columns([2] + [1] * num_criteria)
+                header_cols[0].markdown("**Nama Alternatif**")
+                for j in range(num_criteria):
+                    header_cols[j+1].markdown(f"**{dm.crit_names[j]}**")
+                for i in range(num_alternatives):
+                    row_cols = st.columns([2] + [1] * num_criteria)
+                    dm.alt_names[i] = row_cols[0].text_input(f"Nama Alt {i+1}", dm.alt_names[i], key=f"alt_name_{i}", label_visibility="collapsed")
+                    for j in range(num_criteria):
+                        dm.values[i, j] = row_cols[j+1].number_input(dm.crit_ids[j], value=float(dm.values[i, j]), key=f"alt_val_{i}_{j}", label_visibility="collapsed")
+
     # ===========================
     # PERIKSA APAKAH DATA SIAP & TAMPILKAN
     # ===========================
     data_is_ready = False
     if is_ahp:
         if (input_method == "Upload File (CSV/XLSX)" and "df_ahp_criteria" in st.session_state) or \
-           (input_method == "Input Manual" and st.session_state.ahp_manual_crit_names):
+           (input_method == "Input Manual" and st.session_state.ahp_store is not None):
             data_is_ready = True
-    elif st.session_state.criteria and st.session_state.alternatives:
+    elif st.session_state.decision_matrix is not None and st.session_state.decision_matrix.n_alternatives:
         data_is_ready = True
 
     if data_is_ready:
@@ -728,12 +515,71 @@ def main():
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("**Kriteria:**")
-                df_crit_display = pd.DataFrame([{'ID': c.id, 'Nama': c.name, 'Bobot': c.weight, 'Atribut': c.attribute} for c in st.session_state.criteria])
-                st.dataframe(df_crit_display, use_container_width=True, hide_index=True)
+                st.dataframe(st.session_state.decision_matrix.criteria_frame(), use_container_width=True, hide_index=True)
             with col2:
                 st.markdown("**Alternatif:**")
-                df_alt_display_data = [{'Nama': alt.name or alt.id, **{c.name: alt.values.get(c.id, 0.0) for c in st.session_state.criteria}} for alt in st.session_state.alternatives]
-                st.dataframe(pd.DataFrame(df_alt_display_data), use_container_width=True, hide_index=True)
+                st.dataframe(st.session_state.decision_matrix.alternatives_frame(), use_container_width=True, hide_index=True)
+
+            # --- SKENARIO BOBOT ---
+            with st.expander("🔀 Analisis Skenario Bobot (What-if)"):
+                st.caption("Unggah file dengan satu baris per skenario dan satu kolom per kode kriteria (mis. `C1`, `C2`, ...).")
+                scenario_file = st.file_uploader("File skenario bobot (CSV/XLSX)", type=['csv', 'xlsx', 'xls'], key="scenario_file")
+                if scenario_file is not None and st.button("Hitung Skenario", use_container_width=True):
+                    try:
+                        dm = st.session_state.decision_matrix
+                        df_scenarios = pd.read_excel(scenario_file) if scenario_file.name.lower().endswith(('.xls', '.xlsx')) else pd.read_csv(scenario_file)
+                        weight_matrix = scenario_weights(dm, df_scenarios)
+                        _, df_summary, df_per_scenario = calculate_scenarios(dm, METHOD_KEYS[method], weight_matrix)
+                        st.success(f"✅ {len(weight_matrix)} skenario dihitung.")
+                        st.markdown("**Ringkasan Perubahan Ranking per Alternatif:**")
+                        st.dataframe(df_summary, use_container_width=True, hide_index=True)
+                        st.markdown("**Ringkasan per Skenario:**")
+                        st.dataframe(df_per_scenario, use_container_width=True, hide_index=True)
+                    except Exception as e:
+                        st.error(f"❌ Terjadi kesalahan saat menghitung skenario: {e}")
+
+            # --- ANALISIS SENSITIVITAS (SMAA) ---
+            with st.expander("🎲 Analisis Sensitivitas Bobot (SMAA)"):
+                c1, c2, c3, c4 = st.columns(4)
+                n_samples = c1.number_input("Jumlah Sampel", 1000, 10_000_000, 10_000, step=1000)
+                smaa_mode = c2.selectbox("Sampling Bobot", ["Dirichlet (tanpa preferensi)", "Interval ± dari Bobot"])
+                spread = c3.number_input("Rentang ± Bobot", 0.0, 1.0, 0.1, step=0.05, disabled=smaa_mode.startswith("Dirichlet"))
+                value_noise = c4.number_input("Gangguan Nilai Matriks ±", 0.0, 1.0, 0.0, step=0.01)
+                if st.button("Hitung SMAA", use_container_width=True):
+                    try:
+                        with st.spinner("Mengambil sampel..."):
+                            result, df_accept, df_central = calculate_smaa(
+                                st.session_state.decision_matrix, METHOD_KEYS[method], n_samples=int(n_samples),
+                                mode="dirichlet" if smaa_mode.startswith("Dirichlet") else "interval",
+                                spread=spread, value_noise=value_noise, workers=SMAA_WORKERS)
+                        st.success(f"✅ {result.n_samples} sampel dihitung.")
+                        st.markdown("**Rank Acceptability Index:**")
+                        st.dataframe(df_accept.head(1000), use_container_width=True, hide_index=True)
+                        st.markdown("**Bobot Sentral (rata-rata bobot saat alternatif menjadi peringkat 1):**")
+                        st.dataframe(df_central, use_container_width=True, hide_index=True)
+                    except Exception as e:
+                        st.error(f"❌ Terjadi kesalahan saat menghitung SMAA: {e}")
+
+            # --- PERBANDINGAN SEMUA METODE ---
+            with st.expander("⚖️ Bandingkan Semua Metode (SAW, WP, TOPSIS)"):
+                st.caption("Ketiga metode dihitung dari matriks yang sama, lalu digabung menjadi ranking konsensus "
+                           f"(poin Borda; seri dipecah skor Copeland jika alternatif ≤ {compare.COPELAND_MAX_ALTERNATIVES:,}).")
+                if st.button("Bandingkan Metode", use_container_width=True):
+                    try:
+                        with st.spinner("Menghitung ketiga metode..."):
+                            result, df_compare, df_spearman, df_kendall = calculate_comparison(st.session_state.decision_matrix)
+                        st.success(f"✅ {len(df_compare):,} alternatif dibandingkan.")
+                        st.markdown("**Ranking per Metode & Konsensus:**")
+                        st.dataframe(df_compare, use_container_width=True, hide_index=True, lazy=len(df_compare) > STEP_LAZY_ROWS)
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.markdown("**Korelasi Spearman:**")
+                            st.dataframe(df_spearman.style.format("{:.4f}"), use_container_width=True)
+                        with col2:
+                            st.markdown("**Korelasi Kendall (tau-b):**")
+                            st.dataframe(df_kendall.style.format("{:.4f}"), use_container_width=True)
+                    except Exception as e:
+                        st.error(f"❌ Terjadi kesalahan saat membandingkan metode: {e}")
         
         # ===========================
         # TOMBOL HITUNG & TAMPILKAN HASIL
@@ -742,13 +588,10 @@ def main():
         if st.button("🏆 Hitung Ranking", type="primary", use_container_width=True):
             with st.spinner("Menghitung..."):
                 try:
-                    steps, ranking = [], pd.DataFrame()
-                    if method == "Simple Additive Weighting (SAW)":
-                        steps, ranking = calculate_saw(st.session_state.criteria, st.session_state.alternatives)
-                    elif method == "Weighted Product (WP)":
-                        steps, ranking = calculate_wp(st.session_state.criteria, st.session_state.alternatives)
-                    elif method == "Technique for Order Preference by Similarity to Ideal Solution (TOPSIS)":
-                        steps, ranking = calculate_topsis(st.session_state.criteria, st.session_state.alternatives)
+                    steps, ranking, hit = [], pd.DataFrame(), False
+                    if method in METHOD_KEYS:
+                        with profiling.stage("hitung", st.session_state.decision_matrix.values.shape):
+                            (steps, ranking), hit = calculate_cached(METHOD_KEYS[method], st.session_state.decision_matrix, top_k=top_k or None, lookup=lookup)
                     elif method == "Analytical Hierarchy Process (AHP)":
                         df_crit, df_alt = None, None
                         if input_method == "Input Manual":
@@ -757,35 +600,40 @@ def main():
                              df_crit, df_alt = st.session_state.df_ahp_criteria, st.session_state.df_ahp_alternatives
                         
                         if df_crit is not None and df_alt is not None:
-                            steps, ranking = calculate_ahp(df_crit, df_alt)
+                            with profiling.stage("hitung", df_alt.shape):
+                                (steps, ranking), hit = calculate_cached("ahp", df_crit, df_alt, top_k=top_k or None, lookup=lookup, weight_method=ahp_weight_method)
                         else:
                             st.warning("⚠️ Data AHP belum lengkap. Harap isi atau unggah data.")
                             st.stop()
                     
-                    st.success("✅ Perhitungan selesai!")
-            
-                    st.header("🏆 Hasil Akhir")
-
-                    def highlight_top3(row):
-                        color = ''
-                        if row.Ranking == 1: color = 'background-color: #AF93D7'
-                        elif row.Ranking == 2: color = 'background-color: #C7AFE1'
-                        elif row.Ranking == 3: color = 'background-color: #E1CEF0'
-                        return [color] * len(row)
-
-                    st.dataframe(
-                        ranking.style.apply(highlight_top3, axis=1).format({ranking.columns[1]: "{:.4f}"}),
-                        use_container_width=True, hide_index=True
-                    )
-
-            
-                    st.header("📝 Langkah Perhitungan")
-                    for title, df in steps:
-                        with st.expander(title): st.dataframe(df, use_container_width=True)
-
+                    st.success("✅ Perhitungan selesai!" + (" (⚡ diambil dari cache)" if hit else ""))
+                    # Hasil disimpan di sesi agar tetap tampil saat expander/halaman tabel memicu rerun
+                    st.session_state.calc_result = {"method": method, "steps": steps, "ranking": ranking, "top_k": top_k, "lookup": lookup}
                 except Exception as e:
+                    st.session_state.calc_result = None
                     st.error(f"❌ Terjadi kesalahan saat menghitung: {e}")
 
+        calc_result = st.session_state.get("calc_result")
+        if calc_result is not None and calc_result["method"] == method:
+            ranking = calc_result["ranking"]
+            st.header("🏆 Hasil Akhir")
+            if calc_result["top_k"]:
+                st.caption(f"Menampilkan {calc_result['top_k']} alternatif teratas" + (" ditambah alternatif yang dicari (dengan ranking aslinya)." if calc_result["lookup"] else "."))
+
+            render_ranking(ranking)
+
+            st.header("📝 Langkah Perhitungan")
+            steps = calc_result["steps"]
+            method_key = METHOD_KEYS.get(method, "ahp")
+            col_xlsx, col_zip = st.columns(2)
+            with col_xlsx:
+                st.download_button("⬇️ Unduh Laporan Excel (XLSX)", data=lambda: export_workbook(steps, ranking, BytesIO()).getvalue(),
+                                   file_name=f"laporan_{method_key}.xlsx", mime=XLSX_MIME)
+            with col_zip:
+                st.download_button("⬇️ Unduh Semua Matriks Langkah (ZIP Parquet)", data=lambda: export_bundle(steps, ranking, "parquet"),
+                                   file_name=f"langkah_{method_key}.zip", mime="application/zip")
+            render_steps(steps)
+
 # ============================
 # MAIN ENTRY POINT
 # ============================
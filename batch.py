@@ -0,0 +1,373 @@
+# Nama Program    : batch.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Eksekutor batch multi-proses untuk ribuan masalah keputusan yang saling lepas (mis. satu per
+#                   wilayah/lini produk). Input berupa tabel long-format dengan kolom kode masalah, atau folder
+#                   pasangan file seperti sample_data/. Matriks tabel long-format dibagikan ke worker lewat shared
+#                   memory (worker hanya menerima batas baris & kolom), hasil ditulis berurutan secara streaming.
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import engine
+from cli import discover_sets, expand_inputs
+from mcdm import (EXPORT_FORMATS, _export_frame, _pyarrow, calculate_ahp, load_decision_matrix_file, parse_criteria,
+                  read_alternatives, read_table, table_format)
+
+BATCH_METHODS = ("saw", "wp", "topsis", "ahp")
+PROBLEM_COLUMN = "Kode Masalah"
+FLUSH_ROWS = 100_000  # Baris hasil yang ditampung sebelum ditulis ke file output
+
+# ============================
+# SHARED MEMORY
+# ============================
+class SharedArray:
+    """Array NumPy di atas blok shared memory. Pemilik (proses induk) membuat & menghapus blok, worker hanya attach."""
+    __slots__ = ("shm", "array", "owner")
+
+    def __init__(self, shm, shape, dtype, owner):
+        self.shm = shm
+        self.array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        self.owner = owner
+
+    @classmethod
+    def create(cls, shape, dtype, fill=None):
+        size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        shared = cls(shared_memory.SharedMemory(create=True, size=size), shape, dtype, True)
+        if fill is not None:
+            shared.array[...] = fill
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        name, shape, dtype = spec
+        return cls(shared_memory.SharedMemory(name=name), shape, dtype, False)
+
+    def spec(self):
+        return self.shm.name, self.array.shape, self.array.dtype.str
+
+    def close(self):
+        self.array = None  # Lepaskan view sebelum buffer ditutup
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+# Diisi initializer di setiap worker: {"values": SharedArray, "scores": ..., "ranks": ..., "methods": (...)}
+_WORKER = {}
+
+def _init_worker(specs, methods):
+    for key, spec in specs.items():
+        _WORKER[key] = SharedArray.attach(spec)
+    _WORKER["methods"] = methods
+
+def _score_block(task):
+    """
+    Hitung satu masalah tabel long-format langsung di shared memory: baris [start, stop) dan kolom `cols` dari
+    matriks nilai; skor & ranking ditulis ke blok output pada baris yang sama. Mengembalikan (indeks, error/None).
+    """
+    index, start, stop, cols, weights, benefit = task
+    try:
+        values = _WORKER["values"].array[start:stop, cols]
+        for m, method in enumerate(_WORKER["methods"]):
+            result = engine.score(method, values, weights, benefit)
+            _WORKER["scores"].array[start:stop, m] = result.scores
+            _WORKER["ranks"].array[start:stop, m] = result.ranks
+        return index, None
+    except Exception as e:
+        # Kesalahan satu masalah tidak boleh menghentikan pool.map untuk masalah lainnya
+        return index, error_message(e)
+
+def error_message(e):
+    return str(e) if isinstance(e, ValueError) else f"{type(e).__name__}: {e}"
+
+def print_error(problem, message):
+    """Laporan masalah yang gagal ke stderr (seperti cli.py), agar stdout hanya berisi progres."""
+    print(f"❌ {problem}: {message}", file=sys.stderr)
+
+# ============================
+# PROBLEM RESULT
+# ============================
+def result_frame(problem_col, problem, alt_ids, alt_names, scores, ranks, methods, top_k=None):
+    """
+    DataFrame hasil satu masalah: kode masalah, kode & nama alternatif, lalu Skor/Ranking per metode (metode yang
+    tidak berlaku untuk masalah ini bernilai kosong). Baris diurutkan menurut ranking metode pertama yang berlaku;
+    dengan `top_k`, hanya alternatif yang masuk k teratas pada salah satu metode yang ditulis.
+    """
+    applicable = np.flatnonzero(ranks.min(axis=0) > 0) if len(ranks) else np.empty(0, dtype=np.int64)
+    keep = np.arange(len(alt_ids))
+    if len(applicable):
+        order_ranks = ranks[:, applicable[0]]
+        if top_k:
+            keep = np.flatnonzero((ranks[:, applicable] <= top_k).any(axis=1))
+        keep = keep[np.argsort(order_ranks[keep], kind="stable")]
+    columns = {
+        problem_col: np.full(len(keep), problem, dtype=object),
+        "Kode Alternatif": np.asarray(alt_ids, dtype=object)[keep],
+        "Nama Alternatif": np.asarray(alt_names, dtype=object)[keep],
+    }
+    for m, method in enumerate(methods):
+        method_ranks = ranks[keep, m]
+        columns[f"Skor {method.upper()}"] = scores[keep, m]
+        columns[f"Ranking {method.upper()}"] = pd.arrays.IntegerArray(method_ranks, method_ranks <= 0)
+    return pd.DataFrame(columns)
+
+# ============================
+# LONG-FORMAT TABLE
+# ============================
+def _problem_criteria(df_alt, df_crit, problem_col, problems):
+    """Criterion per masalah: dari tabel kriteria per masalah, tabel kriteria bersama, atau kolom C1, C2, ... ."""
+    if df_crit is not None and problem_col in df_crit.columns:
+        groups = {key: group for key, group in df_crit.groupby(problem_col, sort=False)}
+        missing = [p for p in problems if p not in groups]
+        if missing:
+            raise ValueError(f"Kriteria untuk masalah '{missing[0]}' tidak ditemukan di tabel kriteria.")
+        return [parse_criteria(None, groups[p].reset_index(drop=True)) for p in problems]
+    shared = parse_criteria(df_alt, df_crit)
+    if not shared:
+        raise ValueError("Kriteria tidak ditemukan. Sertakan tabel kriteria atau kolom C1, C2, ... di tabel alternatif.")
+    return [shared] * len(problems)
+
+def iter_long(df_alt, df_crit=None, methods=("topsis",), problem_col=PROBLEM_COLUMN, workers=None, top_k=None,
+              on_error=print_error):
+    """
+    Hitung setiap masalah pada tabel long-format (satu baris per alternatif, kolom `problem_col` menandai masalah).
+    `df_crit` boleh berisi kolom `problem_col` (kriteria per masalah) atau tidak (kriteria sama untuk semua).
+    Matriks nilai semua masalah disusun sekali ke shared memory; worker menerima batas baris/kolom saja dan menulis
+    skor ke shared memory juga. Menghasilkan DataFrame hasil per masalah sesuai urutan kemunculan masalah;
+    masalah yang gagal dilewati dan dilaporkan lewat `on_error(kode masalah, pesan)`.
+    """
+    methods = tuple(m.lower() for m in methods)
+    if "ahp" in methods:
+        raise ValueError("AHP membutuhkan matriks perbandingan per masalah; gunakan folder pasangan file untuk AHP.")
+    if problem_col not in df_alt.columns:
+        raise ValueError(f"Kolom '{problem_col}' tidak ditemukan di tabel alternatif.")
+
+    # Susun ulang baris agar setiap masalah menempati blok baris yang berurutan (urutan kemunculan pertama)
+    codes, problems = pd.factorize(df_alt[problem_col], sort=False)
+    if (codes < 0).any():
+        raise ValueError(f"Kolom '{problem_col}' memiliki nilai kosong.")
+    order = np.argsort(codes, kind="stable")
+    bounds = np.r_[0, np.cumsum(np.bincount(codes, minlength=len(problems)))]
+    criteria = _problem_criteria(df_alt, df_crit, problem_col, list(problems))
+    crit_ids = list(dict.fromkeys(c.id for crits in criteria for c in crits))
+    column_of = {cid: j for j, cid in enumerate(crit_ids)}
+    alt_ids, alt_names, values = read_alternatives(df_alt.iloc[order].reset_index(drop=True), crit_ids)
+
+    tasks = [(i, int(bounds[i]), int(bounds[i + 1]), np.array([column_of[c.id] for c in crits], dtype=np.int64),
+              np.array([c.weight for c in crits], dtype=np.float64), np.array([c.attribute != "cost" for c in crits]))
+             for i, crits in enumerate(criteria)]
+    blocks = {
+        "values": SharedArray.create(values.shape, np.float64),
+        "scores": SharedArray.create((len(values), len(methods)), np.float64, np.nan),
+        "ranks": SharedArray.create((len(values), len(methods)), np.int64, 0),
+    }
+    try:
+        blocks["values"].array[...] = values
+        del values
+        specs = {key: block.spec() for key, block in blocks.items()}
+        for i, error in _pool_map(_score_block, tasks, workers, _init_worker, (specs, methods)):
+            start, stop = bounds[i], bounds[i + 1]
+            if error is not None:
+                on_error(problems[i], error)
+                continue
+            yield result_frame(problem_col, problems[i], alt_ids[start:stop], alt_names[start:stop],
+                               blocks["scores"].array[start:stop], blocks["ranks"].array[start:stop], methods, top_k)
+    finally:
+        for block in blocks.values():
+            block.close()
+
+# ============================
+# FOLDER PASANGAN FILE
+# ============================
+def _score_set(task):
+    """
+    Hitung satu set file (dibaca langsung di worker, jadi tidak ada matriks yang dikirim antar proses).
+    File AHP (alternatif berkolom 'Kriteria') hanya dihitung dengan AHP, file lain dengan SAW/WP/TOPSIS.
+    Mengembalikan (kode alternatif, nama, skor, ranking) atau pesan error.
+    """
+    item, methods, weight_method = task
+    try:
+        header = read_table(item.alternatives_path, nrows=0)
+        df_crit = read_table(item.criteria_path) if item.criteria_path else None
+        is_ahp = "Kriteria" in [str(c).strip() for c in header.columns]
+        if is_ahp:
+            if df_crit is None:
+                raise ValueError("AHP membutuhkan file kriteria (matriks perbandingan kriteria).")
+            df_alt = read_table(item.alternatives_path)
+            _, ranking = calculate_ahp(df_crit, df_alt, weight_method=weight_method, with_steps=False)
+            names = df_alt.drop_duplicates(subset=["Kode Alternatif"])
+            names = dict(zip(names["Kode Alternatif"], names["Nama Alternatif"]))
+            alt_ids = ranking["Alternatif"].to_numpy(dtype=object)
+            alt_names = np.array([names.get(a, "") for a in alt_ids], dtype=object)
+            n, ahp_scores, ahp_ranks = len(alt_ids), ranking["Skor Akhir"].to_numpy(dtype=float), ranking["Ranking"].to_numpy()
+        else:
+            dm = load_decision_matrix_file(item.alternatives_path, df_crit)
+            if dm is None:
+                raise ValueError("Kriteria tidak ditemukan.")
+            alt_ids, alt_names, n = dm.alt_ids, dm.alt_names, dm.n_alternatives
+
+        scores = np.full((n, len(methods)), np.nan)
+        ranks = np.zeros((n, len(methods)), dtype=np.int64)
+        for m, method in enumerate(methods):
+            if (method == "ahp") != is_ahp:
+                continue
+            if is_ahp:
+                scores[:, m], ranks[:, m] = ahp_scores, ahp_ranks
+            else:
+                result = engine.score(method, dm.values, dm.weights, dm.benefit)
+                scores[:, m], ranks[:, m] = result.scores, result.ranks
+        return alt_ids, alt_names, scores, ranks
+    except Exception as e:
+        return error_message(e)
+
+def iter_sets(sets, methods=BATCH_METHODS, workers=None, top_k=None, weight_method="approx", problem_col=PROBLEM_COLUMN,
+              log=print, on_error=print_error):
+    """
+    Hitung setiap InputSet di pool (nama set = kode masalah). Menghasilkan DataFrame hasil per set, berurutan;
+    set yang gagal dilaporkan lewat `on_error(nama set, pesan)`, set yang tidak cocok dengan metodenya lewat `log`.
+    """
+    methods = tuple(m.lower() for m in methods)
+    tasks = [(item, methods, weight_method) for item in sets]
+    for item, outcome in zip(sets, _pool_map(_score_set, tasks, workers)):
+        if isinstance(outcome, str):
+            on_error(item.name, outcome)
+            continue
+        alt_ids, alt_names, scores, ranks = outcome
+        if not (ranks > 0).any():
+            log(f"{item.name}: dilewati, format file tidak cocok untuk metode {', '.join(methods)}.")
+            continue
+        yield result_frame(problem_col, item.name, alt_ids, alt_names, scores, ranks, methods, top_k)
+
+# ============================
+# POOL & OUTPUT
+# ============================
+def _pool_map(func, tasks, workers=None, initializer=None, initargs=()):
+    """
+    executor.map berurutan di pool proses (spawn). Tugas dikirim dalam chunk agar overhead IPC per masalah kecil
+    tetap rendah; hasil tetap keluar sesuai urutan tugas sehingga output bisa ditulis secara streaming.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(64, len(tasks) // (workers * 8)))
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=initializer, initargs=initargs) as pool:
+        yield from pool.map(func, tasks, chunksize=chunksize)
+
+class TableSink:
+    """Penulis tabel bertahap (CSV, Parquet, atau Feather/Arrow IPC); hasil ditampung hingga FLUSH_ROWS baris."""
+
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.fmt = fmt or table_format(path)
+        if self.fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Format ekspor '{self.fmt}' tidak dikenal. Pilih salah satu dari: {', '.join(EXPORT_FORMATS)}.")
+        self.rows = 0
+        self._pending = []
+        self._pending_rows = 0
+        self._writer = None
+
+    def write(self, df):
+        self._pending.append(df)
+        self._pending_rows += len(df)
+        if self._pending_rows >= FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        df = _export_frame(pd.concat(self._pending, ignore_index=True))
+        self._pending, self._pending_rows = [], 0
+        if self.fmt == "csv":
+            df.to_csv(self.path, mode="a" if self.rows else "w", header=not self.rows, index=False)
+        else:
+            pa = _pyarrow()
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = (pa.parquet.ParquetWriter(self.path, table.schema) if self.fmt == "parquet"
+                                else pa.ipc.new_file(self.path, table.schema))
+            self._writer.write_table(table.cast(self._writer.schema) if self.fmt == "parquet" else table)
+        self.rows += len(df)
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+def write_results(frames, path, fmt=None):
+    """Tulis DataFrame hasil (generator iter_long/iter_sets) ke satu file secara streaming. Mengembalikan (masalah, baris)."""
+    problems = 0
+    with TableSink(path, fmt) as sink:
+        for df in frames:
+            sink.write(df)
+            problems += 1
+    return problems, sink.rows
+
+# ============================
+# ENTRY POINT
+# ============================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Hitung ranking untuk banyak masalah keputusan sekaligus di pool proses.",
+        epilog="Contoh: python batch.py --table semua.parquet --criteria kriteria.csv -m topsis -o hasil.parquet\n"
+               "        python batch.py 'data/**/*.csv' -m all -o hasil.csv")
+    parser.add_argument("inputs", nargs="*", help="File atau pola glob pasangan file kriteria/alternatif (satu set = satu masalah).")
+    parser.add_argument("--table", help="Tabel alternatif long-format (satu baris per alternatif, kolom kode masalah).")
+    parser.add_argument("--criteria", help="Tabel kriteria untuk --table; boleh berisi kolom kode masalah (kriteria per masalah).")
+    parser.add_argument("--problem-col", default=PROBLEM_COLUMN, help=f"Nama kolom kode masalah (default: '{PROBLEM_COLUMN}').")
+    parser.add_argument("-m", "--method", nargs="+", default=["all"], choices=list(BATCH_METHODS) + ["all"],
+                        help="Metode yang dijalankan (default: all; AHP hanya untuk folder pasangan file).")
+    parser.add_argument("-o", "--output", default="hasil_batch.csv", help="File output (.csv, .parquet, .feather).")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Jumlah proses worker (default: jumlah CPU).")
+    parser.add_argument("--top-k", type=int, default=None, help="Hanya tulis alternatif yang masuk k teratas per masalah.")
+    parser.add_argument("--ahp-weights", choices=["approx", "eigen"], default="approx",
+                        help="Metode bobot AHP: approx (default, normalisasi kolom) atau eigen (vektor eigen, skor sedikit berbeda).")
+    args = parser.parse_args(argv)
+    if bool(args.inputs) == bool(args.table):
+        parser.error("berikan salah satu: file/pola pasangan file, atau --table TABEL.")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    failed = []
+
+    def on_error(problem, message):
+        failed.append(problem)
+        print_error(problem, message)
+
+    try:
+        if args.table:
+            methods = [m for m in BATCH_METHODS if m != "ahp"] if "all" in args.method else args.method
+            df_crit = read_table(args.criteria) if args.criteria else None
+            frames = iter_long(read_table(args.table), df_crit, methods, args.problem_col, args.workers, args.top_k,
+                               on_error=on_error)
+        else:
+            methods = list(BATCH_METHODS) if "all" in args.method else list(dict.fromkeys(args.method))
+            sets = discover_sets(expand_inputs(args.inputs))
+            frames = iter_sets(sets, methods, args.workers, args.top_k, args.ahp_weights, args.problem_col,
+                               on_error=on_error)
+        problems, rows = write_results(frames, args.output)
+    except (ValueError, OSError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    print(f"Selesai: {problems} masalah ({len(failed)} gagal), {rows} baris → {args.output} "
+          f"dalam {(time.perf_counter() - start) * 1000:.1f} ms.")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
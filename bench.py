@@ -0,0 +1,282 @@
+# Nama Program    : bench.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Benchmark perhitungan DSS dengan data sintetis ber-seed: generator matriks keputusan
+#                   (N alternatif × M kriteria) dan matriks perbandingan AHP konsisten/tidak konsisten, pengukuran
+#                   waktu & memori puncak per tahap (baca, parse, metode, persiapan tampilan), serta file baseline
+#                   JSON untuk membandingkan hasil antar run.
+#
+#                   Contoh: python bench.py --matrix 1000x10 100000x20 --ahp 10x5 200x5 -o baseline.json
+#                           python bench.py --matrix 1000x10 --compare baseline.json
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import ahp
+import cache
+from mcdm import (calculate_ahp, calculate_saw, calculate_topsis, calculate_wp, load_decision_matrix, load_upload,
+                  parse_data, step_summary)
+from report import RANKING_STYLED_ROWS, highlight_top3
+
+BASELINE_VERSION = 1
+DEFAULT_MATRIX = ("1000x10", "100000x20")
+DEFAULT_AHP = ("10x5", "100x5")
+# Tahap yang lebih cepat dari ini tidak dianggap regresi (noise pengukuran)
+MIN_COMPARE_SECONDS = 0.005
+
+# ============================
+# GENERATOR DATA SINTETIS
+# ============================
+def _codes(prefix, n):
+    width = max(2, len(str(n)))
+    return [f"{prefix}{i:0{width}d}" for i in range(1, n + 1)]
+
+def generate_decision_problem(n_alt, n_crit, seed=0, cost_share=0.3):
+    """
+    (df_kriteria, df_alternatif) berformat sama seperti sample_data/SAW-*.csv. Nilai berskala berbeda per
+    kriteria (1–10 hingga ratusan) agar normalisasi dan WP ikut teruji; sebagian kriteria bertipe cost.
+    """
+    rng = np.random.default_rng(seed)
+    crit_ids = _codes("C", n_crit)
+    df_crit = pd.DataFrame({
+        "Kode Kriteria": crit_ids,
+        "Bobot": np.round(rng.dirichlet(np.ones(n_crit)), 4),
+        "Nama Kriteria": [f"Kriteria {i}" for i in range(1, n_crit + 1)],
+        "Atribut": np.where(rng.random(n_crit) < cost_share, "cost", "benefit"),
+    })
+    scales = 10.0 ** rng.integers(1, 4, size=n_crit)
+    values = np.round(rng.uniform(0.05, 1.0, size=(n_alt, n_crit)) * scales, 2)
+    df_alt = pd.DataFrame(values, columns=crit_ids)
+    df_alt.insert(0, "Kode Alternatif", _codes("A", n_alt))
+    df_alt["Nama Alternatif"] = [f"Alternatif {i}" for i in range(1, n_alt + 1)]
+    return df_crit, df_alt
+
+def generate_pairwise(rng, n, inconsistency=0.0):
+    """
+    Matriks perbandingan berpasangan n × n dari vektor prioritas acak. inconsistency = 0 menghasilkan
+    a_ij = w_i / w_j (CR = 0); > 0 mengalikan segitiga atas dengan gangguan log-normal lalu membulatkannya
+    ke skala Saaty 1/9..9, sehingga CR naik seiring besarnya gangguan.
+    """
+    weights = rng.dirichlet(np.ones(n))
+    matrix = weights[:, None] / weights[None, :]
+    if inconsistency > 0:
+        upper = np.triu_indices(n, 1)
+        noisy = matrix[upper] * np.exp(rng.normal(0.0, inconsistency, size=len(upper[0])))
+        log_scale = np.log(ahp.SAATY_SCALE)
+        snapped = ahp.SAATY_SCALE[np.abs(np.log(noisy)[:, None] - log_scale[None, :]).argmin(axis=1)]
+        matrix = np.ones((n, n))
+        matrix[upper] = snapped
+        matrix[upper[1], upper[0]] = 1.0 / snapped
+    return matrix
+
+def generate_ahp_problem(n_alt, n_crit, seed=0, inconsistency=0.0):
+    """(df_kriteria, df_alternatif) berformat sama seperti sample_data/AHP-*.csv (satu blok n_alt × n_alt per kriteria)."""
+    rng = np.random.default_rng(seed)
+    crit_ids = _codes("C", n_crit)
+    alt_ids = _codes("A", n_alt)
+    df_crit = pd.DataFrame(np.round(generate_pairwise(rng, n_crit, inconsistency), 4), columns=crit_ids)
+    df_crit.insert(0, "Kode Kriteria", crit_ids)
+    df_crit["Nama Kriteria"] = [f"Kriteria {i}" for i in range(1, n_crit + 1)]
+    df_crit["Atribut"] = "benefit"
+    blocks = np.round(np.concatenate([generate_pairwise(rng, n_alt, inconsistency) for _ in range(n_crit)]), 4)
+    df_alt = pd.DataFrame(blocks, columns=alt_ids)
+    df_alt.insert(0, "Kode Alternatif", alt_ids * n_crit)
+    df_alt["Nama Alternatif"] = [f"Alternatif {i}" for i in range(1, n_alt + 1)] * n_crit
+    df_alt["Kriteria"] = np.repeat(crit_ids, n_alt)
+    return df_crit, df_alt
+
+def parse_size(text):
+    """'1000x10' → (1000, 10)."""
+    match = re.fullmatch(r"\s*(\d+)\s*[xX×]\s*(\d+)\s*", text)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Ukuran '{text}' tidak valid, gunakan format NxM (mis. 1000x10).")
+    return int(match.group(1)), int(match.group(2))
+
+# ============================
+# PENGUKURAN
+# ============================
+def measure(func, repeat=3):
+    """
+    Jalankan `func` sekali tanpa diukur (pemanasan), `repeat` kali untuk waktu, lalu sekali lagi di bawah
+    tracemalloc untuk memori puncak (dipisah agar overhead tracemalloc tidak ikut ke waktu).
+    Mengembalikan (hasil, dict statistik).
+    """
+    result = func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, {
+        "seconds": statistics.median(times),
+        "seconds_min": min(times),
+        "seconds_all": times,
+        "peak_mb": peak / 1e6,
+    }
+
+def render_prep(steps, ranking):
+    """Tahap persiapan tampilan seperti di aplikasi: ringkasan langkah + baris teratas ranking berwarna (HTML)."""
+    head = ranking.iloc[:RANKING_STYLED_ROWS]
+    return step_summary(steps), head.style.apply(highlight_top3, axis=None).to_html()
+
+def _upload(name, data, is_ahp):
+    # Cache upload dikosongkan agar setiap pengukuran benar-benar membaca & mem-parse file
+    cache.UPLOAD_CACHE.clear()
+    return load_upload(name, data, is_ahp)[1]
+
+def _stage_runner(stages, repeat, log):
+    """Fungsi run(tahap, func): ukur func, simpan statistiknya ke `stages[tahap]`, cetak, dan kembalikan hasilnya."""
+    def run(stage, func):
+        value, stats = measure(func, repeat)
+        stages[stage] = stats
+        log(f"  {stage:<16} {stats['seconds'] * 1000:10.1f} ms  {stats['peak_mb']:9.1f} MB")
+        return value
+    return run
+
+def bench_matrix(n_alt, n_crit, seed, repeat, log=print):
+    """Ukur satu kasus SAW/WP/TOPSIS. Mengembalikan {tahap: statistik}."""
+    df_crit, df_alt = generate_decision_problem(n_alt, n_crit, seed)
+    crit_bytes = df_crit.to_csv(index=False).encode("utf-8")
+    alt_bytes = df_alt.to_csv(index=False).encode("utf-8")
+    stages = {}
+    run = _stage_runner(stages, repeat, log)
+
+    df_crit_read = run("baca", lambda: _upload("bench-kriteria.csv", crit_bytes, False))
+    df_alt_read = run("baca_alternatif", lambda: _upload("bench-alternatif.csv", alt_bytes, False))
+    dm = run("parse", lambda: load_decision_matrix(df_alt_read, df_crit_read))
+    run("parse_data", lambda: parse_data(df_alt_read, df_crit_read))
+    for method, calculate in (("saw", calculate_saw), ("wp", calculate_wp), ("topsis", calculate_topsis)):
+        steps, ranking = run(method, lambda: calculate(dm))
+        run(f"{method}_tampilan", lambda: render_prep(steps, ranking))
+    return stages
+
+def bench_ahp(n_alt, n_crit, seed, repeat, inconsistency, log=print):
+    """Ukur satu kasus AHP (n_alt × n_alt per kriteria). Mengembalikan {tahap: statistik}."""
+    df_crit, df_alt = generate_ahp_problem(n_alt, n_crit, seed, inconsistency)
+    crit_bytes = df_crit.to_csv(index=False).encode("utf-8")
+    alt_bytes = df_alt.to_csv(index=False).encode("utf-8")
+    stages = {}
+    run = _stage_runner(stages, repeat, log)
+
+    df_crit_read = run("baca", lambda: _upload("AHP-kriteria.csv", crit_bytes, True))
+    df_alt_read = run("baca_alternatif", lambda: _upload("AHP-alternatif.csv", alt_bytes, True))
+    steps, ranking = run("ahp", lambda: calculate_ahp(df_crit_read, df_alt_read))
+    run("ahp_tampilan", lambda: render_prep(steps, ranking))
+    return stages
+
+# ============================
+# BASELINE
+# ============================
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def compare_baseline(current, baseline, threshold):
+    """
+    Bandingkan waktu tercepat setiap tahap dengan baseline (lebih stabil daripada median terhadap gangguan
+    proses lain). Mengembalikan DataFrame perbandingan; kolom 'Regresi' = True jika rasio > threshold dan
+    tahap cukup lama untuk diukur andal.
+    """
+    rows = []
+    for case, stages in current["cases"].items():
+        old_stages = baseline.get("cases", {}).get(case, {})
+        for stage, stats in stages.items():
+            old = old_stages.get(stage)
+            if old is None:
+                continue
+            new_s, old_s = stats["seconds_min"], old["seconds_min"]
+            ratio = new_s / old_s if old_s > 0 else np.inf
+            rows.append({
+                "Kasus": case, "Tahap": stage,
+                "Baseline (ms)": old_s * 1000, "Sekarang (ms)": new_s * 1000, "Rasio": ratio,
+                "Memori Baseline (MB)": old["peak_mb"], "Memori Sekarang (MB)": stats["peak_mb"],
+                "Regresi": bool(ratio > threshold and max(new_s, old_s) >= MIN_COMPARE_SECONDS),
+            })
+    return pd.DataFrame(rows)
+
+# ============================
+# ENTRY POINT
+# ============================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark perhitungan SAW/WP/TOPSIS/AHP dengan data sintetis.")
+    parser.add_argument("--matrix", nargs="*", type=parse_size, default=None, metavar="NxM",
+                        help=f"Ukuran matriks keputusan, alternatif × kriteria (default: {' '.join(DEFAULT_MATRIX)}).")
+    parser.add_argument("--ahp", nargs="*", type=parse_size, default=None, metavar="NxM",
+                        help=f"Ukuran AHP, alternatif × kriteria (default: {' '.join(DEFAULT_AHP)}).")
+    parser.add_argument("--inconsistency", type=float, default=0.5,
+                        help="Gangguan log-normal matriks AHP; 0 = konsisten sempurna (default: 0.5).")
+    parser.add_argument("--seed", type=int, default=42, help="Seed generator data (default: 42).")
+    parser.add_argument("--repeat", type=int, default=3, help="Jumlah pengulangan pengukuran waktu (default: 3).")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="File hasil JSON (default: bench_results.json).")
+    parser.add_argument("--compare", metavar="BASELINE", help="File baseline JSON untuk dibandingkan.")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Rasio waktu terhadap baseline yang dianggap regresi (default: 1.25).")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    matrix_sizes = args.matrix if args.matrix is not None else [parse_size(s) for s in DEFAULT_MATRIX]
+    ahp_sizes = args.ahp if args.ahp is not None else [parse_size(s) for s in DEFAULT_AHP]
+
+    cases = {}
+    for n_alt, n_crit in matrix_sizes:
+        name = f"matrix_{n_alt}x{n_crit}"
+        print(f"{name}:")
+        cases[name] = bench_matrix(n_alt, n_crit, args.seed, args.repeat)
+    for n_alt, n_crit in ahp_sizes:
+        name = f"ahp_{n_alt}x{n_crit}"
+        print(f"{name}:")
+        cases[name] = bench_ahp(n_alt, n_crit, args.seed, args.repeat, args.inconsistency)
+
+    current = {
+        "version": BASELINE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "config": {"seed": args.seed, "repeat": args.repeat, "inconsistency": args.inconsistency},
+        "cases": cases,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"Hasil ditulis ke {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config", {}).get("seed") != args.seed:
+            print("⚠️  Seed baseline berbeda; data yang diukur tidak identik.")
+        table = compare_baseline(current, baseline, args.threshold)
+        if table.empty:
+            print("Tidak ada kasus/tahap yang sama dengan baseline.")
+            return 0
+        print(table.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+        regressions = table[table["Regresi"]]
+        if len(regressions):
+            print(f"❌ {len(regressions)} tahap lebih lambat dari {args.threshold:.2f}× baseline.")
+            return 1
+        print("✅ Tidak ada regresi.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# Nama Program    : cache.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Cache LRU berbasis hash isi data untuk hasil perhitungan MCDM. Modul ini diimpor sekali per
+#                   proses server sehingga cache dipakai bersama oleh semua sesi Streamlit, tidak ikut ter-reset
+#                   saat skrip dijalankan ulang.
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# ============================
+# HASHING
+# ============================
+def _update(h, obj):
+    """Masukkan satu nilai ke hasher: array lewat bytes mentahnya, teks/angka lewat repr."""
+    if isinstance(obj, np.ndarray) and obj.dtype != object:
+        arr = np.ascontiguousarray(obj)
+        h.update(f"{arr.dtype.str}{arr.shape}".encode())
+        h.update(memoryview(arr).cast("B"))
+    elif isinstance(obj, pd.DataFrame):
+        h.update(repr(list(obj.columns)).encode())
+        h.update(memoryview(np.ascontiguousarray(pd.util.hash_pandas_object(obj, index=True).to_numpy())).cast("B"))
+    elif isinstance(obj, (list, tuple, np.ndarray)):
+        h.update(f"[{len(obj)}]".encode())
+        h.update("\x1f".join(map(str, obj)).encode("utf-8", "surrogatepass"))
+    else:
+        h.update(repr(obj).encode())
+    h.update(b"\x1e")
+
+def content_key(*parts):
+    """Hash isi (bukan identitas objek) dari semua bagian kunci."""
+    h = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        _update(h, part)
+    return h.hexdigest()
+
+def estimate_nbytes(obj):
+    """Perkiraan ukuran memori hasil (DataFrame, array, dan list/tuple berisi keduanya)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=False).sum())
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (list, tuple)):
+        return sum(estimate_nbytes(o) for o in obj) + 64 * len(obj)
+    return 64
+
+# ============================
+# LRU CACHE
+# ============================
+class LRUCache:
+    """Cache LRU thread-safe dengan batas jumlah item dan total byte, serta penghitung hit/miss."""
+
+    def __init__(self, max_items=64, max_bytes=512 * 1024 * 1024):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, nbytes=None):
+        nbytes = estimate_nbytes(value) if nbytes is None else nbytes
+        with self._lock:
+            if nbytes > self.max_bytes:
+                return  # Terlalu besar untuk disimpan
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._data[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while len(self._data) > self.max_items or self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Ambil dari cache, atau hitung lalu simpan. Mengembalikan (nilai, hit)."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value, True
+        value = compute()
+        self.put(key, value)
+        return value, False
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "items": len(self._data),
+                "bytes": self.nbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+# Cache hasil perhitungan dan file upload yang sudah di-parse, dipakai bersama oleh semua sesi pada server yang sama
+RESULT_CACHE = LRUCache(max_items=64, max_bytes=512 * 1024 * 1024)
+UPLOAD_CACHE = LRUCache(max_items=32, max_bytes=1024 * 1024 * 1024)
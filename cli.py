@@ -0,0 +1,204 @@
+# Nama Program    : cli.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Runner batch baris perintah untuk SAW, WP, AHP, dan TOPSIS tanpa Streamlit. Menerima pasangan file
+#                   kriteria/alternatif dengan format yang sama seperti sample_data/ (CSV, XLSX, Parquet, atau Feather;
+#                   path atau pola glob), menjalankan satu atau beberapa metode, menulis ranking (dan opsional matriks
+#                   langkah) ke CSV/Parquet/Feather, dan mencetak waktu setiap tahap.
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from contextlib import nullcontext
+
+import profiling
+from mcdm import (EXPORT_FORMATS, SAMPLE_ROWS, alternative_columns, calculate_ahp, calculate_saw, calculate_topsis,
+                  calculate_wp, classify_upload, export_steps, load_decision_matrix, parse_criteria, read_table, write_table)
+from report import export_workbook
+
+CALCULATORS = {"saw": calculate_saw, "wp": calculate_wp, "topsis": calculate_topsis, "ahp": calculate_ahp}
+KIND_PATTERN = re.compile(r"[-_ ]?(kriteria|criteria|alternatif|alternatives?)[-_ ]?", re.IGNORECASE)
+
+# ============================
+# INPUT DISCOVERY
+# ============================
+class InputSet:
+    """Satu set input: nama set, file kriteria (boleh None), dan file alternatif."""
+    __slots__ = ("name", "criteria_path", "alternatives_path")
+
+    def __init__(self, name, criteria_path=None, alternatives_path=None):
+        self.name = name
+        self.criteria_path = criteria_path
+        self.alternatives_path = alternatives_path
+
+def expand_inputs(patterns):
+    """Path atau pola glob (mis. 'data/*.csv', 'data/**/*.xlsx') menjadi daftar file unik terurut."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise ValueError(f"Tidak ada file yang cocok dengan pola '{pattern}'.")
+        paths.extend(p for p in matches if os.path.isfile(p))
+    return list(dict.fromkeys(paths))
+
+def file_kind(path):
+    """Jenis file dari nama (…-kriteria / …-alternatif), atau dari header + contoh baris jika nama tidak memuatnya."""
+    match = KIND_PATTERN.search(os.path.basename(path))
+    if match:
+        return "criteria" if match.group(1).lower() in ("kriteria", "criteria") else "alternatives"
+    return classify_upload(path, read_table(path, nrows=SAMPLE_ROWS), is_ahp=False)
+
+def discover_sets(paths):
+    """Kelompokkan file menjadi set berdasarkan nama tanpa penanda jenis, mis. SAW-kriteria.csv + SAW-alternatif.csv → 'SAW'."""
+    sets = {}
+    for path in paths:
+        kind = file_kind(path)
+        if kind is None:
+            raise ValueError(f"Jenis file '{path}' tidak dikenali sebagai file kriteria atau alternatif.")
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = KIND_PATTERN.sub("", stem) or stem
+        item = sets.setdefault(name, InputSet(name))
+        setattr(item, "criteria_path" if kind == "criteria" else "alternatives_path", path)
+    for item in sets.values():
+        if item.alternatives_path is None:
+            raise ValueError(f"Set '{item.name}' tidak memiliki file alternatif.")
+    return list(sets.values())
+
+# ============================
+# RUNNER
+# ============================
+class StageTimer:
+    """Pencatat waktu per tahap (ms) untuk satu set/metode."""
+
+    def __init__(self):
+        self.stages = {}
+
+    def __call__(self, stage, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.stages[stage] = self.stages.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+
+    def format(self):
+        return " | ".join(f"{stage} {ms:.1f} ms" for stage, ms in self.stages.items())
+
+def run_set(item, methods, output_dir, fmt="csv", top_k=None, weight_method="approx", report_skips=True,
+            with_steps=False, excel=False, profile=False, log=print):
+    """
+    Jalankan semua metode yang cocok untuk satu set. File AHP (file alternatif berkolom 'Kriteria') hanya
+    dihitung dengan AHP; file matriks keputusan dengan SAW/WP/TOPSIS, dan dari file matriks keputusan hanya
+    kolom kode, nama, dan kriteria yang dibaca. Jika `with_steps`, matriks setiap langkah ikut ditulis ke
+    folder `<set>_<metode>_langkah`; jika `excel`, laporan XLSX ditulis ke `<set>_<metode>_laporan.xlsx`;
+    jika `profile`, profil per tahap perhitungan (waktu, alokasi, ukuran) ditulis ke `<set>_<metode>_profil.json`.
+    Mengembalikan list path hasil.
+    """
+    timer = StageTimer()
+    header = timer("baca", read_table, item.alternatives_path, nrows=0)
+    df_crit = timer("baca", read_table, item.criteria_path) if item.criteria_path else None
+    is_ahp = "Kriteria" in [str(c).strip() for c in header.columns]
+    read_stages = dict(timer.stages)
+
+    df_alt = dm = None
+    outputs = []
+    for method in methods:
+        if (method == "ahp") != is_ahp:
+            if report_skips:
+                log(f"{item.name:<16} [{method}] dilewati: format file {'AHP' if is_ahp else 'matriks keputusan'} tidak cocok untuk metode ini.")
+            continue
+        timer.stages = dict(read_stages)
+        profiler = profiling.Profiler() if profile else None
+        with profiling.profiled(profiler) if profile else nullcontext():
+            if is_ahp:
+                if df_crit is None:
+                    raise ValueError(f"Set '{item.name}': AHP membutuhkan file kriteria (matriks perbandingan kriteria).")
+                if df_alt is None:
+                    df_alt = timer("baca", read_table, item.alternatives_path)
+                    read_stages = dict(timer.stages)
+                steps, ranking = timer("hitung", calculate_ahp, df_crit, df_alt, top_k=top_k,
+                                       weight_method=weight_method, with_steps=with_steps or excel)
+            else:
+                if dm is None:
+                    criteria = parse_criteria(header, df_crit)
+                    if not criteria:
+                        raise ValueError(f"Set '{item.name}': kriteria tidak ditemukan.")
+                    columns = alternative_columns(list(header.columns), [c.id for c in criteria])
+                    df_alt = timer("baca", read_table, item.alternatives_path, columns=columns)
+                    dm = timer("parse", load_decision_matrix, df_alt, df_crit)
+                    read_stages = dict(timer.stages)
+                steps, ranking = timer("hitung", CALCULATORS[method], dm, with_steps=with_steps or excel, top_k=top_k)
+        path = os.path.join(output_dir, f"{item.name}_{method}.{fmt}")
+        timer("tulis", write_table, ranking, path, fmt)
+        if with_steps:
+            timer("tulis", export_steps, steps, ranking, os.path.join(output_dir, f"{item.name}_{method}_langkah"), fmt)
+        if excel:
+            timer("tulis", export_workbook, steps, ranking, os.path.join(output_dir, f"{item.name}_{method}_laporan.xlsx"))
+        log(f"{item.name:<16} [{method}] {timer.format()} | {len(ranking)} baris → {path}")
+        if profiler is not None:
+            profile_path = os.path.join(output_dir, f"{item.name}_{method}_profil.json")
+            with open(profile_path, "w", encoding="utf-8") as f:
+                json.dump(profiler.summary(), f, ensure_ascii=False, indent=2)
+            hottest = profiler.hottest()
+            if hottest is not None:
+                log(f"{'':<16} [{method}] tahap terlama: {hottest['path']} {hottest['seconds'] * 1000:.1f} ms → {profile_path}")
+        outputs.append(path)
+    return outputs
+
+# ============================
+# ENTRY POINT
+# ============================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Hitung ranking SAW/WP/AHP/TOPSIS secara batch tanpa Streamlit.",
+        epilog="Contoh: python cli.py 'sample_data/*.csv' -m all -o hasil --format parquet")
+    parser.add_argument("inputs", nargs="*", help="File atau pola glob file kriteria/alternatif (dipasangkan berdasarkan nama).")
+    parser.add_argument("--set", nargs=2, action="append", default=[], metavar=("KRITERIA", "ALTERNATIF"),
+                        help="Pasangan file kriteria & alternatif secara eksplisit (boleh diulang).")
+    parser.add_argument("-m", "--method", nargs="+", default=["all"], choices=list(CALCULATORS) + ["all"],
+                        help="Metode yang dijalankan (default: all).")
+    parser.add_argument("-o", "--output-dir", default="hasil", help="Folder output (default: hasil).")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="Format file output: csv, parquet, atau feather (default: csv).")
+    parser.add_argument("--steps", action="store_true", help="Tulis juga matriks setiap langkah perhitungan (satu file per langkah).")
+    parser.add_argument("--excel", action="store_true", help="Tulis laporan Excel: sheet ranking (top-3 diwarnai) + satu sheet per langkah.")
+    parser.add_argument("--profile", action="store_true", help="Catat waktu, alokasi memori, dan ukuran matriks setiap tahap ke <set>_<metode>_profil.json.")
+    parser.add_argument("--top-k", type=int, default=None, help="Hanya tulis k alternatif teratas.")
+    parser.add_argument("--ahp-weights", choices=["approx", "eigen"], default="approx",
+                        help="Metode bobot AHP: approx (default, normalisasi kolom) atau eigen (vektor eigen, skor sedikit berbeda).")
+    args = parser.parse_args(argv)
+    if not args.inputs and not args.set:
+        parser.error("berikan minimal satu file/pola input atau --set KRITERIA ALTERNATIF.")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    methods = list(CALCULATORS) if "all" in args.method else list(dict.fromkeys(args.method))
+    try:
+        sets = discover_sets(expand_inputs(args.inputs)) if args.inputs else []
+        for criteria_path, alternatives_path in args.set:
+            name = KIND_PATTERN.sub("", os.path.splitext(os.path.basename(alternatives_path))[0]) or "set"
+            sets.append(InputSet(name, criteria_path, alternatives_path))
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    failed = 0
+    start = time.perf_counter()
+    for item in sets:
+        try:
+            run_set(item, methods, args.output_dir, args.format, args.top_k, args.ahp_weights,
+                    report_skips="all" not in args.method, with_steps=args.steps, excel=args.excel,
+                    profile=args.profile)
+        except Exception as e:
+            failed += 1
+            print(f"❌ {item.name}: {e}", file=sys.stderr)
+    print(f"Selesai: {len(sets) - failed}/{len(sets)} set dalam {(time.perf_counter() - start) * 1000:.1f} ms.")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
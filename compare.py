@@ -0,0 +1,237 @@
+# Nama Program    : compare.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Perbandingan SAW, WP, dan TOPSIS pada satu matriks keputusan. Validasi, normalisasi bobot,
+#                   dan statistik kolom dihitung sekali lalu dipakai bersama oleh ketiga metode yang dijalankan
+#                   paralel. Hasilnya digabung menjadi ranking konsensus (Borda, Copeland) dan matriks korelasi
+#                   ranking antar metode (Spearman, Kendall tau-b), semuanya tanpa loop per alternatif.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import engine
+
+COMPARE_METHODS = ("saw", "wp", "topsis")
+# Copeland membandingkan setiap pasangan alternatif (O(n²)); di atas batas ini hanya Borda yang dihitung
+COPELAND_MAX_ALTERNATIVES = 10_000
+# Batas memori kasar untuk satu blok perbandingan pasangan (metode × blok × alternatif)
+CHUNK_BYTES = 32 * 1024 * 1024
+
+# ============================
+# DATA TYPES
+# ============================
+class ComparisonResult:
+    """
+    Hasil perbandingan metode: `scores` & `ranks` berukuran (metode × alternatif), skor `borda` dan
+    `copeland` (None jika alternatif terlalu banyak), `consensus_ranks` (Borda, seri dipecah Copeland),
+    serta matriks korelasi `spearman` & `kendall` (metode × metode).
+    """
+    __slots__ = ("methods", "scores", "ranks", "borda", "copeland", "consensus_ranks", "spearman", "kendall")
+
+    def __init__(self, methods, scores, ranks, borda, copeland, consensus_ranks, spearman, kendall):
+        self.methods = methods
+        self.scores = scores
+        self.ranks = ranks
+        self.borda = borda
+        self.copeland = copeland
+        self.consensus_ranks = consensus_ranks
+        self.spearman = spearman
+        self.kendall = kendall
+
+# ============================
+# SKOR BERSAMA
+# ============================
+class SharedMatrix:
+    """Matriks, bobot ternormalisasi, dan statistik kolom yang dipakai bersama oleh SAW, WP, dan TOPSIS."""
+    __slots__ = ("matrix", "weights", "benefit", "col_max", "col_min")
+
+    def __init__(self, matrix, weights, benefit):
+        matrix, weights, benefit = engine._prepare(matrix, weights, benefit)
+        self.matrix = matrix
+        self.weights = engine.normalize_weights(weights)
+        self.benefit = benefit
+        self.col_max = matrix.max(axis=0)
+        self.col_min = matrix.min(axis=0)
+
+    def saw(self):
+        return engine.saw_normalize(self.matrix, self.col_max, self.col_min, self.benefit) @ self.weights
+
+    def wp(self):
+        log_s, _ = engine.wp_log_s(self.matrix, np.where(self.benefit, self.weights, -self.weights))
+        return engine.wp_scores_from_log(log_s)
+
+    def topsis(self):
+        denominators = np.sqrt(np.sum(self.matrix ** 2, axis=0))
+        denominators[denominators == 0] = 1.0
+        weighted = self.matrix / denominators * self.weights
+        if np.all(self.weights >= 0):
+            # Nilai ekstrem kolom terbobot = nilai ekstrem kolom asli yang ditransformasi (monoton untuk w ≥ 0)
+            weighted_max = self.col_max / denominators * self.weights
+            weighted_min = self.col_min / denominators * self.weights
+        else:
+            weighted_max, weighted_min = weighted.max(axis=0), weighted.min(axis=0)
+        ideal_positive = np.where(self.benefit, weighted_max, weighted_min)
+        ideal_negative = np.where(self.benefit, weighted_min, weighted_max)
+        return engine.topsis_closeness(weighted, ideal_positive, ideal_negative)[2]
+
+def score_methods(matrix, weights, benefit, methods=COMPARE_METHODS, workers=None):
+    """Skor setiap metode (metode × alternatif); metode dijalankan paralel di thread karena NumPy melepas GIL."""
+    methods = [m.lower() for m in methods]
+    unknown = [m for m in methods if m not in COMPARE_METHODS]
+    if unknown:
+        raise ValueError(f"Metode '{unknown[0]}' tidak dikenal. Pilih dari: {', '.join(COMPARE_METHODS)}.")
+    shared = SharedMatrix(matrix, weights, benefit)
+    with ThreadPoolExecutor(max_workers=workers or len(methods)) as pool:
+        futures = [pool.submit(getattr(shared, m)) for m in methods]
+        return np.vstack([f.result() for f in futures])
+
+# ============================
+# KONSENSUS
+# ============================
+def borda_scores(ranks):
+    """Poin Borda: alternatif peringkat r pada satu metode mendapat n − r poin, dijumlahkan untuk semua metode."""
+    ranks = np.atleast_2d(ranks)
+    return (ranks.shape[1] - ranks).sum(axis=0)
+
+def copeland_scores(ranks):
+    """
+    Skor Copeland: jumlah alternatif yang dikalahkan mayoritas metode dikurangi jumlah yang mengalahkannya.
+    Pasangan dibandingkan per blok baris sehingga memori tetap kecil; waktu O(metode × n²).
+    """
+    ranks = np.atleast_2d(ranks).astype(np.int32)
+    n_methods, n = ranks.shape
+    block = max(1, CHUNK_BYTES // max(1, n))
+    scores = np.empty(n, dtype=np.int64)
+    votes = np.empty((min(block, n), n), dtype=np.int8)
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        # votes[i, j] = jumlah metode yang menempatkan i di atas j; ranking tiap metode tanpa seri,
+        # jadi sisanya (m − votes) menempatkan j di atas i, kecuali pada diagonal (i = j)
+        v = votes[:stop - start]
+        np.less(ranks[0, start:stop, None], ranks[0, None, :], out=v, casting="unsafe")
+        for r in ranks[1:]:
+            v += r[start:stop, None] < r[None, :]
+        wins = np.count_nonzero(2 * v > n_methods, axis=1)
+        losses = np.count_nonzero(2 * v < n_methods, axis=1) - 1
+        scores[start:stop] = wins - losses
+    return scores
+
+def consensus_ranking(borda, copeland=None):
+    """Ranking konsensus dari poin Borda; seri dipecah dengan skor Copeland (jika ada), lalu urutan input."""
+    keys = (-np.asarray(borda),) if copeland is None else (-np.asarray(copeland), -np.asarray(borda))
+    order = np.lexsort(keys)
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(1, len(order) + 1)
+    return ranks
+
+# ============================
+# KORELASI RANKING
+# ============================
+def average_ranks(values):
+    """Ranking (1 = terbesar) dengan nilai seri mendapat rata-rata ranking; NaN dianggap terendah."""
+    values = np.where(np.isnan(values), -np.inf, np.asarray(values, dtype=np.float64))
+    order = np.argsort(-values, kind="stable")
+    sorted_values = -values[order]
+    # Awal & akhir setiap kelompok nilai seri pada urutan terurut
+    starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+    ends = np.r_[starts[1:], len(values)]
+    group_ranks = (starts + ends + 1) / 2.0
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = np.repeat(group_ranks, ends - starts)
+    return ranks
+
+def spearman_matrix(scores):
+    """Korelasi Spearman antar baris skor = korelasi Pearson dari ranking rata-ratanya."""
+    scores = np.atleast_2d(scores)
+    if scores.shape[1] < 2:
+        return np.ones((len(scores), len(scores)))
+    ranks = np.vstack([average_ranks(s) for s in scores])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rho = np.corrcoef(ranks)
+    np.fill_diagonal(rho, 1.0)  # Ranking konstan tidak punya korelasi terdefinisi, kecuali dengan dirinya sendiri
+    return rho
+
+def count_inversions(values):
+    """
+    Jumlah pasangan i < j dengan values[i] > values[j] (nilai seri tidak dihitung), O(n log² n) secara vektor:
+    merge sort bottom-up, setiap level menghitung elemen kiri yang lebih besar lewat searchsorted.
+    """
+    values = np.asarray(values)
+    n = len(values)
+    if n < 2:
+        return 0
+    # Ranking padat 0..n-1 agar kunci (blok, nilai) muat di int64
+    dense = np.unique(values, return_inverse=True)[1].astype(np.int64).ravel()
+    positions = np.arange(n, dtype=np.int64)
+    total = 0
+    size = 1
+    while size < n:
+        block = positions // (2 * size)
+        in_right = (positions % (2 * size)) >= size
+        keys = block * n + dense
+        left_keys = keys[~in_right]          # Terurut: tiap setengah blok sudah terurut dari level sebelumnya
+        right_keys = keys[in_right]
+        right_block_end = (block[in_right] + 1) * n
+        total += int((np.searchsorted(left_keys, right_block_end, side="left")
+                      - np.searchsorted(left_keys, right_keys, side="right")).sum())
+        dense = np.sort(keys) - block * n    # Gabungkan setiap blok 2·size
+        size *= 2
+    return total
+
+def kendall_tau(x, y):
+    """Kendall tau-b (memperhitungkan nilai seri), O(n log n) per pasangan metode."""
+    x = np.where(np.isnan(x), -np.inf, np.asarray(x, dtype=np.float64))
+    y = np.where(np.isnan(y), -np.inf, np.asarray(y, dtype=np.float64))
+    n = len(x)
+    if n < 2:
+        return 1.0
+    order = np.lexsort((y, x))
+    x, y = x[order], y[order]
+
+    def tied_pairs(*arrays):
+        change = np.zeros(n - 1, dtype=bool)
+        for a in arrays:
+            change |= a[1:] != a[:-1]
+        counts = np.diff(np.flatnonzero(np.r_[True, change, True]))
+        return int((counts * (counts - 1) // 2).sum())
+
+    n0 = n * (n - 1) // 2
+    ties_x, ties_xy = tied_pairs(x), tied_pairs(x, y)
+    ties_y = tied_pairs(np.sort(y))
+    discordant = count_inversions(y)
+    denominator = np.sqrt(float(n0 - ties_x) * float(n0 - ties_y))
+    if denominator == 0:
+        return np.nan
+    return (n0 - ties_x - ties_y + ties_xy - 2 * discordant) / denominator
+
+def kendall_matrix(scores, workers=None):
+    """Kendall tau-b antar baris skor; setiap pasangan metode dihitung paralel di thread."""
+    scores = np.atleast_2d(scores)
+    m = len(scores)
+    tau = np.eye(m)
+    pairs = [(a, b) for a in range(m) for b in range(a + 1, m)]
+    if pairs:
+        with ThreadPoolExecutor(max_workers=workers or len(pairs)) as pool:
+            for (a, b), value in zip(pairs, pool.map(lambda p: kendall_tau(scores[p[0]], scores[p[1]]), pairs)):
+                tau[a, b] = tau[b, a] = value
+    return tau
+
+# ============================
+# PERBANDINGAN
+# ============================
+def compare(matrix, weights, benefit, methods=COMPARE_METHODS, workers=None, copeland=None):
+    """
+    Jalankan beberapa metode pada matriks yang sama dan gabungkan hasilnya. `copeland` = None berarti
+    Copeland dihitung hanya jika jumlah alternatif ≤ COPELAND_MAX_ALTERNATIVES.
+    """
+    methods = tuple(m.lower() for m in methods)
+    scores = score_methods(matrix, weights, benefit, methods, workers)
+    ranks = engine.rank_matrix(scores)
+    borda = borda_scores(ranks)
+    if copeland is None:
+        copeland = scores.shape[1] <= COPELAND_MAX_ALTERNATIVES
+    copeland_values = copeland_scores(ranks) if copeland else None
+    return ComparisonResult(methods, scores, ranks, borda, copeland_values, consensus_ranking(borda, copeland_values),
+                            spearman_matrix(scores), kendall_matrix(scores, workers))
@@ -0,0 +1,462 @@
+# Nama Program    : engine.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Mesin perhitungan numerik (tanpa pandas/Streamlit) untuk metode SAW, WP, dan TOPSIS.
+#                   Menerima matriks keputusan siap pakai, vektor bobot, dan mask benefit/cost, lalu
+#                   mengembalikan array skor dan ranking. Nilai antara hanya disimpan jika diminta.
+
+import numpy as np
+
+import profiling
+
+# ============================
+# DATA TYPES
+# ============================
+class ScoreResult:
+    """
+    Hasil perhitungan mesin: skor, ranking (1 = terbaik), urutan indeks, dan nilai antara (opsional).
+    Pada mode top-k, `order` hanya berisi k indeks teratas dan `ranks` bernilai None.
+    """
+    __slots__ = ("scores", "ranks", "order", "intermediates")
+
+    def __init__(self, scores, ranks, order, intermediates=None):
+        self.scores = scores
+        self.ranks = ranks
+        self.order = order
+        self.intermediates = intermediates  # dict: {nama_langkah: ndarray} atau None
+
+    def rank_of(self, indices):
+        """Ranking alternatif pada `indices` tanpa mengurutkan seluruh skor."""
+        if self.ranks is not None:
+            return self.ranks[np.asarray(indices, dtype=np.int64)]
+        return rank_of(self.scores, indices)
+
+# ============================
+# HELPERS
+# ============================
+def as_matrix(matrix):
+    """Pastikan matriks keputusan berupa array float64 2D yang contiguous."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+    if matrix.ndim != 2:
+        raise ValueError("Matriks keputusan harus 2 dimensi (alternatif × kriteria).")
+    return matrix
+
+def benefit_mask(benefit, n_criteria):
+    """Ubah mask benefit (bool) atau list atribut ('benefit'/'cost') menjadi array bool."""
+    benefit = np.asarray(benefit)
+    if benefit.dtype.kind in ("U", "S", "O"):
+        benefit = np.char.lower(benefit.astype(str)) != "cost"
+    benefit = benefit.astype(bool)
+    if benefit.shape != (n_criteria,):
+        raise ValueError("Panjang mask benefit/cost tidak sama dengan jumlah kriteria.")
+    return benefit
+
+def normalize_weights(weights):
+    """Normalisasi bobot agar totalnya = 1 (bobot seragam jika total = 0)."""
+    weights = np.asarray(weights, dtype=np.float64)
+    total = weights.sum()
+    if total != 0:
+        return weights / total
+    return np.full(weights.shape, 1.0 / len(weights))
+
+def rank_scores(scores):
+    """
+    Ranking skor dari tertinggi ke terendah. Skor yang sama diurutkan sesuai
+    urutan input (sama seperti `sorted(..., reverse=True)` yang stabil).
+    Mengembalikan (ranks, order): ranks[i] = ranking alternatif i, order = indeks terurut.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    order = np.argsort(-scores, kind="stable")
+    ranks = np.empty(len(scores), dtype=np.int64)
+    ranks[order] = np.arange(1, len(scores) + 1)
+    return ranks, order
+
+def select_top_k(scores, k):
+    """
+    Indeks k skor tertinggi, terurut dari yang terbaik, dalam O(n + k log k).
+    Skor sama dipecah berdasarkan indeks terkecil (konsisten dengan `rank_scores`); NaN selalu di akhir.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    n = len(scores)
+    k = max(0, min(int(k), n))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    if k == n:
+        return rank_scores(scores)[1]
+
+    keys = -scores
+    # Nilai ambang = skor ke-k (partisi O(n)); ambil semua yang lebih baik lalu
+    # lengkapi dengan skor yang sama persis memakai indeks terkecil
+    kth = np.partition(keys, k - 1)[k - 1]
+    if np.isnan(kth):
+        better = np.flatnonzero(~np.isnan(keys))
+        tied = np.flatnonzero(np.isnan(keys))
+    else:
+        better = np.flatnonzero(keys < kth)
+        tied = np.flatnonzero(keys == kth)
+    idx = np.concatenate([better, tied[:k - len(better)]])
+    return idx[np.lexsort((idx, keys[idx]))]
+
+def rank_of(scores, indices):
+    """
+    Ranking (1 = terbaik) alternatif pada `indices` dengan aturan yang sama seperti
+    `rank_scores`, tetapi cukup O(n) per alternatif karena tidak mengurutkan seluruh skor.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    indices = np.atleast_1d(np.asarray(indices, dtype=np.int64))
+    nan_mask = np.isnan(scores)
+    n_valid = len(scores) - int(nan_mask.sum())
+    positions = np.arange(len(scores))
+    ranks = np.empty(len(indices), dtype=np.int64)
+    for out, i in enumerate(indices):
+        s = scores[i]
+        if np.isnan(s):
+            ranks[out] = n_valid + int(np.count_nonzero(nan_mask[:i])) + 1
+        else:
+            ranks[out] = int(np.count_nonzero(scores > s)) + int(np.count_nonzero((scores == s) & (positions < i))) + 1
+    return ranks
+
+def _prepare(matrix, weights, benefit):
+    matrix = as_matrix(matrix)
+    if matrix.shape[0] == 0 or matrix.shape[1] == 0:
+        raise ValueError("Kriteria atau alternatif kosong.")
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.shape != (matrix.shape[1],):
+        raise ValueError("Panjang vektor bobot tidak sama dengan jumlah kriteria.")
+    return matrix, weights, benefit_mask(benefit, matrix.shape[1])
+
+def _result(scores, intermediates, keep, top_k=None):
+    with profiling.stage("ranking", scores.shape):
+        if top_k:
+            ranks, order = None, select_top_k(scores, top_k)
+        else:
+            ranks, order = rank_scores(scores)
+    return ScoreResult(scores, ranks, order, intermediates if keep else None)
+
+def rank(scores, top_k=None):
+    """Bungkus skor yang sudah dihitung (mis. AHP) menjadi ScoreResult, opsional hanya top-k."""
+    return _result(np.asarray(scores, dtype=np.float64), None, False, top_k)
+
+# ============================
+# SAW ENGINE
+# ============================
+def saw_normalize(matrix, col_max, col_min, benefit):
+    """
+    Normalisasi SAW dengan statistik kolom yang diberikan (bisa dari seluruh data atau dari pass streaming).
+    Benefit → r_ij = x_ij / max(x_j) ; Cost → r_ij = min(x_j) / x_ij (0 jika x_ij = 0)
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        benefit_norm = np.where(col_max != 0, matrix / np.where(col_max != 0, col_max, 1.0), 0.0)
+        cost_norm = np.where(matrix != 0, col_min / np.where(matrix != 0, matrix, 1.0), 0.0)
+    return np.where(benefit, benefit_norm, cost_norm)
+
+def saw_engine(matrix, weights, benefit, keep_intermediates=False, top_k=None):
+    """Hitung skor SAW langsung dari matriks numerik."""
+    matrix, weights, benefit = _prepare(matrix, weights, benefit)
+
+    with profiling.stage("normalisasi", matrix.shape):
+        norm_matrix = saw_normalize(matrix, matrix.max(axis=0), matrix.min(axis=0), benefit)
+
+    with profiling.stage("pembobotan", matrix.shape):
+        normalized_weights = normalize_weights(weights)
+        scores = norm_matrix @ normalized_weights
+
+    return _result(scores, {
+        "matrix": matrix,
+        "normalized": norm_matrix,
+        "weights": normalized_weights,
+    }, keep_intermediates, top_k)
+
+# ============================
+# WP ENGINE
+# ============================
+WP_CLAMP = 1e-9                     # Pengganti nilai <= 0 sebelum dilogaritmakan
+WP_CHUNK_BYTES = 64 * 1024 * 1024   # Batas memori kasar untuk satu blok log-matriks
+
+def wp_log_s(matrix, adjusted_weights):
+    """
+    log S_i = Σ w_j · log x_ij, dihitung per blok baris sebagai satu perkalian matriks-vektor sehingga tidak
+    pernah underflow/overflow seperti ∏(x_ij ^ w_j). Nilai <= 0 diganti WP_CLAMP (matriks input tidak diubah).
+    Mengembalikan (log_s, clamped): clamped[i] = True jika ada nilai alternatif i yang diganti.
+    """
+    n_rows, n_crit = matrix.shape
+    rows = max(1, WP_CHUNK_BYTES // (8 * max(1, n_crit)))
+    log_s = np.empty(n_rows, dtype=np.float64)
+    clamped = np.empty(n_rows, dtype=bool)
+    for start in range(0, n_rows, rows):
+        block = matrix[start:start + rows]
+        nonpositive = block <= 0
+        clamped[start:start + rows] = nonpositive.any(axis=1)
+        log_s[start:start + rows] = np.log(np.where(nonpositive, WP_CLAMP, block)) @ adjusted_weights
+    return log_s, clamped
+
+def log_sum_exp(log_values):
+    """log Σ exp(a_i) tanpa overflow (NaN diabaikan); -inf jika kosong."""
+    log_values = np.asarray(log_values, dtype=np.float64)
+    if not log_values.size or np.all(np.isnan(log_values)):
+        return -np.inf
+    peak = np.nanmax(log_values)
+    if not np.isfinite(peak):
+        return peak
+    return peak + np.log(np.nansum(np.exp(log_values - peak)))
+
+def wp_scores_from_log(log_s, log_total=None):
+    """V_i = S_i / ΣS = exp(log S_i − log ΣS); `log_total` bisa diberikan dari pass streaming sebelumnya."""
+    log_total = log_sum_exp(log_s) if log_total is None else log_total
+    if not np.isfinite(log_total):
+        return np.zeros_like(log_s)
+    return np.exp(log_s - log_total)
+
+def wp_s_values(matrix, adjusted_weights):
+    """S_i = ∏(x_ij ^ w_j) lewat ruang log; bisa overflow ke inf untuk matriks lebar, gunakan `wp_log_s` untuk skor."""
+    return np.exp(wp_log_s(matrix, adjusted_weights)[0])
+
+def wp_engine(matrix, weights, benefit, keep_intermediates=False, top_k=None):
+    """Hitung skor WP (V = S / ΣS) di ruang log: log S = log(X) · w, lalu V dinormalisasi lewat log-sum-exp."""
+    matrix, weights, benefit = _prepare(matrix, weights, benefit)
+
+    with profiling.stage("pembobotan", matrix.shape):
+        normalized_weights = normalize_weights(weights)
+        adjusted_weights = np.where(benefit, normalized_weights, -normalized_weights)
+        log_s, clamped = wp_log_s(matrix, adjusted_weights)
+
+    with profiling.stage("normalisasi", log_s.shape):
+        scores = wp_scores_from_log(log_s)
+
+    intermediates = None
+    if keep_intermediates:
+        with np.errstate(over="ignore"):
+            s_values = np.exp(log_s)
+        intermediates = {
+            "matrix": matrix,
+            "weights": normalized_weights,
+            "adjusted_weights": adjusted_weights,
+            "log_s": log_s,
+            "s": s_values,
+            "clamped": clamped,
+        }
+    return _result(scores, intermediates, keep_intermediates, top_k)
+
+# ============================
+# TOPSIS ENGINE
+# ============================
+def topsis_closeness(weighted_matrix, ideal_positive, ideal_negative):
+    """D+ = √Σ(y_ij - y_j+)², D- = √Σ(y_ij - y_j-)², V_i = D- / (D+ + D-)."""
+    separation_positive = np.sqrt(np.sum((weighted_matrix - ideal_positive) ** 2, axis=1))
+    separation_negative = np.sqrt(np.sum((weighted_matrix - ideal_negative) ** 2, axis=1))
+    denominator = separation_positive + separation_negative
+    closeness = np.divide(separation_negative, denominator, out=np.zeros_like(separation_negative), where=denominator != 0)
+    return separation_positive, separation_negative, closeness
+
+def topsis_engine(matrix, weights, benefit, keep_intermediates=False, top_k=None):
+    """Hitung skor TOPSIS (kedekatan relatif) langsung dari matriks numerik."""
+    matrix, weights, benefit = _prepare(matrix, weights, benefit)
+
+    # rij = xij / √(Σxij²)
+    with profiling.stage("normalisasi", matrix.shape):
+        norm_denominators = np.sqrt(np.sum(matrix ** 2, axis=0))
+        norm_denominators[norm_denominators == 0] = 1.0
+        normalized_matrix = matrix / norm_denominators
+
+    with profiling.stage("pembobotan", matrix.shape):
+        normalized_weights = normalize_weights(weights)
+        weighted_matrix = normalized_matrix * normalized_weights
+
+    with profiling.stage("solusi ideal", matrix.shape):
+        col_max = weighted_matrix.max(axis=0)
+        col_min = weighted_matrix.min(axis=0)
+        ideal_positive = np.where(benefit, col_max, col_min)
+        ideal_negative = np.where(benefit, col_min, col_max)
+
+    with profiling.stage("separasi", matrix.shape):
+        separation_positive, separation_negative, scores = topsis_closeness(weighted_matrix, ideal_positive, ideal_negative)
+
+    return _result(scores, {
+        "matrix": matrix,
+        "normalized": normalized_matrix,
+        "weights": normalized_weights,
+        "weighted": weighted_matrix,
+        "ideal_positive": ideal_positive,
+        "ideal_negative": ideal_negative,
+        "separation_positive": separation_positive,
+        "separation_negative": separation_negative,
+    }, keep_intermediates, top_k)
+
+ENGINES = {
+    "saw": saw_engine,
+    "wp": wp_engine,
+    "topsis": topsis_engine,
+}
+
+def score(method, matrix, weights, benefit, keep_intermediates=False, top_k=None):
+    """Hitung skor dengan metode 'saw', 'wp', atau 'topsis'. `top_k` membatasi urutan ke k teratas."""
+    try:
+        engine = ENGINES[method.lower()]
+    except KeyError:
+        raise ValueError(f"Metode '{method}' tidak dikenal. Pilih salah satu dari: {', '.join(ENGINES)}.")
+    return engine(matrix, weights, benefit, keep_intermediates=keep_intermediates, top_k=top_k)
+
+# ============================
+# SCENARIO ENGINE (BANYAK VEKTOR BOBOT)
+# ============================
+class ScenarioResult:
+    """
+    Hasil evaluasi banyak skenario bobot: `scores` & `ranks` berukuran (skenario × alternatif),
+    `base_ranks` = ranking acuan, dan `summary` = ringkasan perubahan ranking untuk UI.
+    """
+    __slots__ = ("scores", "ranks", "base_ranks", "summary")
+
+    def __init__(self, scores, ranks, base_ranks, summary):
+        self.scores = scores
+        self.ranks = ranks
+        self.base_ranks = base_ranks
+        self.summary = summary
+
+def normalize_weight_matrix(weight_matrix):
+    """Normalisasi setiap baris bobot (satu skenario) agar totalnya = 1 (seragam jika total = 0)."""
+    weight_matrix = np.atleast_2d(np.asarray(weight_matrix, dtype=np.float64))
+    totals = weight_matrix.sum(axis=1, keepdims=True)
+    uniform = np.full_like(weight_matrix, 1.0 / weight_matrix.shape[1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(totals != 0, weight_matrix / np.where(totals != 0, totals, 1.0), uniform)
+
+def rank_matrix(scores):
+    """Ranking per baris (skenario) dengan aturan yang sama seperti `rank_scores`."""
+    scores = np.atleast_2d(scores)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    ranks = np.empty(order.shape, dtype=np.int64)
+    np.put_along_axis(ranks, order, np.arange(1, scores.shape[1] + 1)[None, :], axis=1)
+    return ranks
+
+class ScenarioEvaluator:
+    """
+    Evaluasi banyak vektor bobot terhadap satu matriks keputusan. Matriks normalisasi SAW,
+    matriks normalisasi TOPSIS, dan matriks log WP masing-masing dihitung sekali lalu dipakai ulang.
+    """
+
+    def __init__(self, matrix, benefit):
+        self.matrix = as_matrix(matrix)
+        if self.matrix.shape[0] == 0 or self.matrix.shape[1] == 0:
+            raise ValueError("Kriteria atau alternatif kosong.")
+        self.benefit = benefit_mask(benefit, self.matrix.shape[1])
+        self._saw_norm = None
+        self._wp_log = None
+        self._topsis = None
+
+    def _weights(self, weight_matrix):
+        weight_matrix = np.atleast_2d(np.asarray(weight_matrix, dtype=np.float64))
+        if weight_matrix.shape[1] != self.matrix.shape[1]:
+            raise ValueError("Jumlah kolom bobot skenario tidak sama dengan jumlah kriteria.")
+        if np.any(weight_matrix < 0):
+            raise ValueError("Bobot skenario tidak boleh negatif.")
+        return normalize_weight_matrix(weight_matrix)
+
+    @property
+    def saw_normalized(self):
+        if self._saw_norm is None:
+            self._saw_norm = saw_engine(self.matrix, np.ones(self.matrix.shape[1]), self.benefit, keep_intermediates=True).intermediates["normalized"]
+        return self._saw_norm
+
+    @property
+    def wp_log(self):
+        if self._wp_log is None:
+            self._wp_log = np.log(np.where(self.matrix <= 0, WP_CLAMP, self.matrix))
+        return self._wp_log
+
+    @property
+    def topsis_prepared(self):
+        """(R, A+, A-) untuk TOPSIS; solusi ideal dihitung pada R karena max(w·r) = w·max(r) untuk w ≥ 0."""
+        if self._topsis is None:
+            denominators = np.sqrt(np.sum(self.matrix ** 2, axis=0))
+            denominators[denominators == 0] = 1.0
+            normalized = self.matrix / denominators
+            col_max, col_min = normalized.max(axis=0), normalized.min(axis=0)
+            self._topsis = (normalized,
+                            np.where(self.benefit, col_max, col_min),
+                            np.where(self.benefit, col_min, col_max))
+        return self._topsis
+
+    def saw(self, weight_matrix):
+        return self._weights(weight_matrix) @ self.saw_normalized.T
+
+    def wp(self, weight_matrix):
+        adjusted = np.where(self.benefit, 1.0, -1.0) * self._weights(weight_matrix)
+        # log S = Σ w_j · log x_ij ; V = S / ΣS dihitung di ruang log agar tidak overflow
+        log_s = adjusted @ self.wp_log.T
+        log_s -= log_s.max(axis=1, keepdims=True)
+        s_values = np.exp(log_s)
+        return s_values / s_values.sum(axis=1, keepdims=True)
+
+    def topsis(self, weight_matrix):
+        normalized, ideal_positive, ideal_negative = self.topsis_prepared
+        squared = self._weights(weight_matrix) ** 2
+        # D² = Σ w_j² (r_ij - r_j*)² → satu perkalian matriks untuk semua skenario
+        separation_positive = np.sqrt(squared @ ((normalized - ideal_positive) ** 2).T)
+        separation_negative = np.sqrt(squared @ ((normalized - ideal_negative) ** 2).T)
+        denominator = separation_positive + separation_negative
+        return np.divide(separation_negative, denominator, out=np.zeros_like(separation_negative), where=denominator != 0)
+
+    def evaluate(self, method, weight_matrix, base_weights=None):
+        """
+        Hitung skor & ranking untuk semua skenario sekaligus. Ranking acuan diambil dari
+        `base_weights` (jika ada) atau skenario pertama.
+        """
+        try:
+            kernel = {"saw": self.saw, "wp": self.wp, "topsis": self.topsis}[method.lower()]
+        except KeyError:
+            raise ValueError(f"Metode '{method}' tidak dikenal. Pilih salah satu dari: saw, wp, topsis.")
+        scores = kernel(weight_matrix)
+        ranks = rank_matrix(scores)
+        base_ranks = rank_matrix(kernel(base_weights))[0] if base_weights is not None else ranks[0]
+        return ScenarioResult(scores, ranks, base_ranks, rank_change_summary(ranks, base_ranks))
+
+def rank_change_summary(ranks, base_ranks):
+    """Ringkasan ringkas perubahan ranking per alternatif dan per skenario terhadap ranking acuan."""
+    changed = ranks != base_ranks[None, :]
+    return {
+        "base_rank": base_ranks,
+        "min_rank": ranks.min(axis=0),
+        "max_rank": ranks.max(axis=0),
+        "mean_rank": ranks.mean(axis=0),
+        "n_changed": changed.sum(axis=0),
+        "top1_share": (ranks == 1).mean(axis=0),
+        "scenario_n_changed": changed.sum(axis=1),
+        "scenario_top1": np.argmin(ranks, axis=1),
+    }
+
+def evaluate_scenarios(method, matrix, weight_matrix, benefit, base_weights=None):
+    """Evaluasi matriks bobot (skenario × kriteria) terhadap satu matriks keputusan dalam satu proses vektor."""
+    return ScenarioEvaluator(matrix, benefit).evaluate(method, weight_matrix, base_weights)
+
+def stacked_scores(method, matrices, weight_matrix, benefit):
+    """
+    Skor untuk tumpukan matriks (sampel × alternatif × kriteria) dengan satu vektor bobot per matriks (sampel ×
+    kriteria): sampel s dihitung persis seperti `score(method, matrices[s], weight_matrix[s], benefit)`, tetapi
+    seluruh tumpukan diproses dalam operasi vektor. Dipakai SMAA saat nilai matriks ikut diganggu per sampel.
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    weights = normalize_weight_matrix(weight_matrix)
+    benefit = benefit_mask(benefit, matrices.shape[2])
+    method = method.lower()
+    if method == "saw":
+        normalized = saw_normalize(matrices, matrices.max(axis=1, keepdims=True), matrices.min(axis=1, keepdims=True), benefit)
+        return np.einsum("snm,sm->sn", normalized, weights)
+    if method == "wp":
+        adjusted = np.where(benefit, 1.0, -1.0) * weights
+        log_s = np.einsum("snm,sm->sn", np.log(np.where(matrices <= 0, WP_CLAMP, matrices)), adjusted)
+        log_s -= log_s.max(axis=1, keepdims=True)
+        s_values = np.exp(log_s)
+        return s_values / s_values.sum(axis=1, keepdims=True)
+    if method == "topsis":
+        denominators = np.sqrt(np.sum(matrices ** 2, axis=1, keepdims=True))
+        denominators[denominators == 0] = 1.0
+        normalized = matrices / denominators
+        col_max, col_min = normalized.max(axis=1, keepdims=True), normalized.min(axis=1, keepdims=True)
+        # Solusi ideal pada R, sama seperti ScenarioEvaluator.topsis (w ≥ 0)
+        squared = weights ** 2
+        separation_positive = np.sqrt(np.einsum("snm,sm->sn", (normalized - np.where(benefit, col_max, col_min)) ** 2, squared))
+        separation_negative = np.sqrt(np.einsum("snm,sm->sn", (normalized - np.where(benefit, col_min, col_max)) ** 2, squared))
+        denominator = separation_positive + separation_negative
+        return np.divide(separation_negative, denominator, out=np.zeros_like(separation_negative), where=denominator != 0)
+    raise ValueError(f"Metode '{method}' tidak dikenal. Pilih salah satu dari: saw, wp, topsis.")
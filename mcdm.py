@@ -0,0 +1,1028 @@
+# Nama Program    : mcdm.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Tipe data, parser, dan perhitungan DSS yang tidak bergantung pada Streamlit (Criterion, Alternative,
+#                   DecisionMatrix, ingest kolumnar, deteksi & pemuatan file, calculate_* SAW/WP/AHP/TOPSIS, cache
+#                   hasil, skenario bobot, SMAA, perbandingan metode), agar dapat dipakai ulang oleh app.py, CLI, dan modul headless.
+
+import os
+import re
+import zipfile
+from io import BytesIO, StringIO
+
+import numpy as np
+import pandas as pd
+from collections.abc import Mapping
+
+import ahp
+import cache
+import compare
+import engine
+import profiling
+import sensitivity
+
+# ============================
+# DATA TYPES
+# ============================
+class Criterion:
+    def __init__(self, id, name, weight, attribute):
+        self.id = id.strip() if id else ""
+        self.name = name.strip() if name else ""
+        self.weight = float(weight) if weight is not None else 1.0
+        self.attribute = attribute.lower().strip() if attribute else "benefit"  # 'benefit' or 'cost'
+
+class Alternative:
+    def __init__(self, id, name, values):
+        self.id = id.strip() if id else ""
+        self.name = name.strip() if name else ""
+        self.values = values  # dict: {criterion_id: value}
+
+class DecisionMatrix:
+    """
+    Matriks keputusan berbasis array: satu array float64 contiguous (alternatif × kriteria)
+    beserta kolom id/nama alternatif dan id/nama/bobot/atribut kriteria.
+    """
+    __slots__ = ("values", "alt_ids", "alt_names", "crit_ids", "crit_names", "weights", "attributes", "_crit_index")
+
+    def __init__(self, values, alt_ids, alt_names, crit_ids, crit_names, weights, attributes):
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.alt_ids = np.asarray(alt_ids, dtype=object)
+        self.alt_names = np.asarray(alt_names, dtype=object)
+        self.crit_ids = np.asarray(crit_ids, dtype=object)
+        self.crit_names = np.asarray(crit_names, dtype=object)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.attributes = np.asarray(attributes, dtype=object)  # 'benefit' atau 'cost'
+        self._crit_index = None
+
+    @classmethod
+    def from_criteria(cls, criteria, values, alt_ids, alt_names):
+        return cls(values, alt_ids, alt_names,
+                   [c.id for c in criteria], [c.name for c in criteria],
+                   [c.weight for c in criteria], [c.attribute for c in criteria])
+
+    @classmethod
+    def from_objects(cls, criteria, alternatives):
+        """
+        Buat DecisionMatrix dari list Criterion & Alternative. Jika keduanya adalah
+        view utuh dari DecisionMatrix yang sama, matriks tersebut dipakai langsung tanpa konversi.
+        """
+        dm = getattr(criteria[0], "_dm", None) if criteria else None
+        if dm is not None and len(criteria) == dm.n_criteria and len(alternatives) == dm.n_alternatives \
+                and all(getattr(c, "_dm", None) is dm and c._j == j for j, c in enumerate(criteria)) \
+                and all(getattr(a, "_dm", None) is dm and a._i == i for i, a in enumerate(alternatives)):
+            return dm
+        values = np.array([[alt.values.get(crit.id, 0.0) for crit in criteria] for alt in alternatives], dtype=float)
+        return cls.from_criteria(criteria, values.reshape(len(alternatives), len(criteria)),
+                                 [alt.id for alt in alternatives], [alt.name for alt in alternatives])
+
+    @classmethod
+    def default(cls, n_alternatives, n_criteria, fill=1.0):
+        """Matriks kosong untuk input manual: C1..Cn (benefit, bobot 1), A1..Am bernilai `fill`."""
+        return cls(np.full((n_alternatives, n_criteria), fill),
+                   [f"A{i+1}" for i in range(n_alternatives)], [f"Alternatif {i+1}" for i in range(n_alternatives)],
+                   [f"C{j+1}" for j in range(n_criteria)], [f"Kriteria {j+1}" for j in range(n_criteria)],
+                   np.ones(n_criteria), ['benefit'] * n_criteria)
+
+    def resize(self, n_alternatives, n_criteria, fill=1.0):
+        """Ubah ukuran matriks; blok yang beririsan dipertahankan, baris/kolom baru memakai nilai default."""
+        out = DecisionMatrix.default(n_alternatives, n_criteria, fill)
+        a, c = min(n_alternatives, self.n_alternatives), min(n_criteria, self.n_criteria)
+        out.values[:a, :c] = self.values[:a, :c]
+        out.alt_names[:a] = self.alt_names[:a]
+        if n_criteria == self.n_criteria:
+            out.crit_names[:] = self.crit_names
+            out.weights[:] = self.weights
+            out.attributes[:] = self.attributes
+        return out
+
+    def with_table(self, alt_names, values, crit_names=None):
+        """Matriks baru berukuran `values` (mis. hasil tempel tabel); metadata kriteria dipertahankan jika jumlahnya sama."""
+        values = np.asarray(values, dtype=np.float64)
+        out = self.resize(*values.shape)
+        out.values[:] = values
+        out.alt_names[:] = list(alt_names)
+        if crit_names is not None:
+            out.crit_names[:] = list(crit_names)
+        return out
+
+    @property
+    def n_alternatives(self):
+        return self.values.shape[0]
+
+    @property
+    def n_criteria(self):
+        return self.values.shape[1]
+
+    @property
+    def benefit(self):
+        return self.attributes != 'cost'
+
+    @property
+    def labels(self):
+        """Label alternatif untuk tampilan: nama, atau id jika nama kosong."""
+        return np.where(self.alt_names != '', self.alt_names, self.alt_ids)
+
+    def set_criterion_ids(self, crit_ids):
+        self.crit_ids[:] = [str(c).strip() for c in crit_ids]
+        self._crit_index = None
+
+    @property
+    def crit_index(self):
+        if self._crit_index is None:
+            # Id duplikat: yang terakhir menang, sama seperti dict {criterion_id: value}
+            self._crit_index = {cid: j for j, cid in enumerate(self.crit_ids.tolist())}
+        return self._crit_index
+
+    def criteria(self):
+        """List view Criterion (tanpa salinan data) untuk kode lama."""
+        return [CriterionView(self, j) for j in range(self.n_criteria)]
+
+    def alternatives(self):
+        """List view Alternative (tanpa salinan data) untuk kode lama."""
+        return [AlternativeView(self, i) for i in range(self.n_alternatives)]
+
+    def criteria_frame(self):
+        return pd.DataFrame({'ID': self.crit_ids, 'Nama': self.crit_names, 'Bobot': self.weights, 'Atribut': self.attributes})
+
+    def alternatives_frame(self):
+        df = pd.DataFrame(self.values, columns=self.crit_names.tolist())
+        df = df.loc[:, ~df.columns.duplicated(keep='last')]
+        df.insert(0, 'Nama', self.labels)
+        return df
+
+class CriterionView:
+    """View satu kolom DecisionMatrix dengan atribut seperti Criterion; perubahan langsung ditulis ke array."""
+    __slots__ = ("_dm", "_j")
+
+    def __init__(self, dm, j):
+        self._dm = dm
+        self._j = j
+
+    @property
+    def id(self):
+        return self._dm.crit_ids[self._j]
+
+    @id.setter
+    def id(self, value):
+        self._dm.crit_ids[self._j] = value.strip() if value else ""
+        self._dm._crit_index = None
+
+    @property
+    def name(self):
+        return self._dm.crit_names[self._j]
+
+    @name.setter
+    def name(self, value):
+        self._dm.crit_names[self._j] = value.strip() if value else ""
+
+    @property
+    def weight(self):
+        return float(self._dm.weights[self._j])
+
+    @weight.setter
+    def weight(self, value):
+        self._dm.weights[self._j] = float(value) if value is not None else 1.0
+
+    @property
+    def attribute(self):
+        return self._dm.attributes[self._j]
+
+    @attribute.setter
+    def attribute(self, value):
+        self._dm.attributes[self._j] = value.lower().strip() if value else "benefit"
+
+class RowValues(Mapping):
+    """Mapping {criterion_id: value} di atas satu baris DecisionMatrix (pengganti dict Alternative.values)."""
+    __slots__ = ("_dm", "_i")
+
+    def __init__(self, dm, i):
+        self._dm = dm
+        self._i = i
+
+    def __getitem__(self, crit_id):
+        return float(self._dm.values[self._i, self._dm.crit_index[crit_id]])
+
+    def __setitem__(self, crit_id, value):
+        self._dm.values[self._i, self._dm.crit_index[crit_id]] = value
+
+    def __iter__(self):
+        return iter(self._dm.crit_index)
+
+    def __len__(self):
+        return len(self._dm.crit_index)
+
+class AlternativeView:
+    """View satu baris DecisionMatrix dengan atribut seperti Alternative; perubahan langsung ditulis ke array."""
+    __slots__ = ("_dm", "_i")
+
+    def __init__(self, dm, i):
+        self._dm = dm
+        self._i = i
+
+    @property
+    def id(self):
+        return self._dm.alt_ids[self._i]
+
+    @id.setter
+    def id(self, value):
+        self._dm.alt_ids[self._i] = value.strip() if value else ""
+
+    @property
+    def name(self):
+        return self._dm.alt_names[self._i]
+
+    @name.setter
+    def name(self, value):
+        self._dm.alt_names[self._i] = value.strip() if value else ""
+
+    @property
+    def values(self):
+        return RowValues(self._dm, self._i)
+
+# ============================
+# FILE PARSER
+# ============================
+def strip_columns(df):
+    """DataFrame dengan nama kolom di-strip, sebagai objek baru: DataFrame asli (mis. dari cache upload) tidak diubah."""
+    return df.set_axis([str(c).strip() for c in df.columns], axis=1)
+
+def parse_criteria(df_alt, df_crit=None):
+    """Mengubah DataFrame kriteria (atau kolom C1, C2, ... pada file alternatif) menjadi list Criterion."""
+    criteria = []
+
+    if df_crit is not None:
+        df_crit = strip_columns(df_crit)
+        for i, row in df_crit.iterrows():
+            # Diperbarui untuk membaca 'Kode Kriteria' dan 'Kode' sebagai fallback
+            crit_id = str(row.get("Kode Kriteria", row.get("Kode", f"C{i+1}"))).strip()
+            name = str(row.get("Nama Kriteria", row.get("Kriteria", f"Kriteria {i+1}"))).strip()
+            weight = row.get("Bobot", 1.0)
+            try:
+                weight = float(weight)
+            except (ValueError, TypeError):
+                weight = 1.0
+            attr = str(row.get("Atribut", "benefit")).lower().strip()
+            attr = "cost" if attr == "cost" else "benefit"
+            criteria.append(Criterion(crit_id, name, weight, attr))
+
+    elif df_alt is not None:
+        crit_cols = [
+            c for c in df_alt.columns if str(c).strip().lower().startswith("c") and str(c).strip()[1:].isdigit()
+        ]
+        for i, col in enumerate(crit_cols):
+            col_id = str(col).strip()
+            criteria.append(Criterion(col_id, f"Kriteria {i+1}", 1.0, "benefit"))
+
+    return criteria
+
+def _text_column(df, columns, names, default, fill=None):
+    """Ambil kolom teks pertama yang tersedia dari `names` sebagai array str, atau nilai default per baris."""
+    for col in names:
+        if col in columns:
+            series = df.iloc[:, columns[col]]
+            if fill is not None:
+                series = series.fillna(fill)
+            # Sama seperti str(value).strip(): NaN menjadi 'nan', angka menjadi teksnya
+            return pd.Series(series.to_numpy(dtype=object).astype(str)).str.strip().to_numpy(dtype=object)
+    return np.array([default(i) for i in df.index], dtype=object)
+
+def numeric_column(col):
+    """
+    Konversi satu kolom ke float64 sekaligus. Nilai yang tidak bisa dikonversi
+    menjadi 0.0 (sama seperti float() gagal), sel kosong tetap NaN.
+    """
+    if pd.api.types.is_bool_dtype(col) or pd.api.types.is_numeric_dtype(col):
+        return col.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = pd.to_numeric(col, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    invalid = np.isnan(values) & col.notna().to_numpy()
+    return np.where(invalid, 0.0, values)
+
+def column_positions(columns):
+    """Peta {nama kolom (di-strip): posisi pertama} agar DataFrame asli tidak perlu diubah."""
+    positions = {}
+    for pos, col in enumerate(columns):
+        positions.setdefault(str(col).strip(), pos)
+    return positions
+
+def criterion_positions(positions, crit_ids):
+    """Posisi kolom untuk setiap kriteria (dicari sebagai id, UPPER, lalu lower), None jika tidak ada."""
+    return [next((positions[k] for k in (cid, cid.upper(), cid.lower()) if k in positions), None) for cid in crit_ids]
+
+def read_alternatives(df_alt, crit_ids, positions=None):
+    """Ambil (id, nama, matriks nilai) alternatif dari DataFrame secara kolumnar. Kriteria tanpa kolom bernilai 0.0."""
+    positions = positions or column_positions(df_alt.columns)
+    alt_ids = _text_column(df_alt, positions, ["Kode Alternatif", "Kode"], lambda i: f"A{i+1}")
+    alt_names = _text_column(df_alt, positions, ["Nama Alternatif", "Nama"], lambda i: f"Alternatif {i+1}", fill='')
+
+    values = np.zeros((len(df_alt), len(crit_ids)), dtype=np.float64)
+    for j, pos in enumerate(criterion_positions(positions, crit_ids)):
+        if pos is not None:
+            values[:, j] = numeric_column(df_alt.iloc[:, pos])
+    return alt_ids, alt_names, values
+
+def alternative_columns(columns, crit_ids):
+    """Label kolom yang dibutuhkan dari file alternatif (kode, nama, dan kolom kriteria) sesuai urutan file."""
+    positions = column_positions(columns)
+    wanted = {positions[c] for c in ("Kode Alternatif", "Kode", "Nama Alternatif", "Nama") if c in positions}
+    wanted |= {p for p in criterion_positions(positions, crit_ids) if p is not None}
+    return [columns[p] for p in sorted(wanted)]
+
+def load_decision_matrix_file(alt_path, df_crit=None):
+    """
+    Muat DecisionMatrix dari path file alternatif. Kriteria ditentukan dari `df_crit` atau header,
+    lalu hanya kolom yang dibutuhkan yang dibaca (Parquet/Feather memory-mapped, CSV lewat usecols).
+    """
+    header = read_table(alt_path, nrows=0)
+    criteria = parse_criteria(header, df_crit)
+    if not criteria:
+        return None
+    with profiling.stage("ingest"):
+        df_alt = read_table(alt_path, columns=alternative_columns(list(header.columns), [c.id for c in criteria]))
+        alt_ids, alt_names, values = read_alternatives(df_alt, [c.id for c in criteria])
+        return DecisionMatrix.from_criteria(criteria, values, alt_ids, alt_names)
+
+def load_decision_matrix(df_alt, df_crit=None):
+    """
+    Ingest kolumnar: kolom kriteria dicari satu kali (id, UPPER, lower), dikonversi
+    per kolom, lalu langsung disusun menjadi DecisionMatrix tanpa iterasi per baris.
+    """
+    criteria = parse_criteria(df_alt, df_crit)
+    if not criteria:
+        return None
+
+    if df_alt is None:
+        return DecisionMatrix.from_criteria(criteria, np.empty((0, len(criteria))), [], [])
+
+    with profiling.stage("ingest", df_alt.shape):
+        alt_ids, alt_names, values = read_alternatives(df_alt, [c.id for c in criteria])
+        return DecisionMatrix.from_criteria(criteria, values, alt_ids, alt_names)
+
+def parse_data(df_alt, df_crit=None):
+    """Mengubah DataFrame menjadi list Criterion dan Alternative secara terurut."""
+    dm = load_decision_matrix(df_alt, df_crit)
+    if dm is None:
+        return [], []
+    return dm.criteria(), dm.alternatives()
+
+def read_pasted_table(text):
+    """
+    Tabel yang ditempel dari spreadsheet (pemisah tab/;/, dideteksi otomatis). Kolom pertama = nama alternatif,
+    kolom berikutnya = nilai kriteria. Baris pertama dianggap header jika tidak ada nilai numerik di dalamnya.
+    Mengembalikan (nama alternatif, matriks nilai, nama kriteria atau None).
+    """
+    text = text.strip()
+    if not text:
+        raise ValueError("Tabel yang ditempel kosong.")
+    sep = "\t" if "\t" in text else None
+    df = pd.read_csv(StringIO(text), sep=sep, engine="python", header=None, dtype=str, skipinitialspace=True)
+    if df.shape[1] < 2:
+        raise ValueError("Tabel minimal berisi kolom nama alternatif dan satu kolom nilai.")
+    crit_names = None
+    if pd.to_numeric(df.iloc[0, 1:], errors="coerce").isna().all():
+        crit_names = df.iloc[0, 1:].fillna("").str.strip().tolist()
+        df = df.iloc[1:]
+    if df.empty:
+        raise ValueError("Tabel yang ditempel tidak berisi baris alternatif.")
+    values = np.column_stack([numeric_column(df[c]) for c in df.columns[1:]])
+    return df.iloc[:, 0].fillna("").str.strip().tolist(), np.nan_to_num(values, nan=0.0), crit_names
+
+# ============================
+# AUTO DETECTION HELPERS
+# ============================
+def is_criteria_df(df: pd.DataFrame):
+    """
+    Deteksi apakah dataframe berisi data kriteria. Dibuat lebih spesifik
+    untuk menghindari kesalahan deteksi dengan file alternatif.
+    """
+    cols = [c.lower().strip() for c in df.columns]
+    # Kata kunci "bobot" dan "atribut" adalah indikator yang jauh lebih kuat.
+    if any(col in cols for col in ['bobot', 'atribut', 'attribute', 'nama kriteria']):
+        return True
+    return False
+
+def is_alternatives_df(df: pd.DataFrame):
+    """
+    Deteksi apakah dataframe berisi data alternatif.
+    Akan mengembalikan True jika kolom memiliki 'Kode Alternatif' atau 'Nama Alternatif'.
+    """
+    cols = [c.lower().strip() for c in df.columns]
+    # Diperbarui untuk mengenali 'Kode Alternatif'
+    if any(col in cols for col in ['kode alternatif', 'nama alternatif', 'alternatif', 'kode']):
+        # Cek tambahan: pastikan bukan file kriteria yang menyamar
+        if not any(col in cols for col in ['bobot', 'atribut', 'attribute']):
+            return True
+
+    # fallback check: jika lebih dari separuh kolom (selain kolom pertama) berisi angka
+    if df.shape[1] >= 2:
+        numeric_counts = 0
+        total_vals = 0
+        for c in df.columns[1:]:
+            if pd.api.types.is_numeric_dtype(df[c].dropna()):
+                 numeric_counts += df[c].notna().sum()
+            total_vals += len(df)
+        
+        if total_vals > 0 and (numeric_counts / (total_vals * (df.shape[1]-1))) > 0.6:
+            return True
+
+    return False
+
+# ============================
+# FILE LOADER
+# ============================
+SAMPLE_ROWS = 50  # Jumlah baris contoh untuk deteksi jenis file sebelum memuat penuh
+
+# Ekstensi file kolumnar; membutuhkan pyarrow (dimuat hanya saat format ini dipakai)
+ARROW_EXTENSIONS = {".parquet": "parquet", ".pq": "parquet", ".feather": "feather", ".arrow": "feather", ".ipc": "feather"}
+
+def table_format(name):
+    """Format file dari ekstensinya: 'parquet', 'feather', 'excel', atau 'csv'."""
+    ext = os.path.splitext(str(name).lower())[1]
+    if ext in ARROW_EXTENSIONS:
+        return ARROW_EXTENSIONS[ext]
+    return "excel" if ext in (".xls", ".xlsx") else "csv"
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("Format Parquet/Feather membutuhkan paket 'pyarrow' (pip install pyarrow).")
+    return pyarrow
+
+def _read_arrow(source, fmt, columns=None, nrows=None):
+    """
+    Baca Parquet/Feather dari path (memory-mapped) atau bytes (tanpa salinan lewat BufferReader).
+    Hanya `columns` yang dibaca; `nrows` membaca batch pertama saja (0 = skema saja).
+    Kolom numerik tanpa nilai kosong dikonversi ke pandas tanpa salinan (split_blocks).
+    """
+    pa = _pyarrow()
+    is_path = isinstance(source, (str, os.PathLike))
+    src = source if is_path else pa.BufferReader(source)
+    if fmt == "parquet":
+        if nrows is not None:
+            parquet_file = pa.parquet.ParquetFile(src, memory_map=is_path)
+            schema = parquet_file.schema_arrow
+            if columns is not None:
+                schema = pa.schema([schema.field(c) for c in columns])
+            batch = next(parquet_file.iter_batches(batch_size=nrows, columns=columns), None) if nrows else None
+            table = pa.Table.from_batches([batch], schema=schema) if batch is not None else schema.empty_table()
+        else:
+            table = pa.parquet.read_table(src, columns=columns, memory_map=is_path)
+    else:
+        table = pa.feather.read_table(src, columns=columns, memory_map=is_path)
+        if nrows is not None:
+            table = table.slice(0, nrows)
+    return table.to_pandas(split_blocks=True)
+
+def _read_table(name, data, **kwargs):
+    fmt = table_format(name)
+    if fmt in ("parquet", "feather"):
+        return _read_arrow(data, fmt, kwargs.get("columns"), kwargs.get("nrows"))
+    buf = BytesIO(data)
+    if fmt == "excel":
+        return pd.read_excel(buf, **kwargs)
+    return pd.read_csv(buf, **kwargs)
+
+def read_table(path, columns=None, nrows=None, **kwargs):
+    """
+    Baca file tabel dari path (CSV, XLS/XLSX, Parquet, atau Feather/Arrow IPC) untuk pemakaian headless.
+    `columns` membatasi kolom yang dibaca; Parquet/Feather dibaca memory-mapped.
+    """
+    fmt = table_format(path)
+    if fmt in ("parquet", "feather"):
+        return _read_arrow(path, fmt, columns, nrows)
+    if columns is not None:
+        kwargs["usecols"] = columns
+    if fmt == "excel":
+        return pd.read_excel(path, nrows=nrows, **kwargs)
+    return pd.read_csv(path, nrows=nrows, **kwargs)
+
+def classify_upload(name, df_sample, is_ahp):
+    """Jenis file ('criteria' / 'alternatives' / None). AHP dikenali dari nama file, lainnya dari header + contoh baris."""
+    if is_ahp:
+        if "kriteria" in name.lower(): return "criteria"
+        if "alternatif" in name.lower(): return "alternatives"
+        return None
+    if is_criteria_df(df_sample): return "criteria"
+    if is_alternatives_df(df_sample): return "alternatives"
+    return None
+
+def load_upload(name, data, is_ahp, digest=None):
+    """
+    Muat satu file upload lewat cache bersama (kunci = nama + digest isi file).
+    Jenis file dideteksi dari header dan SAMPLE_ROWS baris pertama; file yang tidak dikenali
+    tidak dimuat penuh. Kolom yang di contoh sudah bertipe float dimuat langsung sebagai float64.
+    Mengembalikan (jenis, DataFrame); DataFrame dipakai bersama antar sesi, jangan diubah isinya.
+    """
+    digest = digest or cache.content_key(np.frombuffer(data, dtype=np.uint8))
+    key = cache.content_key("upload", name, digest, is_ahp)
+
+    def compute():
+        df_sample = None if is_ahp else _read_table(name, data, nrows=SAMPLE_ROWS)
+        kind = classify_upload(name, df_sample, is_ahp)
+        if kind is None:
+            return None, None
+        dtypes = {}
+        if kind == "alternatives" and df_sample is not None:
+            dtypes = {c: "float64" for c in df_sample.columns if pd.api.types.is_float_dtype(df_sample[c])}
+        try:
+            return kind, _read_table(name, data, dtype=dtypes or None)
+        except (ValueError, TypeError):
+            # Ada nilai non-angka setelah baris contoh: muat ulang tanpa tipe tetap
+            return kind, _read_table(name, data)
+
+    return cache.UPLOAD_CACHE.get_or_compute(key, compute)[0]
+
+# ============================
+# MATRIX HELPERS
+# ============================
+def build_matrix(criteria, alternatives=None, message="Kriteria atau alternatif kosong."):
+    """
+    Ambil DecisionMatrix untuk mesin perhitungan. `criteria` boleh berupa DecisionMatrix
+    (dipakai langsung) atau list Criterion bersama list Alternative.
+    """
+    if isinstance(criteria, DecisionMatrix):
+        dm = criteria
+    elif not criteria or not alternatives:
+        raise ValueError(message)
+    else:
+        dm = DecisionMatrix.from_objects(criteria, alternatives)
+    if dm.n_alternatives == 0 or dm.n_criteria == 0:
+        raise ValueError(message)
+    return dm
+
+def find_alternatives(alt_ids, labels, lookup):
+    """Indeks alternatif yang ID atau namanya ada di `lookup` (satu kali isin, tanpa loop per baris)."""
+    if not lookup:
+        return np.empty(0, dtype=np.int64)
+    lookup = [str(x).strip() for x in lookup]
+    return np.flatnonzero(np.isin(np.asarray(alt_ids, dtype=object).astype(str), lookup) |
+                          np.isin(np.asarray(labels, dtype=object).astype(str), lookup))
+
+def ranking_rows(result, lookup_idx=None):
+    """
+    Urutan baris & ranking untuk tabel hasil. Pada mode top-k hanya k baris teratas yang dipakai;
+    alternatif pada `lookup_idx` yang berada di luar top-k ditambahkan di bawahnya dengan ranking aslinya.
+    """
+    order = result.order
+    ranks = np.arange(1, len(order) + 1)
+    if lookup_idx is not None and len(lookup_idx):
+        extra = np.setdiff1d(lookup_idx, order)
+        if len(extra):
+            extra_ranks = result.rank_of(extra)
+            sort = np.argsort(extra_ranks, kind="stable")
+            order = np.concatenate([order, extra[sort]])
+            ranks = np.concatenate([ranks, extra_ranks[sort]])
+    return order, ranks
+
+def build_ranking(names, result, score_col, lookup_idx=None):
+    """Susun DataFrame hasil perankingan dari ScoreResult secara vektor (tanpa sorted per baris)."""
+    names = np.asarray(names, dtype=object)
+    order, ranks = ranking_rows(result, lookup_idx)
+    return pd.DataFrame({
+        'Alternatif': names[order],
+        score_col: result.scores[order],
+        'Ranking': ranks,
+    })
+
+# ============================
+# SAW CALCULATION
+# ============================
+def calculate_saw(criteria, alternatives=None, with_steps=True, top_k=None, lookup=None):
+    """
+    Hitung metode Simple Additive Weighting (SAW). Jika with_steps=False, hanya ranking yang dibuat.
+    top_k membatasi ranking ke k alternatif teratas; lookup = daftar ID/nama yang ranking-nya selalu ditampilkan.
+    """
+    steps = []
+    
+    # 1️⃣ Validasi Data
+    dm = build_matrix(criteria, alternatives, "Kriteria atau alternatif kosong. Pastikan data sudah lengkap.")
+    # Rumus:
+    # Untuk kriteria benefit  → r_ij = x_ij / max(x_j)
+    # Untuk kriteria cost     → r_ij = min(x_j) / x_ij
+    # V_i = Σ(w_j * r_ij)
+    result = engine.saw_engine(dm.values, dm.weights, dm.benefit, keep_intermediates=with_steps, top_k=top_k)
+    names = dm.labels
+    with profiling.stage("tabel ranking", result.order.shape):
+        df_ranking = build_ranking(names, result, 'Skor Akhir (V)', find_alternatives(dm.alt_ids, names, lookup))
+
+    if with_steps:
+        with profiling.stage("tabel langkah", dm.values.shape):
+            inter = result.intermediates
+            # 2️⃣ Matriks Keputusan Awal (X)
+            steps.append(("Matriks Keputusan Awal", pd.DataFrame(dm.values, index=names, columns=[f"{n} ({i})" for n, i in zip(dm.crit_names, dm.crit_ids)])))
+            # 3️⃣ Normalisasi Matriks
+            steps.append(("Normalisasi Matriks (Benefit/Cost)", pd.DataFrame(inter["normalized"], index=names, columns=[f"{n} ({a})" for n, a in zip(dm.crit_names, dm.attributes)])))
+            # 4️⃣ Normalisasi Bobot
+            steps.append(("Normalisasi Bobot", pd.DataFrame([inter["weights"]], index=['Bobot Ternormalisasi (wj)'], columns=dm.crit_ids)))
+            # 5️⃣ Hitung Nilai Preferensi (V)
+            steps.append(("Perhitungan Skor V (V = Σ(wj * rij))", pd.DataFrame({"Nilai V (Skor)": result.scores}, index=names)))
+            # 6️⃣ Perangkingan Akhir
+            steps.append(("Hasil Perankingan", df_ranking))
+
+    return steps, df_ranking
+
+# ============================
+# WP CALCULATION
+# ============================
+def calculate_wp(criteria, alternatives=None, with_steps=True, top_k=None, lookup=None):
+    """
+    Hitung metode Weighted Product (WP). Jika with_steps=False, hanya ranking yang dibuat.
+    top_k membatasi ranking ke k alternatif teratas; lookup = daftar ID/nama yang ranking-nya selalu ditampilkan.
+    """
+    steps = []
+    
+    # 1️⃣ Validasi data
+    dm = build_matrix(criteria, alternatives)
+    # Bobot dinormalisasi (Σw = 1), atribut cost bernilai negatif,
+    # S_i = ∏(x_ij ^ w_j) dan V_i = S_i / ΣS_i, dihitung di ruang log: log S_i = Σ w_j · log x_ij
+    result = engine.wp_engine(dm.values, dm.weights, dm.benefit, keep_intermediates=with_steps, top_k=top_k)
+    names = dm.labels
+    with profiling.stage("tabel ranking", result.order.shape):
+        df_ranking = build_ranking(names, result, 'Skor Akhir (V)', find_alternatives(dm.alt_ids, names, lookup))
+
+    if with_steps:
+        with profiling.stage("tabel langkah", dm.values.shape):
+            inter = result.intermediates
+            # 2️⃣ Matriks Keputusan Awal (X)
+            steps.append(("Matriks Keputusan Awal", pd.DataFrame(dm.values, index=names, columns=[f"{n} ({i})" for n, i in zip(dm.crit_names, dm.crit_ids)])))
+            # 3️⃣ Normalisasi Bobot
+            steps.append(("Normalisasi Bobot", pd.DataFrame([inter["weights"]], index=['Bobot Ternormalisasi (wj)'], columns=dm.crit_ids)))
+            # 4️⃣ Penyesuaian Bobot
+            steps.append(("Penyesuaian Bobot (Atribut Cost bernilai negatif)", pd.DataFrame([inter["adjusted_weights"]], index=['Bobot Disesuaikan (w)'], columns=[f"{n} ({a})" for n, a in zip(dm.crit_names, dm.attributes)])))
+            # 5️⃣ Perhitungan Nilai S (log S tetap akurat walau S sendiri overflow/underflow)
+            steps.append(("Perhitungan Nilai S (S = ∏(xij^w))", pd.DataFrame({"Nilai S": inter["s"], "log S (Σ w·log xij)": inter["log_s"]}, index=names)))
+            clamped = np.flatnonzero(inter["clamped"])
+            if len(clamped):
+                # Alternatif dengan nilai <= 0 yang diganti engine.WP_CLAMP sebelum dilogaritmakan
+                nonpositive = dm.values[clamped] <= 0
+                steps.append((f"Alternatif dengan Nilai ≤ 0 (diganti {engine.WP_CLAMP:g})", pd.DataFrame({
+                    "Jumlah Nilai ≤ 0": nonpositive.sum(axis=1),
+                    "Kriteria": [", ".join(dm.crit_ids[row]) for row in nonpositive],
+                }, index=names[clamped])))
+            # 6️⃣ Perhitungan Nilai V (Preferensi)
+            steps.append(("Perhitungan Nilai V (V = S / ΣS)", pd.DataFrame({"Nilai S": inter["s"], "Nilai V (Skor)": result.scores}, index=names)))
+            # 7️⃣ Perangkingan Akhir
+            steps.append(("Hasil Perankingan", df_ranking))
+
+    return steps, df_ranking
+
+# ============================
+# AHP CALCULATION
+# ============================
+TRIAD_TOP = 3
+
+def consistency_triads(matrix_name, matrix, labels, consistent, top=TRIAD_TOP):
+    """Baris laporan triad paling tidak konsisten (a_ij · a_jk ≠ a_ik) untuk matriks yang gagal uji konsistensi."""
+    if consistent:
+        return []
+    return [{
+        'Matriks': matrix_name, 'i': labels[t['i']], 'j': labels[t['j']], 'k': labels[t['k']],
+        'a_ij': t['a_ij'], 'a_jk': t['a_jk'], 'a_ik': t['a_ik'],
+        'Saran a_ik (a_ij · a_jk)': t['suggested_a_ik'], 'Deviasi |ln|': t['deviation'],
+    } for t in ahp.inconsistent_triads(matrix, top)]
+
+def calculate_ahp(df_kriteria, df_alternatif, top_k=None, lookup=None, weight_method="approx", with_steps=True):
+    """
+    Hitung metode AHP dengan mesin batch (ahp.py). weight_method = 'approx' (default, normalisasi kolom lalu
+    rata-rata baris, sama seperti versi awal) atau 'eigen' (vektor eigen utama, power iteration; skornya
+    sedikit berbeda dari 'approx' bila matriks tidak konsisten sempurna).
+    """
+    steps = []
+    
+    # 1️⃣ Validasi Data
+    df_kriteria = strip_columns(df_kriteria)
+    df_alternatif = strip_columns(df_alternatif)
+
+    if 'Kriteria' not in df_alternatif.columns:
+        raise ValueError("Kolom 'Kriteria' tidak ditemukan di file AHP-alternatif.csv. Pastikan nama kolomnya persis 'Kriteria'.")
+
+    # 2️⃣ Matriks Perbandingan Kriteria
+    try:
+        crit_cols = [c for c in df_kriteria.columns if c.lower().startswith("c")]
+        crit_index = df_kriteria["Kode Kriteria"].values
+        mat_kriteria = df_kriteria[crit_cols].to_numpy(dtype=float)
+    except Exception as e:
+        raise ValueError(f"Format file AHP-Kriteria tidak valid: {e}")
+    if mat_kriteria.shape[0] != mat_kriteria.shape[1]:
+        raise ValueError("Format file AHP-Kriteria tidak valid: matriks perbandingan kriteria harus persegi.")
+
+    # Bobot Kriteria & λmax (satu matriks, diproses lewat mesin batch yang sama)
+    with profiling.stage("bobot kriteria", mat_kriteria.shape):
+        crit_weights, lambda_max = ahp.priorities(mat_kriteria, weight_method)
+    weights = pd.Series(crit_weights, index=crit_index)
+    if with_steps:
+        kriteria_matrix = pd.DataFrame(mat_kriteria, index=crit_index, columns=crit_cols)
+        steps.append(("Matriks Perbandingan Kriteria", kriteria_matrix))
+        steps.append(("Normalisasi Matriks Kriteria", kriteria_matrix / kriteria_matrix.sum(axis=0)))
+        steps.append(("Bobot Kriteria", pd.DataFrame(weights, columns=['Bobot'])))
+
+    # Uji Konsistensi (RI dari tabel Saaty untuk n ≤ 10, hasil simulasi untuk n lebih besar)
+    crit_consistent = True
+    if len(mat_kriteria) > 0 and with_steps:
+        cons = ahp.consistency(lambda_max, len(mat_kriteria))
+        crit_consistent = bool(cons['consistent'][0])
+        steps.append(("Uji Konsistensi Kriteria", pd.DataFrame({
+            'λ maks': cons['lambda_max'], 'CI': cons['CI'], 'RI': cons['RI'], 'CR': cons['CR'],
+            'Konsisten': np.where(cons['consistent'], 'Ya', 'Tidak')
+        })))
+
+    # 3️⃣ Matriks Perbandingan Alternatif: semua kriteria ditumpuk (K × n × n) dan dihitung sekaligus
+    with profiling.stage("ingest", df_alternatif.shape):
+        unique_kriteria, block_ids, alt_cols, alt_matrices = ahp.stack_alternative_matrices(df_alternatif)
+    with profiling.stage("bobot alternatif", alt_matrices.shape):
+        alt_weights, alt_lambda = ahp.priorities(alt_matrices, weight_method)
+
+    if with_steps:
+        with profiling.stage("tabel langkah", alt_matrices.shape):
+            approx_weights = ahp.approx_priorities(alt_matrices)[0]
+            for k, crit in enumerate(unique_kriteria):
+                steps.append((f"Matriks Perbandingan Alternatif ({crit})", pd.DataFrame(alt_matrices[k], index=block_ids[k], columns=alt_cols)))
+                steps.append((f"Normalisasi & Bobot Alternatif ({crit})", pd.DataFrame({
+                    "Normalisasi": approx_weights[k],
+                    "Bobot": alt_weights[k]
+                }, index=block_ids[k])))
+
+            # Uji konsistensi seluruh blok alternatif sekaligus, lalu triad terburuk untuk matriks yang tidak konsisten
+            cons = ahp.consistency(alt_lambda, len(alt_cols))
+            steps.append(("Uji Konsistensi Alternatif", pd.DataFrame({
+                'λ maks': cons['lambda_max'], 'CI': cons['CI'], 'RI': cons['RI'], 'CR': cons['CR'],
+                'Konsisten': np.where(cons['consistent'], 'Ya', 'Tidak')
+            }, index=list(unique_kriteria))))
+            triads = consistency_triads("Kriteria", mat_kriteria, crit_index, crit_consistent)
+            for k, crit in enumerate(unique_kriteria):
+                triads += consistency_triads(f"Alternatif ({crit})", alt_matrices[k], block_ids[k], cons['consistent'][k])
+            if triads:
+                steps.append(("Triad Paling Tidak Konsisten", pd.DataFrame(triads)))
+
+    # 4️⃣ Hitung Skor Akhir & Perangkingan
+    # Bobot setiap blok disebar ke urutan alternatif global (alternatif yang tidak ada di blok bernilai 0)
+    all_alts = np.array(sorted(df_alternatif['Kode Alternatif'].unique()), dtype=object)
+    scores_by_crit = np.zeros((len(all_alts), len(unique_kriteria)))
+    rows = np.searchsorted(all_alts, block_ids.astype(object))
+    scores_by_crit[rows, np.arange(len(unique_kriteria))[:, None]] = alt_weights
+    result = pd.DataFrame(scores_by_crit, index=all_alts, columns=list(unique_kriteria))
+
+    # Menyamakan format kode kriteria (misal, C01 -> C1) untuk pencocokan
+    weights.index = [i.replace("C0", "C") for i in weights.index]
+    result.columns = [c.replace("C0", "C") for c in result.columns]
+
+    # Pastikan hanya kriteria yang ada di bobot yang dihitung
+    common_cols = [c for c in result.columns if c in weights.index]
+    if not common_cols:
+        raise ValueError("Tidak ada kriteria yang cocok antara bobot kriteria dan hasil alternatif.")
+    
+    # Ambil Nama Alternatif dari data input
+    alt_names_map = df_alternatif.drop_duplicates(subset=['Kode Alternatif'])
+    alt_names_map = dict(zip(alt_names_map['Kode Alternatif'], alt_names_map['Nama Alternatif']))
+
+    # Hasil Skor Akhir berdasarkan bobot kriteria (hasil dari tahap kriteria)
+    with profiling.stage("pembobotan", result[common_cols].shape):
+        result["Skor Akhir"] = result[common_cols].to_numpy() @ weights[common_cols].to_numpy()
+
+    # Perhitungan bobot kriteria (rata-rata dari tahap kriteria)
+    if with_steps:
+        steps.append(("Rata-rata Bobot Kriteria (dari langkah 1)", pd.DataFrame(weights, columns=["Rata-rata Kriteria"])))
+
+    # Urutkan hasil akhir berdasarkan skor (top-k memakai seleksi parsial, bukan sort penuh)
+    ranked = engine.rank(result["Skor Akhir"].to_numpy(dtype=float), top_k)
+    labels = [alt_names_map.get(a, a) for a in result.index]
+    with profiling.stage("tabel ranking", ranked.order.shape):
+        order, ranks = ranking_rows(ranked, find_alternatives(result.index, labels, lookup))
+        result = result.iloc[order].copy()
+        result["Ranking"] = ranks
+
+    if with_steps:
+        steps.append(("Hasil Akhir AHP", result))
+    return steps, result.reset_index().rename(columns={'index': 'Alternatif'})
+
+# ============================
+# TOPSIS CALCULATION
+# ============================
+def calculate_topsis(criteria, alternatives=None, with_steps=True, top_k=None, lookup=None):
+    """
+    Hitung metode TOPSIS. Jika with_steps=False, hanya ranking yang dibuat.
+    top_k membatasi ranking ke k alternatif teratas; lookup = daftar ID/nama yang ranking-nya selalu ditampilkan.
+    """
+    steps = []
+    
+    # 1️⃣ Validasi Data
+    dm = build_matrix(criteria, alternatives)
+    # rij = xij / √(Σxij²), y_ij = w_j * r_ij,
+    # D+ = √Σ(y_ij - y_j+)², D- = √Σ(y_ij - y_j-)², V_i = D- / (D+ + D-)
+    result = engine.topsis_engine(dm.values, dm.weights, dm.benefit, keep_intermediates=with_steps, top_k=top_k)
+    names = dm.labels
+    with profiling.stage("tabel ranking", result.order.shape):
+        df_ranking = build_ranking(names, result, 'Skor Akhir', find_alternatives(dm.alt_ids, names, lookup))
+
+    if with_steps:
+        with profiling.stage("tabel langkah", dm.values.shape):
+            inter = result.intermediates
+            # 2️⃣ Matriks Keputusan Awal (X)
+            steps.append(("Matriks Keputusan Awal", pd.DataFrame(dm.values, index=names, columns=[f"{n} ({i})" for n, i in zip(dm.crit_names, dm.crit_ids)])))
+            # 3️⃣ Normalisasi Matriks
+            steps.append(("Matriks Ternormalisasi (rij = xij / √(Σxij²))", pd.DataFrame(inter["normalized"], index=names, columns=dm.crit_names)))
+            # 4️⃣ Matriks Ternormalisasi Terbobot
+            steps.append(("Matriks Ternormalisasi Terbobot (yij = wj × rij)", pd.DataFrame(inter["weighted"], index=names, columns=[f"{n} (w={w:.3f})" for n, w in zip(dm.crit_names, inter["weights"])])))
+            # 5️⃣ Solusi Ideal Positif (A+) dan Negatif (A-)
+            steps.append(("Solusi Ideal", pd.DataFrame([inter["ideal_positive"], inter["ideal_negative"]], index=['A+ (Ideal Positif)', 'A- (Ideal Negatif)'], columns=[f"{n} ({a})" for n, a in zip(dm.crit_names, dm.attributes)])))
+            # 6️⃣ Jarak Separasi
+            steps.append(("Jarak Separasi", pd.DataFrame({'D+ (Jarak ke A+)': inter["separation_positive"], 'D- (Jarak ke A-)': inter["separation_negative"]}, index=names)))
+            # 7️⃣ Kedekatan Relatif (V)
+            steps.append(("Kedekatan Relatif (V = D- / (D+ + D-))", pd.DataFrame({'D+': inter["separation_positive"], 'D-': inter["separation_negative"], 'Skor V': result.scores}, index=names)))
+            # 8️⃣ Perangkingan Akhir
+            steps.append(("Hasil Perankingan", df_ranking))
+
+    return steps, df_ranking
+
+# ============================
+# CACHE HASIL PERHITUNGAN
+# ============================
+def calculate_cached(method_key, *data, **options):
+    """
+    Jalankan calculate_* lewat cache hasil bersama (kunci = hash isi data + metode + opsi).
+    `data` = (DecisionMatrix,) untuk saw/wp/topsis atau (df_kriteria, df_alternatif) untuk ahp.
+    Mengembalikan ((steps, ranking), hit). Saat profil aktif, cache dilewati agar setiap tahap benar-benar diukur.
+    """
+    calculators = {"saw": calculate_saw, "wp": calculate_wp, "topsis": calculate_topsis, "ahp": calculate_ahp}
+    if profiling.active() is not None:
+        return calculators[method_key](*data, **options), False
+    if method_key == "ahp":
+        parts = data
+    else:
+        dm = data[0]
+        parts = (dm.values, dm.weights, dm.attributes, dm.crit_ids, dm.crit_names, dm.alt_ids, dm.alt_names)
+    key = cache.content_key(method_key, *parts, sorted(options.items()))
+    return cache.RESULT_CACHE.get_or_compute(key, lambda: calculators[method_key](*data, **options))
+
+# ============================
+# PROFIL PER TAHAP
+# ============================
+def calculate_profiled(method_key, *data, memory=True, **options):
+    """
+    Versi headless calculate_cached dengan profil per tahap (tanpa cache). `memory` = lacak alokasi lewat
+    tracemalloc (lebih lambat). Mengembalikan ((steps, ranking), profil) dengan profil = list dict per tahap:
+    stage, path, depth, calls, seconds, peak_bytes, net_bytes, shape.
+    """
+    with profiling.profiled(memory=memory) as profiler:
+        with profiling.stage(method_key):
+            output, _ = calculate_cached(method_key, *data, **options)
+    return output, profiler.summary()
+
+def profile_frame(summary):
+    """Tabel profil untuk ditampilkan: nama tahap diindentasi sesuai kedalaman, waktu dalam ms, memori dalam MB."""
+    if not summary:
+        return pd.DataFrame(columns=['Tahap', 'Panggilan', 'Waktu (ms)', 'Alokasi Puncak (MB)', 'Alokasi Bersih (MB)', 'Ukuran'])
+    return pd.DataFrame({
+        'Tahap': ["\u2003" * row["depth"] + row["stage"] for row in summary],
+        'Panggilan': [row["calls"] for row in summary],
+        'Waktu (ms)': [row["seconds"] * 1e3 for row in summary],
+        'Alokasi Puncak (MB)': [np.nan if row["peak_bytes"] is None else row["peak_bytes"] / 1e6 for row in summary],
+        'Alokasi Bersih (MB)': [np.nan if row["net_bytes"] is None else row["net_bytes"] / 1e6 for row in summary],
+        'Ukuran': [" × ".join(map(str, row["shape"])) if row["shape"] else "" for row in summary],
+    })
+
+# ============================
+# RINGKASAN LANGKAH
+# ============================
+def step_summary(steps):
+    """Ukuran dan statistik (min, maks, rata-rata kolom numerik) setiap langkah tanpa mengirim tabelnya."""
+    rows = []
+    for title, df in steps:
+        numeric = df.select_dtypes("number").to_numpy(dtype=float)
+        finite = numeric[np.isfinite(numeric)]
+        rows.append({
+            'Langkah': title, 'Baris': df.shape[0], 'Kolom': df.shape[1],
+            'Min': finite.min() if finite.size else np.nan,
+            'Maks': finite.max() if finite.size else np.nan,
+            'Rata-rata': finite.mean() if finite.size else np.nan,
+        })
+    return pd.DataFrame(rows)
+
+# ============================
+# SKENARIO BOBOT (WHAT-IF)
+# ============================
+METHOD_KEYS = {
+    "Simple Additive Weighting (SAW)": "saw",
+    "Weighted Product (WP)": "wp",
+    "Technique for Order Preference by Similarity to Ideal Solution (TOPSIS)": "topsis",
+}
+
+def scenario_weights(dm, df_scenarios):
+    """Ambil matriks bobot (skenario × kriteria) dari DataFrame dengan satu kolom per kode kriteria."""
+    df_scenarios = strip_columns(df_scenarios)
+    missing = [cid for cid in dm.crit_ids if cid not in df_scenarios.columns]
+    if missing:
+        raise ValueError(f"Kolom bobot untuk kriteria {', '.join(missing)} tidak ditemukan di file skenario.")
+    return df_scenarios[list(dm.crit_ids)].apply(pd.to_numeric, errors="coerce").fillna(0.0).to_numpy(dtype=float)
+
+def calculate_scenarios(dm, method_key, weight_matrix):
+    """Evaluasi semua skenario bobot sekaligus; bobot di DecisionMatrix menjadi ranking acuan."""
+    result = engine.evaluate_scenarios(method_key, dm.values, weight_matrix, dm.benefit, base_weights=dm.weights)
+    summary = result.summary
+    df_summary = pd.DataFrame({
+        'Alternatif': dm.labels,
+        'Ranking Awal': summary["base_rank"],
+        'Ranking Terbaik': summary["min_rank"],
+        'Ranking Terburuk': summary["max_rank"],
+        'Rata-rata Ranking': summary["mean_rank"],
+        'Skenario Berubah': summary["n_changed"],
+        'Peluang Peringkat 1': summary["top1_share"],
+    }).sort_values('Ranking Awal', kind="stable")
+    df_per_scenario = pd.DataFrame({
+        'Skenario': np.arange(1, len(weight_matrix) + 1),
+        'Alternatif Berubah Ranking': summary["scenario_n_changed"],
+        'Peringkat 1': dm.labels[summary["scenario_top1"]],
+    })
+    return result, df_summary, df_per_scenario
+
+def calculate_smaa(dm, method_key, **options):
+    """Jalankan SMAA dan susun tabel rank acceptability (%) serta bobot sentral per alternatif."""
+    result = sensitivity.smaa(method_key, dm.values, dm.weights, dm.benefit, **options)
+    df_accept = pd.DataFrame(result.acceptability * 100, columns=[f"Ranking {r+1} (%)" for r in range(result.acceptability.shape[1])])
+    df_accept.insert(0, 'Alternatif', dm.labels)
+    df_accept = df_accept.sort_values(list(df_accept.columns[1:]), ascending=False, kind="stable")
+    df_central = pd.DataFrame(result.central_weights, columns=dm.crit_ids.tolist())
+    df_central.insert(0, 'Alternatif', dm.labels)
+    df_central = df_central[result.rank1_counts > 0]
+    return result, df_accept, df_central
+
+def calculate_comparison(dm, methods=compare.COMPARE_METHODS):
+    """
+    Bandingkan beberapa metode pada DecisionMatrix yang sama: tabel ranking per metode + konsensus
+    (urut menurut ranking konsensus) dan matriks korelasi Spearman & Kendall antar metode.
+    """
+    dm = build_matrix(dm)
+    result = compare.compare(dm.values, dm.weights, dm.benefit, methods)
+    labels = [m.upper() for m in result.methods]
+    columns = {'Alternatif': dm.labels}
+    for label, scores, ranks in zip(labels, result.scores, result.ranks):
+        columns[f'Skor {label}'] = scores
+        columns[f'Ranking {label}'] = ranks
+    columns['Poin Borda'] = result.borda
+    if result.copeland is not None:
+        columns['Skor Copeland'] = result.copeland
+    columns['Ranking Konsensus'] = result.consensus_ranks
+    df_ranking = pd.DataFrame(columns).sort_values('Ranking Konsensus', kind="stable").reset_index(drop=True)
+    df_spearman = pd.DataFrame(result.spearman, index=labels, columns=labels)
+    df_kendall = pd.DataFrame(result.kendall, index=labels, columns=labels)
+    return result, df_ranking, df_spearman, df_kendall
+
+# ============================
+# EXPORT
+# ============================
+EXPORT_FORMATS = ("csv", "parquet", "feather")
+
+def _export_frame(df):
+    """DataFrame siap tulis: indeks non-default menjadi kolom, nama kolom berupa teks unik."""
+    if not isinstance(df.index, pd.RangeIndex):
+        df = df.reset_index(names=df.index.name or "Baris")
+    columns, seen = [], {}
+    for col in map(str, df.columns):
+        seen[col] = seen.get(col, 0) + 1
+        columns.append(col if seen[col] == 1 else f"{col}.{seen[col] - 1}")
+    return df.set_axis(columns, axis=1)
+
+def write_table(df, path, fmt=None):
+    """Tulis DataFrame ke CSV, Parquet, atau Feather (Arrow IPC); format mengikuti ekstensi jika `fmt` None."""
+    fmt = fmt or table_format(path)
+    if fmt in ("parquet", "feather"):
+        pa = _pyarrow()
+        table = pa.Table.from_pandas(_export_frame(df), preserve_index=False)
+        if fmt == "parquet":
+            pa.parquet.write_table(table, path)
+        else:
+            pa.feather.write_feather(table, path)
+    elif fmt == "csv":
+        _export_frame(df).to_csv(path, index=False)
+    else:
+        raise ValueError(f"Format ekspor '{fmt}' tidak dikenal. Pilih salah satu dari: {', '.join(EXPORT_FORMATS)}.")
+
+def step_file_name(i, title, fmt):
+    slug = re.sub(r"[^0-9A-Za-z]+", "_", title).strip("_")[:60] or "langkah"
+    return f"{i:02d}_{slug}.{fmt}"
+
+def export_steps(steps, ranking, directory, fmt="parquet"):
+    """Tulis ranking dan setiap matriks langkah ke `directory` (satu file per tabel). Mengembalikan list path."""
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, f"00_ranking.{fmt}")]
+    write_table(ranking, paths[0], fmt)
+    for i, (title, df) in enumerate(steps, start=1):
+        paths.append(os.path.join(directory, step_file_name(i, title, fmt)))
+        write_table(df, paths[-1], fmt)
+    return paths
+
+def export_bundle(steps, ranking, fmt="parquet"):
+    """Ranking dan semua matriks langkah sebagai satu arsip ZIP (bytes) untuk diunduh."""
+    tables = [(f"00_ranking.{fmt}", ranking)] + [(step_file_name(i, title, fmt), df) for i, (title, df) in enumerate(steps, start=1)]
+    buf = BytesIO()
+    # Parquet sudah terkompresi; hanya CSV yang dikompresi ulang di ZIP
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED if fmt == "csv" else zipfile.ZIP_STORED) as zf:
+        for name, df in tables:
+            item = BytesIO()
+            write_table(df, item, fmt)
+            zf.writestr(name, item.getvalue())
+    return buf.getvalue()
+
@@ -0,0 +1,169 @@
+# Nama Program    : profiling.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Instrumentasi opsional per tahap (waktu, alokasi memori, ukuran matriks) untuk perhitungan DSS.
+#                   Tahap dicatat hanya di dalam blok `profiled()`; di luar blok itu `stage()` tidak melakukan apa pun,
+#                   jadi kode perhitungan boleh ditandai tanpa memperlambat pemakaian normal.
+
+import contextvars
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_ACTIVE = contextvars.ContextVar("dss_profiler", default=None)
+
+# ============================
+# DATA TYPES
+# ============================
+class StageRecord:
+    """
+    Satu tahap terukur: `path` = nama tahap beserta induknya, `seconds` = waktu dinding, `peak_bytes` = alokasi
+    puncak di atas memori saat tahap dimulai, `net_bytes` = selisih memori akhir − awal, `shape` = ukuran matriks.
+    """
+    __slots__ = ("name", "path", "depth", "seconds", "peak_bytes", "net_bytes", "shape")
+
+    def __init__(self, name, path, depth, seconds, peak_bytes, net_bytes, shape):
+        self.name = name
+        self.path = path
+        self.depth = depth
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+        self.net_bytes = net_bytes
+        self.shape = shape
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+class Profiler:
+    """Kumpulan StageRecord terurut sesuai waktu mulai (induk sebelum anak), memori dilacak tracemalloc jika `memory`."""
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.records = []
+        self._stack = []  # [nama, slot di records, waktu mulai, memori awal, puncak sementara]
+
+    def _traced(self):
+        return self.memory and tracemalloc.is_tracing()
+
+    def enter(self, name):
+        # Slot dipesan saat tahap dimulai agar urutan records = urutan mulai, walau anak selesai lebih dulu
+        self.records.append(None)
+        slot = len(self.records) - 1
+        if self._traced():
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Puncak induk sejauh ini disimpan sebelum penghitung puncak di-reset untuk tahap anak
+                self._stack[-1][4] = max(self._stack[-1][4], peak)
+            tracemalloc.reset_peak()
+            self._stack.append([name, slot, time.perf_counter(), current, current])
+        else:
+            self._stack.append([name, slot, time.perf_counter(), None, 0])
+
+    def exit(self, shape=None):
+        name, slot, start, mem_start, running_peak = self._stack.pop()
+        seconds = time.perf_counter() - start
+        peak_bytes = net_bytes = None
+        if mem_start is not None and self._traced():
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, running_peak)
+            peak_bytes, net_bytes = peak - mem_start, current - mem_start
+            if self._stack:
+                self._stack[-1][4] = max(self._stack[-1][4], peak)
+        path = " › ".join([frame[0] for frame in self._stack] + [name])
+        self.records[slot] = StageRecord(name, path, len(self._stack), seconds, peak_bytes, net_bytes,
+                                         tuple(int(n) for n in shape) if shape is not None else None)
+
+    def to_records(self):
+        """Tahap yang sudah selesai sebagai list dict (urutan mulai)."""
+        return [r.to_dict() for r in self.records if r is not None]
+
+    def summary(self):
+        """
+        Satu baris per path tahap (urutan kemunculan pertama): jumlah pemanggilan, total detik, alokasi puncak
+        terbesar, total alokasi bersih, dan ukuran terakhir. Tahap berulang (mis. per chunk) dijumlahkan.
+        """
+        rows = {}
+        for r in self.records:
+            if r is None:
+                continue
+            row = rows.get(r.path)
+            if row is None:
+                rows[r.path] = {"stage": r.name, "path": r.path, "depth": r.depth, "calls": 1, "seconds": r.seconds,
+                                "peak_bytes": r.peak_bytes, "net_bytes": r.net_bytes, "shape": r.shape}
+                continue
+            row["calls"] += 1
+            row["seconds"] += r.seconds
+            if r.peak_bytes is not None:
+                row["peak_bytes"] = max(row["peak_bytes"], r.peak_bytes)
+                row["net_bytes"] += r.net_bytes
+            row["shape"] = r.shape or row["shape"]
+        return list(rows.values())
+
+    def hottest(self):
+        return hottest(self.summary())
+
+# ============================
+# API
+# ============================
+class _Stage:
+    __slots__ = ("profiler", "name", "shape")
+
+    def __init__(self, profiler, name, shape):
+        self.profiler = profiler
+        self.name = name
+        self.shape = shape
+
+    def __enter__(self):
+        self.profiler.enter(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.exit(self.shape)
+        return False
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_STAGE = _NoStage()
+
+def stage(name, shape=None):
+    """Tandai satu tahap: `with stage("normalisasi", matrix.shape): ...`. Tanpa profiler aktif hanya satu lookup."""
+    profiler = _ACTIVE.get()
+    if profiler is None:
+        return _NO_STAGE
+    return _Stage(profiler, name, shape)
+
+def hottest(summary):
+    """Baris ringkasan tahap terdalam (tanpa sub-tahap) dengan total waktu terbesar, atau None jika kosong."""
+    parents = {row["path"].rsplit(" › ", 1)[0] for row in summary if row["depth"]}
+    leaves = [row for row in summary if row["path"] not in parents]
+    return max(leaves, key=lambda row: row["seconds"], default=None)
+
+def active():
+    """Profiler yang sedang aktif di konteks ini, atau None."""
+    return _ACTIVE.get()
+
+@contextmanager
+def profiled(profiler=None, memory=True):
+    """
+    Aktifkan pencatatan tahap di dalam blok ini (per thread/konteks). tracemalloc dinyalakan jika `memory`
+    dan dimatikan lagi setelah blok selesai bila dinyalakan di sini. Menghasilkan Profiler.
+    """
+    profiler = profiler or Profiler(memory)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    token = _ACTIVE.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _ACTIVE.reset(token)
+        if started:
+            tracemalloc.stop()
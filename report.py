@@ -0,0 +1,156 @@
+# Nama Program    : report.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Laporan Excel (.xlsx) langkah perhitungan: sheet pertama = ranking dengan highlight top-3,
+#                   lalu satu sheet per langkah. Ditulis dengan workbook write-only openpyxl yang mengalirkan baris
+#                   langsung ke file, dan nilai disiapkan per blok kolom, sehingga memori tidak bergantung pada jumlah baris.
+
+import datetime
+import re
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Font, PatternFill
+
+from mcdm import _export_frame
+
+TOP3_COLORS = {1: '#AF93D7', 2: '#C7AFE1', 3: '#E1CEF0'}
+XLSX_MAX_ROWS = 1_048_576   # Batas baris per sheet Excel (termasuk header)
+XLSX_CHUNK_ROWS = 20_000    # Baris yang nilainya disiapkan sekaligus
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+HEADER_FONT = Font(bold=True)
+RANK_FILLS = {rank: PatternFill("solid", fgColor=color.lstrip("#").upper()) for rank, color in TOP3_COLORS.items()}
+
+# Baris teratas tabel ranking yang diberi gaya highlight_top3 (app & benchmark); sisanya ditampilkan tanpa Styler
+RANKING_STYLED_ROWS = 100
+
+def highlight_top3(frame):
+    """CSS seluruh potongan tabel sekaligus dari kolom Ranking (satu panggilan, bukan per baris); untuk Styler.apply(axis=None)."""
+    colors = frame["Ranking"].map(TOP3_COLORS)
+    css = np.where(colors.notna(), "background-color: " + colors.fillna("").astype(str), "")
+    return pd.DataFrame(np.repeat(css[:, None], frame.shape[1], axis=1), index=frame.index, columns=frame.columns)
+
+# ============================
+# NILAI SEL
+# ============================
+_CELL_TYPES = (str, bool, int, float, datetime.datetime, datetime.date, datetime.time, datetime.timedelta)
+
+def _text_value(v):
+    """Nilai sel dari kolom campuran: teks dibersihkan dari karakter kontrol, tipe lain yang tidak dikenal Excel jadi teks."""
+    if isinstance(v, str):
+        return ILLEGAL_CHARACTERS_RE.sub("", v)
+    if isinstance(v, float) and not np.isfinite(v):
+        return None
+    if isinstance(v, _CELL_TYPES):
+        return v
+    if isinstance(v, np.generic):
+        return _text_value(v.item())
+    return ILLEGAL_CHARACTERS_RE.sub("", str(v))
+
+def _column_values(values):
+    """Nilai sel satu kolom (Series) sebagai array objek; NaN/±inf/kosong menjadi None karena Excel tidak mengenalnya."""
+    if pd.api.types.is_bool_dtype(values) and not values.hasnans:
+        return values.to_numpy(dtype=object)
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        out = values.to_numpy(dtype=object)
+        out[~np.isfinite(values.to_numpy(dtype=float, na_value=np.nan))] = None
+        return out
+    raw = values.to_numpy(dtype=object)
+    missing = pd.isna(raw)
+    return np.array([None if m else _text_value(v) for v, m in zip(raw, missing)], dtype=object)
+
+def _iter_rows(df, start, stop):
+    """Baris `df[start:stop]` sebagai tuple nilai sel; konversi dilakukan per kolom untuk setiap blok baris."""
+    for i in range(start, stop, XLSX_CHUNK_ROWS):
+        block = df.iloc[i:min(i + XLSX_CHUNK_ROWS, stop)]
+        if not block.shape[1]:
+            yield from (() for _ in range(len(block)))
+            continue
+        yield from zip(*(_column_values(block.iloc[:, j]) for j in range(block.shape[1])))
+
+# ============================
+# NAMA SHEET
+# ============================
+# Kata yang disingkat (berurutan) bila judul langkah melebihi 31 karakter
+SHEET_ABBREVIATIONS = (("Alternatif", "Alt"), ("Kriteria", "Krit"), ("Perbandingan", "Banding"), ("Normalisasi", "Norm"),
+                       ("Matriks", "Mat"))
+SHEET_QUALIFIER_MAX = 16    # Keterangan akhir "(...)" tanpa spasi sepanjang ini (mis. kode kriteria) selalu dipertahankan
+
+def _short_title(title):
+    """Judul ≤ 31 karakter: kata disingkat dulu, lalu bagian depan dipotong; keterangan akhir "(C1)" tetap utuh."""
+    match = re.fullmatch(r"(.*\S)\s*(\([^()\s]{1,%d}\))" % SHEET_QUALIFIER_MAX, title)
+    head, qualifier = (match.group(1), " " + match.group(2)) if match else (title, "")
+    for word, short in SHEET_ABBREVIATIONS:
+        if len(head) + len(qualifier) <= 31:
+            break
+        head = head.replace(word, short)
+    return head[:31 - len(qualifier)].rstrip() + qualifier
+
+def sheet_title(title, used):
+    """Nama sheet valid (≤ 31 karakter, tanpa []:*?/\\) yang belum dipakai; `used` diperbarui."""
+    base = _short_title(re.sub(r"[\[\]:*?/\\]", "", str(title)).strip("' ")) or "Sheet"
+    name, n = base, 1
+    while name.lower() in used:
+        n += 1
+        suffix = f" ({n})"
+        name = base[:31 - len(suffix)] + suffix
+    used.add(name.lower())
+    return name
+
+def _plan_sheets(tables):
+    """(nama sheet, DataFrame, baris awal, baris akhir, gaya baris); tabel melebihi batas Excel dipecah."""
+    per_sheet = XLSX_MAX_ROWS - 1
+    used, plan = set(), []
+    for title, df, row_styles in tables:
+        n_parts = max(1, -(-len(df) // per_sheet))
+        for part in range(n_parts):
+            name = sheet_title(title if part == 0 else f"{title} ({part + 1} dari {n_parts})", used)
+            start = part * per_sheet
+            plan.append((name, df, start, min(start + per_sheet, len(df)), row_styles))
+    return plan
+
+# ============================
+# EKSPOR
+# ============================
+def ranking_styles(ranking):
+    """{posisi baris: PatternFill} untuk alternatif peringkat 1–3, sama seperti highlight_top3 di aplikasi."""
+    if "Ranking" not in ranking.columns:
+        return {}
+    ranks = pd.to_numeric(ranking["Ranking"], errors="coerce").to_numpy()
+    return {int(pos): RANK_FILLS[rank] for rank in RANK_FILLS for pos in np.flatnonzero(ranks == rank)}
+
+def _styled_row(sheet, values, fill=None, font=None):
+    cells = []
+    for value in values:
+        cell = WriteOnlyCell(sheet, value=value)
+        if fill is not None:
+            cell.fill = fill
+        if font is not None:
+            cell.font = font
+        cells.append(cell)
+    return cells
+
+def export_workbook(steps, ranking, target):
+    """
+    Tulis laporan Excel ke `target` (path atau buffer biner, mis. BytesIO untuk tombol unduh): sheet pertama
+    ranking dengan top-3 diwarnai, lalu satu sheet per langkah. Workbook write-only mengalirkan setiap baris
+    ke file sementara, jadi memori puncak sebanding dengan satu blok `XLSX_CHUNK_ROWS` baris, bukan ukuran laporan.
+    Mengembalikan `target`.
+    """
+    ranking = _export_frame(ranking)
+    tables = [("Ranking", ranking, ranking_styles(ranking))] + [(title, _export_frame(df), None) for title, df in steps]
+    workbook = Workbook(write_only=True)
+    for name, df, start, stop, row_styles in _plan_sheets(tables):
+        sheet = workbook.create_sheet(name)
+        sheet.freeze_panes = "A2"
+        sheet.append(_styled_row(sheet, [_text_value(str(c)) for c in df.columns], font=HEADER_FONT))
+        for pos, values in enumerate(_iter_rows(df, start, stop), start=start):
+            fill = row_styles.get(pos) if row_styles else None
+            sheet.append(values if fill is None else _styled_row(sheet, values, fill=fill))
+    workbook.save(target)
+    return target
@@ -0,0 +1,202 @@
+# Nama Program    : sensitivity.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Analisis sensitivitas stokastik (gaya SMAA) untuk SAW, WP, dan TOPSIS. Bobot (dan opsional
+#                   nilai matriks) diambil secara acak, dihitung paralel per chunk di process pool, dan frekuensi
+#                   ranking dialirkan ke akumulator berjalan sehingga sampel tidak pernah disimpan seluruhnya.
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+import engine
+
+# Batas memori kasar untuk satu blok skor (sampel × alternatif), atau tumpukan matriks terganggu
+# (sampel × alternatif × kriteria) pada mode gangguan nilai, di setiap worker
+CHUNK_BYTES = 32 * 1024 * 1024
+
+# ============================
+# DATA TYPES
+# ============================
+class SMAAResult:
+    """
+    Hasil analisis SMAA:
+    - acceptability[i, r] : proporsi sampel di mana alternatif i berada di ranking r+1 (r < max_rank)
+    - central_weights[i]  : rata-rata vektor bobot pada sampel di mana alternatif i menjadi peringkat 1 (NaN jika tidak pernah)
+    """
+    __slots__ = ("acceptability", "central_weights", "rank1_counts", "n_samples")
+
+    def __init__(self, acceptability, central_weights, rank1_counts, n_samples):
+        self.acceptability = acceptability
+        self.central_weights = central_weights
+        self.rank1_counts = rank1_counts
+        self.n_samples = n_samples
+
+class RankAccumulator:
+    """Akumulator berjalan: jumlah kemunculan per (alternatif, ranking) dan jumlah bobot saat peringkat 1."""
+
+    def __init__(self, n_alternatives, n_criteria, max_rank):
+        self.max_rank = max_rank
+        self.counts = np.zeros((n_alternatives, max_rank), dtype=np.int64)
+        self.weight_sums = np.zeros((n_alternatives, n_criteria), dtype=np.float64)
+        self.n_samples = 0
+
+    def update(self, top, weights):
+        """`top` = indeks alternatif terurut per sampel (sampel × max_rank), `weights` = bobot sampel."""
+        n_alt = self.counts.shape[0]
+        flat = top * self.max_rank + np.arange(self.max_rank)[None, :]
+        self.counts += np.bincount(flat.ravel(), minlength=n_alt * self.max_rank).reshape(n_alt, self.max_rank)
+        np.add.at(self.weight_sums, top[:, 0], weights)
+        self.n_samples += len(top)
+
+    def merge(self, counts, weight_sums, n_samples):
+        self.counts += counts
+        self.weight_sums += weight_sums
+        self.n_samples += n_samples
+
+    def result(self):
+        n = max(self.n_samples, 1)
+        rank1 = self.counts[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            central = self.weight_sums / rank1[:, None]
+        central[rank1 == 0] = np.nan
+        return SMAAResult(self.counts / n, central, rank1.copy(), self.n_samples)
+
+# ============================
+# SAMPLING
+# ============================
+def sample_weights(rng, base_weights, size, mode="dirichlet", spread=0.1, concentration=None):
+    """
+    Ambil `size` vektor bobot ternormalisasi.
+    - dirichlet: Dirichlet(1, ..., 1) jika `concentration` None, atau Dirichlet(concentration × bobot dasar)
+    - interval : w_j ~ U(w_j(1 - spread), w_j(1 + spread)) lalu dinormalisasi
+    """
+    base = engine.normalize_weights(base_weights)
+    if mode == "dirichlet":
+        alpha = np.ones_like(base) if concentration is None else np.maximum(concentration * base, 1e-6)
+        return rng.dirichlet(alpha, size=size)
+    if mode == "interval":
+        low = np.maximum(base * (1 - spread), 0.0)
+        high = base * (1 + spread)
+        return engine.normalize_weight_matrix(rng.uniform(low, high, size=(size, len(base))))
+    raise ValueError(f"Mode sampling bobot '{mode}' tidak dikenal. Pilih 'dirichlet' atau 'interval'.")
+
+def top_ranks(scores, max_rank):
+    """Indeks `max_rank` alternatif teratas per baris (skor turun, indeks kecil dulu) memakai seleksi parsial."""
+    n = scores.shape[1]
+    if max_rank >= n:
+        return np.argsort(-scores, axis=1, kind="stable")
+    part = np.argpartition(-scores, max_rank - 1, axis=1)[:, :max_rank]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.lexsort((part, -part_scores), axis=1)
+    return np.take_along_axis(part, order, axis=1)
+
+# ============================
+# WORKER
+# ============================
+_WORKER = {}
+
+def _worker_context(method, matrix, weights, benefit, options):
+    return {"method": method, "matrix": matrix, "weights": weights, "benefit": benefit, "options": options,
+            "evaluator": engine.ScenarioEvaluator(matrix, benefit)}
+
+def _init_worker(method, matrix, weights, benefit, options):
+    """Dijalankan sekali per proses: matriks dikirim sekali, bukan per tugas."""
+    _WORKER.update(_worker_context(method, matrix, weights, benefit, options))
+
+def _run_chunk(seed, n_samples, context=None):
+    """
+    Hitung satu chunk sampel dan kembalikan hanya akumulator (bukan sampelnya). Dengan gangguan nilai, setiap
+    sampel mendapat matriks terganggu sendiri, jadi (bobot, nilai) tiap sampel adalah undian yang saling lepas.
+    """
+    w = context or _WORKER
+    opts = w["options"]
+    rng = np.random.default_rng(seed)
+    n_alt, n_crit = w["matrix"].shape
+    acc = RankAccumulator(n_alt, n_crit, opts["max_rank"])
+    step = max(1, CHUNK_BYTES // (8 * n_alt))
+    if opts["value_noise"] > 0:
+        step = max(1, CHUNK_BYTES // (8 * n_alt * n_crit))
+
+    done = 0
+    while done < n_samples:
+        size = min(step, n_samples - done)
+        weights = sample_weights(rng, w["weights"], size, opts["mode"], opts["spread"], opts["concentration"])
+        if opts["value_noise"] > 0:
+            noise = rng.uniform(-opts["value_noise"], opts["value_noise"], size=(size, n_alt, n_crit))
+            scores = engine.stacked_scores(w["method"], w["matrix"] * (1.0 + noise), weights, w["benefit"])
+        else:
+            scores = getattr(w["evaluator"], w["method"])(weights)
+        acc.update(top_ranks(scores, opts["max_rank"]), weights)
+        done += size
+    return acc.counts, acc.weight_sums, acc.n_samples
+
+# ============================
+# SMAA
+# ============================
+def smaa(method, matrix, weights, benefit, n_samples=10000, mode="dirichlet", spread=0.1, concentration=None,
+         value_noise=0.0, max_rank=None, chunk_size=10000, workers=None, seed=None):
+    """
+    Rank acceptability analysis (SMAA) untuk metode 'saw', 'wp', atau 'topsis'.
+
+    Sampel dibagi menjadi chunk berukuran `chunk_size` yang dikerjakan di process pool
+    (`workers` = jumlah proses; 0/1 = tanpa pool). Setiap chunk hanya mengembalikan hitungan
+    ranking, sehingga memori tidak bergantung pada `n_samples`. `max_rank` membatasi berapa
+    ranking teratas yang dicatat (default: semua jika alternatif ≤ 20, selain itu 10).
+    Hasil dapat direproduksi dengan `seed` yang sama berapa pun jumlah worker-nya.
+    """
+    method = method.lower()
+    if method not in ("saw", "wp", "topsis"):
+        raise ValueError(f"Metode '{method}' tidak dikenal. Pilih salah satu dari: saw, wp, topsis.")
+    matrix = engine.as_matrix(matrix)
+    n_alt, n_crit = matrix.shape
+    if n_alt == 0 or n_crit == 0:
+        raise ValueError("Kriteria atau alternatif kosong.")
+    weights = np.asarray(weights, dtype=np.float64)
+    benefit = engine.benefit_mask(benefit, n_crit)
+    if max_rank is None:
+        max_rank = n_alt if n_alt <= 20 else 10
+    max_rank = max(1, min(int(max_rank), n_alt))
+    options = {"mode": mode, "spread": spread, "concentration": concentration,
+               "value_noise": value_noise, "max_rank": max_rank}
+
+    sizes = [chunk_size] * (n_samples // chunk_size)
+    if n_samples % chunk_size:
+        sizes.append(n_samples % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    acc = RankAccumulator(n_alt, n_crit, max_rank)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(sizes))
+    if workers <= 1:
+        # Konteks lokal: matriks & evaluator tidak tertinggal di _WORKER proses pemanggil (mis. server Streamlit)
+        context = _worker_context(method, matrix, weights, benefit, options)
+        for s, size in zip(seeds, sizes):
+            acc.merge(*_run_chunk(s, size, context))
+        return acc.result()
+
+    # Jumlah tugas yang sedang berjalan dibatasi agar hasil yang menunggu digabung tidak menumpuk.
+    # spawn: fork dari proses yang memiliki banyak thread (mis. server Streamlit) tidak aman
+    tasks = iter(zip(seeds, sizes))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(method, matrix, weights, benefit, options)) as pool:
+        pending = {pool.submit(_run_chunk, s, size) for s, size in _take(tasks, 2 * workers)}
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                acc.merge(*future.result())
+            pending |= {pool.submit(_run_chunk, s, size) for s, size in _take(tasks, len(finished))}
+    return acc.result()
+
+def _take(iterator, n):
+    out = []
+    for _ in range(n):
+        item = next(iterator, None)
+        if item is None:
+            break
+        out.append(item)
+    return out
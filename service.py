@@ -0,0 +1,473 @@
+# Nama Program    : service.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Layanan HTTP lokal untuk perhitungan SAW, WP, TOPSIS, dan AHP (tanpa Streamlit, hanya stdlib).
+#                   Front end asyncio menerima payload JSON atau Arrow IPC, perhitungan dikirim ke pool worker
+#                   berukuran tetap. Jika antrean penuh, permintaan langsung ditolak (503 + Retry-After) alih-alih
+#                   menumpuk, dan setiap respons membawa header Server-Timing (parse, antre, hitung, encode).
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from mcdm import (calculate_ahp, calculate_profiled, calculate_saw, calculate_topsis, calculate_wp,
+                  load_decision_matrix, parse_criteria, step_summary)
+
+CALCULATORS = {"saw": calculate_saw, "wp": calculate_wp, "topsis": calculate_topsis, "ahp": calculate_ahp}
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 256 * 1024 * 1024
+MAX_HEADER_LINES = 100
+KEEPALIVE_SECONDS = 15
+RETRY_AFTER_SECONDS = 1
+
+JSON_TYPE = "application/json"
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+ARROW_FILE_TYPE = "application/vnd.apache.arrow.file"
+
+class HTTPError(Exception):
+    """Kesalahan yang langsung dijawab sebagai respons HTTP dengan status dan pesan tertentu."""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+    def __reduce__(self):
+        # Agar bisa dikirim balik dari worker proses dengan status & header utuh
+        return HTTPError, (self.status, str(self), self.headers)
+
+# ============================
+# WORKER (DIJALANKAN DI POOL)
+# ============================
+def _frame(data, name):
+    """DataFrame dari list record ({kolom: nilai}) atau dict kolom ({kolom: [nilai, ...]}); DataFrame dipakai langsung."""
+    if data is None or isinstance(data, pd.DataFrame):
+        return data
+    if not isinstance(data, (list, dict)):
+        raise ValueError(f"'{name}' harus berupa list record atau dict kolom.")
+    return pd.DataFrame(data)
+
+def score_problem(problem):
+    """
+    Hitung satu masalah keputusan. `problem` = dict berisi `method`, `criteria`, `alternatives` (format kolom sama
+    seperti file CSV aplikasi), dan opsional `top_k`, `lookup`, `weight_method` (AHP), `steps` (ringkasan langkah),
+    `profile` (profil per tahap). Mengembalikan (ranking, ringkasan langkah/None, profil/None, detik hitung).
+    """
+    start = time.perf_counter()
+    if not isinstance(problem, dict):
+        raise ValueError("Setiap masalah harus berupa objek JSON.")
+    method = str(problem.get("method", "")).lower()
+    if method not in CALCULATORS:
+        raise ValueError(f"Metode '{problem.get('method')}' tidak dikenal. Pilih salah satu dari: {', '.join(CALCULATORS)}.")
+    df_crit = _frame(problem.get("criteria"), "criteria")
+    df_alt = _frame(problem.get("alternatives"), "alternatives")
+    if df_alt is None:
+        raise ValueError("Data 'alternatives' wajib diisi.")
+    with_steps = bool(problem.get("steps", False))
+    try:
+        top_k = int(problem.get("top_k") or 0) or None
+    except (ValueError, TypeError):
+        raise ValueError("'top_k' harus berupa bilangan bulat.")
+    options = {"top_k": top_k, "lookup": problem.get("lookup"), "with_steps": with_steps}
+
+    if method == "ahp":
+        if df_crit is None:
+            raise ValueError("AHP membutuhkan 'criteria' (matriks perbandingan kriteria).")
+        data = (df_crit, df_alt)
+        options["weight_method"] = problem.get("weight_method", "approx")
+    else:
+        dm = load_decision_matrix(df_alt, df_crit)
+        if dm is None:
+            raise ValueError("Kriteria tidak ditemukan. Sertakan 'criteria' atau kolom C1, C2, ... pada alternatif.")
+        data = (dm,)
+
+    profile = None
+    if problem.get("profile"):
+        (steps, ranking), profile = calculate_profiled(method, *data, **options)
+    else:
+        steps, ranking = CALCULATORS[method](*data, **options)
+    summary = step_summary(steps) if with_steps else None
+    return ranking, summary, profile, time.perf_counter() - start
+
+def score_request(problem, content_type=JSON_TYPE, query=None, arrow=False, problem_id=None):
+    """
+    Entry point pool: `problem` = dict, atau body mentah (bytes) berupa JSON maupun tabel Arrow IPC (`content_type`
+    & parameter URL `query`). Body di-decode di worker agar event loop tidak tertahan payload besar dan buffer Arrow
+    tidak perlu menjadi DataFrame sebelum dikirim ke pool. Hasil langsung di-encode di worker: JSON lengkap, atau
+    Arrow IPC stream (ranking saja). Mengembalikan (body respons, {"parse", "score", "encode"} dalam detik).
+    """
+    start = time.perf_counter()
+    if isinstance(problem, bytes):
+        if content_type in (ARROW_STREAM_TYPE, ARROW_FILE_TYPE):
+            problem = arrow_problem(read_arrow_body(problem, content_type), query or {})
+        else:
+            problem = parse_json(problem)
+    parsed = time.perf_counter()
+    ranking, summary, profile, seconds = score_problem(problem)
+    scored = time.perf_counter()
+    if arrow:
+        body = write_arrow_stream(ranking)
+    else:
+        body = _dumps(_result_json(ranking, summary, profile, seconds, problem_id))
+    return body, {"parse": parsed - start, "score": scored - parsed, "encode": time.perf_counter() - scored}
+
+def split_batch(body):
+    """
+    Entry point pool untuk /batch: parse body {"problems": [...]} di worker, lalu setiap masalah di-encode ulang
+    menjadi JSON tersendiri, jadi yang kembali ke event loop hanya bytes (murah di-unpickle) dan setiap masalah
+    di-parse lagi oleh worker yang menghitungnya. Mengembalikan (list body masalah, list id, detik parse).
+    """
+    start = time.perf_counter()
+    payload = parse_json(body)
+    problems = payload.get("problems") if isinstance(payload, dict) else None
+    if not isinstance(problems, list):
+        raise ValueError("Body batch harus berupa {\"problems\": [...]}.")
+    ids = [p.get("id") if isinstance(p, dict) else None for p in problems]
+    return [_dumps(p) for p in problems], ids, time.perf_counter() - start
+
+def _warmup():
+    return os.getpid()
+
+# ============================
+# ENCODING
+# ============================
+def _records(df):
+    """Record JSON dari DataFrame; NaN menjadi null, tipe NumPy menjadi tipe Python."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+def _result_json(ranking, summary, profile, seconds, problem_id=None):
+    result = {"ranking": _records(ranking), "seconds": seconds}
+    if problem_id is not None:
+        result = {"id": problem_id, **result}
+    if summary is not None:
+        result["steps"] = _records(summary)
+    if profile is not None:
+        result["profile"] = profile
+    return result
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8")
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise HTTPError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Payload Arrow membutuhkan paket 'pyarrow' di server.")
+    return pyarrow
+
+def read_arrow_body(body, content_type):
+    """DataFrame dari body Arrow IPC (stream atau file/Feather), tanpa salinan untuk kolom numerik."""
+    pa = _pyarrow()
+    try:
+        source = pa.BufferReader(body)
+        reader = pa.ipc.open_stream(source) if content_type == ARROW_STREAM_TYPE else pa.ipc.open_file(source)
+        return reader.read_all().to_pandas(split_blocks=True)
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Payload Arrow tidak valid: {e}")
+
+def write_arrow_stream(df):
+    pa = _pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def arrow_problem(df_alt, query):
+    """
+    Masalah dari payload Arrow (tabel alternatif) + parameter URL: `method`, `top_k`, `weights` (bobot sesuai urutan
+    kolom C1, C2, ... di tabel), dan `cost` (kode kriteria cost, dipisah koma). AHP butuh dua tabel, jadi hanya lewat JSON.
+    """
+    method = query.get("method", "")
+    if method.lower() == "ahp":
+        raise ValueError("AHP membutuhkan dua tabel (kriteria & alternatif); kirim sebagai JSON.")
+    criteria = parse_criteria(df_alt)
+    if not criteria:
+        raise ValueError("Kolom kriteria C1, C2, ... tidak ditemukan pada tabel Arrow.")
+    weights = [w for w in query.get("weights", "").split(",") if w.strip()]
+    if weights and len(weights) != len(criteria):
+        raise ValueError(f"Jumlah bobot ({len(weights)}) tidak sama dengan jumlah kriteria ({len(criteria)}).")
+    try:
+        weights = [float(w) for w in weights] or [c.weight for c in criteria]
+    except ValueError:
+        raise ValueError("Parameter 'weights' harus berupa angka yang dipisah koma.")
+    cost = {c.strip().upper() for c in query.get("cost", "").split(",") if c.strip()}
+    return {
+        "method": method,
+        "criteria": {
+            "Kode Kriteria": [c.id for c in criteria],
+            "Bobot": weights,
+            "Atribut": ["cost" if c.id.upper() in cost else "benefit" for c in criteria],
+        },
+        "alternatives": df_alt,
+        "top_k": int(query["top_k"]) if query.get("top_k", "").isdigit() else None,
+        "steps": query.get("steps") in ("1", "true"),
+        "profile": query.get("profile") in ("1", "true"),
+    }
+
+def server_timing(**stages):
+    """Header Server-Timing: `parse;dur=1.2, queue;dur=0.1, ...` (milidetik)."""
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in stages.items())
+
+# ============================
+# SERVICE
+# ============================
+class ScoringService:
+    """
+    Front end asyncio di atas pool worker. `capacity` = jumlah slot pool yang boleh dipakai sekaligus (masalah yang
+    menunggu atau sedang dihitung, default 4 × worker); permintaan yang tidak mendapat slot ditolak 503 agar latensi
+    antrean tetap terbatas. Satu /batch memakai paling banyak `batch_window` slot (default = jumlah worker) dan
+    mengalirkan masalahnya lewat slot itu, jadi ukuran batch tidak dibatasi kapasitas.
+    """
+
+    def __init__(self, workers=None, capacity=None, pool="process", max_body=MAX_BODY_BYTES, batch_window=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = capacity or 4 * self.workers
+        self.batch_window = max(1, min(batch_window or self.workers, self.capacity))
+        self.max_body = max_body
+        self.pending = 0
+        if pool == "thread":
+            self.executor = ThreadPoolExecutor(self.workers)
+        else:
+            # spawn: worker tidak mewarisi thread/event loop dari proses server
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("POST", "/score"): self.score,
+            ("POST", "/batch"): self.batch,
+        }
+
+    def warmup(self):
+        """Jalankan worker lebih awal agar permintaan pertama tidak menanggung biaya start proses & import."""
+        for future in [self.executor.submit(_warmup) for _ in range(self.workers)]:
+            future.result()
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    # ---- backpressure ----
+    @contextmanager
+    def reserved(self, n):
+        """Pakai `n` slot selama blok berjalan; 503 + Retry-After jika server sedang penuh."""
+        if self.pending + n > self.capacity:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE,
+                            f"Server sibuk ({self.pending}/{self.capacity} slot terpakai). Coba lagi.",
+                            {"Retry-After": str(RETRY_AFTER_SECONDS)})
+        self.pending += n
+        try:
+            yield
+        finally:
+            self.pending -= n
+
+    async def run(self, func, *args):
+        """Jalankan `func(*args)` di pool (slot sudah dipakai); mengembalikan (hasil, detik sejak dikirim)."""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        result = await loop.run_in_executor(self.executor, func, *args)
+        return result, time.perf_counter() - start
+
+    async def run_problem(self, problem, content_type=JSON_TYPE, query=None, arrow=False, problem_id=None):
+        """Hitung satu masalah di pool; mengembalikan (body, waktu per tahap termasuk antre)."""
+        (body, timing), elapsed = await self.run(score_request, problem, content_type, query, arrow, problem_id)
+        timing["queue"] = max(0.0, elapsed - sum(timing.values()))
+        return body, timing
+
+    # ---- handlers: (metode, query, header, body) → (status, content type, body, header tambahan) ----
+    async def health(self, query, headers, body):
+        payload = {"status": "ok", "workers": self.workers, "pending": self.pending, "capacity": self.capacity}
+        return HTTPStatus.OK, JSON_TYPE, _dumps(payload), {}
+
+    async def score(self, query, headers, body):
+        """Satu masalah: body JSON atau tabel alternatif Arrow IPC dengan parameter di URL, keduanya di-decode di worker."""
+        start = time.perf_counter()
+        content_type = headers.get("content-type", JSON_TYPE).split(";")[0].strip().lower()
+        if content_type not in (JSON_TYPE, ARROW_STREAM_TYPE, ARROW_FILE_TYPE):
+            raise HTTPError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, f"Content-Type '{content_type}' tidak didukung.")
+        arrow = ARROW_STREAM_TYPE in headers.get("accept", "")
+        with self.reserved(1):
+            out, timing = await self.run_problem(body, content_type, query, arrow)
+        return HTTPStatus.OK, ARROW_STREAM_TYPE if arrow else JSON_TYPE, out, {"Server-Timing": server_timing(
+            **timing, total=time.perf_counter() - start)}
+
+    async def batch(self, query, headers, body):
+        """
+        Banyak masalah dalam satu permintaan: {"problems": [...]}, tanpa batas jumlah selain ukuran body. Body
+        di-parse di worker, lalu masalah dialirkan lewat `batch_window` slot (paralel di pool); kesalahan pada satu
+        masalah dilaporkan di hasilnya tanpa menggagalkan masalah lain. Pada Server-Timing, `queue` = antrean
+        terlama, `score` & `encode` = jumlah waktu semua masalah di worker.
+        """
+        start = time.perf_counter()
+        with self.reserved(self.batch_window):
+            (problems, ids, parse_seconds), _ = await self.run(split_batch, body)
+            outcomes = [None] * len(problems)
+            position = iter(range(len(problems)))
+
+            async def drain():
+                # Setiap slot mengambil masalah berikutnya sampai habis; urutan hasil tetap urutan masalah
+                for i in position:
+                    try:
+                        outcomes[i] = await self.run_problem(problems[i], problem_id=ids[i])
+                    except Exception as e:
+                        outcomes[i] = e
+                    problems[i] = None
+
+            await asyncio.gather(*(drain() for _ in range(min(self.batch_window, len(problems)))))
+
+        parts, timing, failed = [], {"parse": parse_seconds, "queue": 0.0, "score": 0.0, "encode": 0.0}, 0
+        for problem_id, outcome in zip(ids, outcomes):
+            if isinstance(outcome, BaseException):
+                failed += 1
+                parts.append(_dumps({"id": problem_id, "error": str(outcome)}))
+                continue
+            out, problem_timing = outcome
+            parts.append(out)
+            timing["queue"] = max(timing["queue"], problem_timing["queue"])
+            timing["score"] += problem_timing["score"]
+            timing["encode"] += problem_timing["encode"]
+        # Hasil per masalah sudah berupa JSON dari worker; cukup digabung tanpa encode ulang
+        out = b'{"results": [' + b", ".join(parts) + b'], "failed": ' + str(failed).encode() + b"}"
+        return HTTPStatus.OK, JSON_TYPE, out, {"Server-Timing": server_timing(
+            **timing, total=time.perf_counter() - start)}
+
+    # ---- HTTP/1.1 ----
+    async def handle_connection(self, reader, writer):
+        """Layani satu koneksi (keep-alive): baca permintaan, panggil handler, tulis respons."""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader, self.max_body)
+                except HTTPError as e:
+                    writer.write(build_response(e.status, JSON_TYPE, _dumps({"error": str(e)}), e.headers, False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              if version == "HTTP/1.1" else headers.get("connection", "").lower() == "keep-alive")
+                status, content_type, out, extra = await self.dispatch(method, target, headers, body)
+                writer.write(build_response(status, content_type, out, extra, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # Koneksi idle, terputus, atau baris melebihi batas StreamReader
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        handler = self.routes.get((method, url.path))
+        try:
+            if handler is None:
+                if any(path == url.path for _, path in self.routes):
+                    raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"Metode {method} tidak didukung untuk {url.path}.")
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Endpoint {url.path} tidak ditemukan.")
+            return await handler(query, headers, body)
+        except HTTPError as e:
+            return e.status, JSON_TYPE, _dumps({"error": str(e)}), e.headers
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, JSON_TYPE, _dumps({"error": str(e)}), {}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, JSON_TYPE, _dumps({"error": f"{type(e).__name__}: {e}"}), {}
+
+def parse_json(body):
+    try:
+        return json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Body JSON tidak valid: {e}")
+
+async def read_request(reader, max_body):
+    """
+    (metode, target, versi, header, body) dari satu permintaan HTTP/1.x, atau None jika koneksi ditutup.
+    Hanya penantian baris pertama yang dibatasi KEEPALIVE_SECONDS, jadi upload body besar tidak terpotong.
+    """
+    line = await asyncio.wait_for(reader.readline(), KEEPALIVE_SECONDS)
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Baris permintaan HTTP tidak valid.")
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Terlalu banyak header.")
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "Body chunked tidak didukung; kirim dengan Content-Length.")
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length tidak valid.")
+    if length > max_body:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Body melebihi batas {max_body // (1024 * 1024)} MB.")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, version.upper(), headers, body
+
+def build_response(status, content_type, body, headers, keep_alive):
+    status = HTTPStatus(status)
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}", f"Content-Type: {content_type}",
+             f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+# ============================
+# ENTRY POINT
+# ============================
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    server = await asyncio.start_server(service.handle_connection, host, port, limit=64 * 1024)
+    if ready is not None:
+        ready(server)
+    async with server:
+        await server.serve_forever()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Layanan HTTP lokal untuk ranking SAW/WP/TOPSIS/AHP.",
+        epilog="Contoh: python service.py --port 8765 --workers 4")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Alamat bind (default: {DEFAULT_HOST}, hanya lokal).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT}).")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah worker perhitungan (default: jumlah CPU).")
+    parser.add_argument("--capacity", type=int, default=None,
+                        help="Maksimal masalah yang menunggu/dihitung sekaligus sebelum ditolak 503 (default: 4 × worker).")
+    parser.add_argument("--batch-window", type=int, default=None,
+                        help="Maksimal masalah dari satu /batch yang dihitung bersamaan (default: jumlah worker).")
+    parser.add_argument("--pool", choices=["process", "thread"], default="process",
+                        help="Jenis pool worker (default: process; thread lebih hemat memori untuk matriks kecil).")
+    parser.add_argument("--max-body-mb", type=int, default=MAX_BODY_BYTES // (1024 * 1024), help="Batas ukuran body (MB).")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    service = ScoringService(args.workers, args.capacity, args.pool, args.max_body_mb * 1024 * 1024, args.batch_window)
+    service.warmup()
+    print(f"Melayani di http://{args.host}:{args.port} ({service.workers} worker {args.pool}, kapasitas {service.capacity})")
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
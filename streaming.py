@@ -0,0 +1,165 @@
+# Nama Program    : streaming.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Perhitungan SAW, WP, dan TOPSIS out-of-core untuk file alternatif yang lebih besar dari RAM.
+#                   Pass pertama membaca file per chunk untuk statistik kolom (max/min, jumlah kuadrat, log ΣS),
+#                   pass kedua menghitung skor per chunk, menulisnya ke disk, dan menyimpan top-k di heap terbatas.
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+import engine
+from mcdm import DecisionMatrix, alternative_columns, parse_criteria, read_alternatives
+
+SCORE_COLUMNS = {"saw": "Skor Akhir (V)", "wp": "Skor Akhir (V)", "topsis": "Skor Akhir"}
+
+# ============================
+# DATA TYPES
+# ============================
+class StreamResult:
+    """Hasil streaming: `top` = DataFrame top-k berperingkat, `n_rows` = jumlah alternatif, `stats` = statistik pass pertama."""
+    __slots__ = ("top", "n_rows", "stats", "output_path")
+
+    def __init__(self, top, n_rows, stats, output_path):
+        self.top = top
+        self.n_rows = n_rows
+        self.stats = stats
+        self.output_path = output_path
+
+class TopKHeap:
+    """Heap berukuran tetap untuk k skor terbaik; skor sama dimenangkan alternatif yang muncul lebih dulu."""
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []  # (skor, -indeks global, id, nama); elemen terkecil = kandidat terlemah
+
+    def push_chunk(self, scores, offset, ids, names):
+        # Seleksi parsial di dalam chunk dulu, jadi paling banyak k kandidat per chunk yang masuk heap
+        for i in engine.select_top_k(scores, self.k):
+            score = scores[i] if not np.isnan(scores[i]) else -np.inf
+            item = (score, -(offset + int(i)), ids[i], names[i])
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+            elif item > self._heap[0]:
+                heapq.heapreplace(self._heap, item)
+            else:
+                break  # Kandidat berikutnya di chunk ini pasti lebih lemah
+
+    def items(self):
+        return sorted(self._heap, reverse=True)
+
+# ============================
+# CHUNK READER
+# ============================
+def _criteria_arrays(criteria, header):
+    """(id, bobot, mask benefit) kriteria dari DecisionMatrix, list Criterion, atau deteksi kolom C1, C2, ... di header."""
+    if criteria is None:
+        criteria = parse_criteria(header)
+        if not criteria:
+            raise ValueError("Kriteria tidak ditemukan. Sertakan file kriteria atau kolom C1, C2, ... di file alternatif.")
+    if isinstance(criteria, DecisionMatrix):
+        return list(criteria.crit_ids), criteria.weights, criteria.benefit
+    return ([c.id for c in criteria], np.array([c.weight for c in criteria], dtype=float),
+            np.array([c.attribute != 'cost' for c in criteria], dtype=bool))
+
+def iter_chunks(path, crit_ids, chunksize, **read_kwargs):
+    """
+    Baca file alternatif per chunk, hanya kolom yang dibutuhkan (kode, nama, dan kolom kriteria).
+    Menghasilkan (id, nama, matriks nilai) per chunk.
+    """
+    header = pd.read_csv(path, nrows=0, **read_kwargs)
+    usecols = alternative_columns(list(header.columns), crit_ids)
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=usecols, **read_kwargs):
+        yield read_alternatives(chunk, crit_ids)
+
+# ============================
+# STREAMING SCORE
+# ============================
+def stream_score(method, alt_path, criteria=None, output_path=None, chunksize=100_000, top_k=50, **read_kwargs):
+    """
+    Hitung skor SAW/WP/TOPSIS untuk file alternatif CSV dalam dua pass tanpa memuat seluruh file.
+
+    `criteria` = DecisionMatrix (mis. `load_decision_matrix(None, df_kriteria)`), list Criterion, atau None
+    (kolom C1, C2, ... dideteksi dari header dengan bobot 1 dan atribut benefit). Skor setiap alternatif
+    ditulis ke `output_path` (CSV) sesuai urutan file; hanya top-k yang diberi ranking di memori.
+    Memori puncak sebanding dengan `chunksize`, bukan jumlah baris. Hasil sama dengan perhitungan
+    di memori hingga pembulatan floating point pada penjumlahan antar chunk.
+    """
+    method = method.lower()
+    if method not in SCORE_COLUMNS:
+        raise ValueError(f"Metode '{method}' tidak dikenal. Pilih salah satu dari: saw, wp, topsis.")
+    crit_ids, weights, benefit = _criteria_arrays(criteria, pd.read_csv(alt_path, nrows=0, **read_kwargs))
+    normalized_weights = engine.normalize_weights(weights)
+    n_crit = len(crit_ids)
+
+    # ---- PASS 1: statistik kolom ----
+    n_rows = 0
+    col_max = np.full(n_crit, -np.inf)
+    col_min = np.full(n_crit, np.inf)
+    sum_squares = np.zeros(n_crit)
+    log_total_s = -np.inf
+    adjusted_weights = np.where(benefit, normalized_weights, -normalized_weights)
+    for _, _, values in iter_chunks(alt_path, crit_ids, chunksize, **read_kwargs):
+        if not len(values):
+            continue
+        n_rows += len(values)
+        if method == "wp":
+            # log ΣS digabung antar chunk lewat logaddexp agar tidak overflow
+            log_total_s = np.logaddexp(log_total_s, engine.log_sum_exp(engine.wp_log_s(values, adjusted_weights)[0]))
+        else:
+            col_max = np.maximum(col_max, values.max(axis=0))
+            col_min = np.minimum(col_min, values.min(axis=0))
+            if method == "topsis":
+                sum_squares += np.sum(values ** 2, axis=0)
+    if n_rows == 0:
+        raise ValueError("Kriteria atau alternatif kosong.")
+
+    stats = {"n_rows": n_rows}
+    if method == "saw":
+        stats.update(col_max=col_max, col_min=col_min)
+    elif method == "wp":
+        stats.update(log_total_s=log_total_s)
+    else:
+        denominators = np.sqrt(sum_squares)
+        denominators[denominators == 0] = 1.0
+        # Solusi ideal pada matriks terbobot = nilai ekstrem kolom yang ditransformasi (w/d monoton untuk w ≥ 0)
+        weighted_max = col_max / denominators * normalized_weights
+        weighted_min = col_min / denominators * normalized_weights
+        ideal_positive = np.where(benefit, weighted_max, weighted_min)
+        ideal_negative = np.where(benefit, weighted_min, weighted_max)
+        stats.update(denominators=denominators, ideal_positive=ideal_positive, ideal_negative=ideal_negative)
+
+    # ---- PASS 2: skor per chunk, tulis ke disk, simpan top-k ----
+    score_col = SCORE_COLUMNS[method]
+    heap = TopKHeap(top_k)
+    offset = 0
+    out = open(output_path, "w", newline="", encoding="utf-8") if output_path else None
+    try:
+        for ids, names, values in iter_chunks(alt_path, crit_ids, chunksize, **read_kwargs):
+            if method == "saw":
+                scores = engine.saw_normalize(values, col_max, col_min, benefit) @ normalized_weights
+            elif method == "wp":
+                scores = engine.wp_scores_from_log(engine.wp_log_s(values, adjusted_weights)[0], log_total_s)
+            else:
+                weighted = values / stats["denominators"] * normalized_weights
+                scores = engine.topsis_closeness(weighted, stats["ideal_positive"], stats["ideal_negative"])[2]
+
+            if out is not None:
+                pd.DataFrame({"Kode Alternatif": ids, "Nama Alternatif": names, score_col: scores}).to_csv(
+                    out, header=offset == 0, index=False)
+            heap.push_chunk(scores, offset, ids, names)
+            offset += len(scores)
+    finally:
+        if out is not None:
+            out.close()
+
+    items = heap.items()
+    top = pd.DataFrame({
+        "Alternatif": [name or alt_id for _, _, alt_id, name in items],
+        score_col: [np.nan if score == -np.inf else score for score, _, _, _ in items],
+        "Ranking": np.arange(1, len(items) + 1),
+    })
+    return StreamResult(top, n_rows, stats, output_path)
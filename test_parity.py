@@ -0,0 +1,274 @@
+# Nama Program    : test_parity.py
+# Nama            : Nazwa Nashatasya | Senia Nur Hasanah
+# NPM             : 140810230019 | 140810230021
+# Tanggal Buat    : Minggu, 18 Oktober 2026
+# Deskripsi       : Uji paritas mesin numerik terhadap data contoh (sample_data/): SAW/TOPSIS sama persis dengan
+#                   rumus versi awal, WP (ruang log) sama hingga pembulatan, AHP aproksimasi sama persis, AHP eigen
+#                   sama dengan numpy.linalg.eig, cache Random Index, streaming dua pass, Kendall tau merge sort,
+#                   dan batch shared memory sama dengan perhitungan di memori. Jalankan: python -m pytest -q
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ahp
+import batch
+import compare
+import engine
+from mcdm import calculate_ahp, calculate_saw, calculate_topsis, calculate_wp, load_decision_matrix
+from streaming import SCORE_COLUMNS, stream_score
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_data")
+CALCULATORS = {"saw": calculate_saw, "wp": calculate_wp, "topsis": calculate_topsis}
+
+def sample_path(method, kind):
+    return os.path.join(SAMPLE_DIR, f"{method.upper()}-{kind}.csv")
+
+def sample_frames(method):
+    return pd.read_csv(sample_path(method, "alternatif")), pd.read_csv(sample_path(method, "kriteria"))
+
+def sample_matrix(method):
+    return load_decision_matrix(*sample_frames(method))
+
+def ranking_scores(df_ranking, labels):
+    """Skor dari tabel ranking, disusun kembali menurut urutan alternatif di file."""
+    return df_ranking.set_index("Alternatif").iloc[:, 0].loc[list(labels)].to_numpy(dtype=float)
+
+# ============================
+# RUMUS VERSI AWAL (per kolom, seperti app.py sebelum engine.py)
+# ============================
+def baseline_weights(dm):
+    total = sum(dm.weights.tolist())
+    return [(w / total) if total != 0 else (1.0 / dm.n_criteria) for w in dm.weights.tolist()]
+
+def baseline_saw(dm):
+    matrix = dm.values.copy()
+    norm_matrix = np.zeros_like(matrix, dtype=float)
+    for j, attribute in enumerate(dm.attributes):
+        col = matrix[:, j]
+        if attribute.lower() == 'benefit':
+            max_val = np.max(col)
+            norm_matrix[:, j] = col / max_val if max_val != 0 else 0
+        else:
+            min_val = np.min(col)
+            safe_col = np.where(col == 0, 1e-9, col)
+            norm_matrix[:, j] = min_val / safe_col
+            norm_matrix[:, j][col == 0] = 0
+    return np.dot(norm_matrix, baseline_weights(dm))
+
+def baseline_wp(dm):
+    matrix = dm.values.copy()
+    adjusted_weights = [-w if a.lower() == 'cost' else w for w, a in zip(baseline_weights(dm), dm.attributes)]
+    matrix[matrix <= 0] = 1e-9
+    s_values = np.prod(matrix ** adjusted_weights, axis=1)
+    total_s = np.sum(s_values)
+    return s_values / total_s if total_s != 0 else np.zeros_like(s_values)
+
+def baseline_topsis(dm):
+    matrix = dm.values.copy()
+    norm_denominators = np.sqrt(np.sum(matrix**2, axis=0))
+    norm_denominators[norm_denominators == 0] = 1.0
+    weighted_matrix = matrix / norm_denominators * baseline_weights(dm)
+    ideal_positive = np.zeros(dm.n_criteria)
+    ideal_negative = np.zeros(dm.n_criteria)
+    for j, attribute in enumerate(dm.attributes):
+        col = weighted_matrix[:, j]
+        if attribute == 'benefit':
+            ideal_positive[j], ideal_negative[j] = np.max(col), np.min(col)
+        else:
+            ideal_positive[j], ideal_negative[j] = np.min(col), np.max(col)
+    separation_positive = np.sqrt(np.sum((weighted_matrix - ideal_positive)**2, axis=1))
+    separation_negative = np.sqrt(np.sum((weighted_matrix - ideal_negative)**2, axis=1))
+    denominator = separation_positive + separation_negative
+    return np.divide(separation_negative, denominator, out=np.zeros_like(separation_negative), where=denominator != 0)
+
+def baseline_ahp(df_kriteria, df_alternatif):
+    """Skor akhir AHP versi awal (normalisasi kolom, rata-rata baris, blok alternatif per kriteria)."""
+    crit_cols = [c for c in df_kriteria.columns if c.lower().startswith("c")]
+    kriteria_matrix = pd.DataFrame(df_kriteria[crit_cols].to_numpy(dtype=float), index=df_kriteria["Kode Kriteria"].values, columns=crit_cols)
+    weights = (kriteria_matrix / kriteria_matrix.sum(axis=0)).mean(axis=1)
+    result = pd.DataFrame(index=sorted(df_alternatif['Kode Alternatif'].unique()))
+    for crit in df_alternatif['Kriteria'].unique():
+        df_block = df_alternatif[df_alternatif['Kriteria'] == crit]
+        alt_cols = [c for c in df_block.columns if c.lower().startswith("a")]
+        alt_matrix = pd.DataFrame(df_block[alt_cols].to_numpy(dtype=float), index=df_block['Kode Alternatif'].values, columns=alt_cols)
+        result[crit] = (alt_matrix / alt_matrix.sum(axis=0)).mean(axis=1).reindex(result.index, fill_value=0)
+    weights.index = [i.replace("C0", "C") for i in weights.index]
+    result.columns = [c.replace("C0", "C") for c in result.columns]
+    score = pd.Series(0.0, index=result.index)
+    for c in [c for c in result.columns if c in weights.index]:
+        score += result[c] * weights[c]
+    return score
+
+BASELINES = {"saw": baseline_saw, "wp": baseline_wp, "topsis": baseline_topsis}
+
+# ============================
+# SAW / WP / TOPSIS
+# ============================
+@pytest.mark.parametrize("method", ["saw", "topsis"])
+def test_scores_identical_to_baseline(method):
+    dm = sample_matrix(method)
+    for with_steps in (True, False):
+        _, df_ranking = CALCULATORS[method](dm, with_steps=with_steps)
+        np.testing.assert_array_equal(ranking_scores(df_ranking, dm.labels), BASELINES[method](dm))
+
+def test_wp_log_space_matches_baseline():
+    dm = sample_matrix("wp")
+    _, df_ranking = calculate_wp(dm)
+    np.testing.assert_allclose(ranking_scores(df_ranking, dm.labels), baseline_wp(dm), rtol=1e-12, atol=0)
+
+@pytest.mark.parametrize("method", ["saw", "wp", "topsis"])
+def test_ranking_order_matches_baseline(method):
+    dm = sample_matrix(method)
+    expected = sorted(zip(dm.labels, BASELINES[method](dm)), key=lambda x: x[1], reverse=True)
+    _, df_ranking = CALCULATORS[method](dm)
+    assert df_ranking["Alternatif"].tolist() == [name for name, _ in expected]
+    assert df_ranking["Ranking"].tolist() == list(range(1, dm.n_alternatives + 1))
+
+@pytest.mark.parametrize("method", ["saw", "wp", "topsis"])
+def test_stacked_scores_match_single_matrix(method):
+    dm = sample_matrix(method)
+    rng = np.random.default_rng(0)
+    matrices = dm.values * rng.uniform(0.8, 1.2, size=(5,) + dm.values.shape)
+    weight_matrix = dm.weights * rng.uniform(0.5, 1.5, size=(5, dm.n_criteria))
+    stacked = engine.stacked_scores(method, matrices, weight_matrix, dm.benefit)
+    for s in range(len(matrices)):
+        np.testing.assert_allclose(stacked[s], engine.score(method, matrices[s], weight_matrix[s], dm.benefit).scores,
+                                   rtol=1e-12, atol=1e-15)
+
+# ============================
+# AHP
+# ============================
+def test_ahp_approx_identical_to_baseline():
+    df_alternatif, df_kriteria = pd.read_csv(sample_path("ahp", "alternatif")), pd.read_csv(sample_path("ahp", "kriteria"))
+    expected = baseline_ahp(df_kriteria, df_alternatif)
+    for result in (calculate_ahp(df_kriteria, df_alternatif)[1], calculate_ahp(df_kriteria, df_alternatif, weight_method="approx")[1]):
+        scores = result.set_index("Alternatif")["Skor Akhir"]
+        np.testing.assert_array_equal(scores.loc[expected.index].to_numpy(), expected.to_numpy())
+
+def test_ahp_eigen_matches_linalg():
+    df_alternatif, df_kriteria = pd.read_csv(sample_path("ahp", "alternatif")), pd.read_csv(sample_path("ahp", "kriteria"))
+    crit_cols = [c for c in df_kriteria.columns if c.lower().startswith("c")]
+    matrices = [df_kriteria[crit_cols].to_numpy(dtype=float)] + list(ahp.stack_alternative_matrices(df_alternatif)[3])
+    for matrix in matrices:
+        weights, lambda_max = ahp.priorities(matrix, "eigen")
+        values, vectors = np.linalg.eig(matrix)
+        k = np.argmax(values.real)
+        expected = np.abs(vectors[:, k].real) / np.abs(vectors[:, k].real).sum()
+        np.testing.assert_allclose(weights, expected, rtol=1e-9)
+        assert lambda_max == pytest.approx(values[k].real, rel=1e-9)
+
+def test_ahp_consistent_matrix_same_for_both_methods():
+    w = np.array([0.5, 0.3, 0.2])
+    matrix = w[:, None] / w[None, :]
+    for method in ahp.WEIGHT_METHODS:
+        weights, lambda_max = ahp.priorities(matrix, method)
+        np.testing.assert_allclose(weights, w, rtol=1e-12)
+        assert lambda_max == pytest.approx(3.0, rel=1e-12)
+
+def test_random_index_saaty_table():
+    for n, value in ahp.SAATY_RI.items():
+        assert ahp.random_index(n) == value
+
+def test_simulated_random_index_disk_cache(tmp_path, monkeypatch):
+    cache_path = tmp_path / "random_index.json"
+    monkeypatch.setattr(ahp, "RI_CACHE_PATH", str(cache_path))
+    monkeypatch.setattr(ahp, "_RI_MEMORY", {})
+    value = ahp.random_index(11)
+    assert value == ahp.simulate_random_index(11)
+    assert cache_path.exists()
+
+    # Proses baru (memori kosong) membaca nilai dari disk tanpa simulasi ulang
+    monkeypatch.setattr(ahp, "_RI_MEMORY", {})
+    monkeypatch.setattr(ahp, "simulate_random_index", lambda *args, **kwargs: pytest.fail("RI disimulasikan ulang"))
+    assert ahp.random_index(11) == value
+
+def test_simulated_random_index_close_to_saaty():
+    for n in (3, 5, 8):
+        assert ahp.simulate_random_index(n) == pytest.approx(ahp.SAATY_RI[n], abs=0.06)
+
+# ============================
+# STREAMING
+# ============================
+@pytest.mark.parametrize("method", ["saw", "wp", "topsis"])
+def test_streaming_equals_in_memory(method, tmp_path):
+    dm = sample_matrix(method)
+    _, df_ranking = CALCULATORS[method](dm)
+    criteria = load_decision_matrix(None, pd.read_csv(sample_path(method, "kriteria")))
+    output_path = tmp_path / "scores.csv"
+    result = stream_score(method, sample_path(method, "alternatif"), criteria, output_path=str(output_path),
+                          chunksize=2, top_k=dm.n_alternatives)
+
+    assert result.n_rows == dm.n_alternatives
+    assert result.top["Alternatif"].tolist() == df_ranking["Alternatif"].tolist()
+    np.testing.assert_allclose(result.top[SCORE_COLUMNS[method]], df_ranking.iloc[:, 1], rtol=1e-12, atol=1e-15)
+    written = pd.read_csv(output_path)
+    np.testing.assert_allclose(written[SCORE_COLUMNS[method]], ranking_scores(df_ranking, dm.labels), rtol=1e-12, atol=1e-15)
+
+# ============================
+# KENDALL TAU
+# ============================
+def naive_kendall_tau(x, y):
+    """Kendall tau-b O(n²) langsung dari definisi pasangan concordant/discordant."""
+    n = len(x)
+    concordant = discordant = ties_x = ties_y = 0
+    for i in range(n):
+        for j in range(i + 1, n):
+            dx, dy = np.sign(x[i] - x[j]), np.sign(y[i] - y[j])
+            if dx == 0 and dy == 0:
+                continue
+            if dx == 0:
+                ties_x += 1
+            elif dy == 0:
+                ties_y += 1
+            elif dx == dy:
+                concordant += 1
+            else:
+                discordant += 1
+    return (concordant - discordant) / np.sqrt((concordant + discordant + ties_x) * (concordant + discordant + ties_y))
+
+def test_count_inversions_matches_naive():
+    rng = np.random.default_rng(1)
+    for n in (0, 1, 2, 7, 64, 257):
+        values = rng.integers(0, 20, n)
+        expected = sum(int(values[i] > values[j]) for i in range(n) for j in range(i + 1, n))
+        assert compare.count_inversions(values) == expected
+
+def test_kendall_tau_matches_naive():
+    rng = np.random.default_rng(2)
+    for n in (2, 5, 40, 150):
+        x = rng.integers(0, 10, n).astype(float)
+        y = np.where(rng.random(n) < 0.5, x, rng.integers(0, 10, n))
+        assert compare.kendall_tau(x, y) == pytest.approx(naive_kendall_tau(x, y), abs=1e-12)
+    dm = sample_matrix("topsis")
+    scores = np.vstack([engine.score(m, dm.values, dm.weights, dm.benefit).scores for m in compare.COMPARE_METHODS])
+    tau = compare.kendall_matrix(scores)
+    for a in range(len(scores)):
+        for b in range(len(scores)):
+            if a != b:
+                assert tau[a, b] == pytest.approx(naive_kendall_tau(scores[a], scores[b]), abs=1e-12)
+
+# ============================
+# BATCH SHARED MEMORY
+# ============================
+def test_batch_long_format_equals_single_problems():
+    methods = ("saw", "wp", "topsis")
+    alternatives, criteria = [], []
+    for method in methods:
+        df_alt, df_crit = sample_frames(method)
+        alternatives.append(df_alt.assign(**{batch.PROBLEM_COLUMN: method}))
+        criteria.append(df_crit.assign(**{batch.PROBLEM_COLUMN: method}))
+    frames = list(batch.iter_long(pd.concat(alternatives, ignore_index=True), pd.concat(criteria, ignore_index=True),
+                                  methods=methods, workers=1, on_error=lambda problem, message: pytest.fail(message)))
+
+    assert [frame[batch.PROBLEM_COLUMN].iloc[0] for frame in frames] == list(methods)
+    for problem, frame in zip(methods, frames):
+        dm = sample_matrix(problem)
+        frame = frame.set_index("Kode Alternatif").loc[list(dm.alt_ids)]
+        for method in methods:
+            _, df_ranking = CALCULATORS[method](dm)
+            np.testing.assert_array_equal(frame[f"Skor {method.upper()}"].to_numpy(dtype=float), ranking_scores(df_ranking, dm.labels))
+            ranks = df_ranking.set_index("Alternatif")["Ranking"].loc[list(dm.labels)]
+            assert frame[f"Ranking {method.upper()}"].tolist() == ranks.tolist()